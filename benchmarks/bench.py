@@ -0,0 +1,220 @@
+"""
+benchmarks for the query serializer, the mutate serializer and the response scalarizer
+
+    python benchmarks/bench.py
+    python benchmarks/bench.py --sizes 10,1000,100000,1000000
+    python benchmarks/bench.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench.py --compare benchmarks/baseline.json --threshold 0.1
+
+every benchmark is timed call by call until `--min-time` seconds passed, and reports
+ops/sec, latency percentiles and the peak memory allocated by a single call, when comparing
+to a baseline, the run fails if a benchmark ops/sec dropped more then `--threshold`
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import tracemalloc
+from typing import Any, Callable
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import ql  # noqa: E402
+import models  # noqa: E402
+
+
+Benchmark = tuple[str, Callable[[], Any]]
+
+
+def serializer_benchmarks() -> list[Benchmark]:
+    deep = models.deep_query()
+    wide = models.wide_query()
+    fragments = models.fragments_query()
+    mutation = models.mutate_schema()
+    model_mutation = models.mutate_model_schema()
+
+    # benchmarks ending with `.cached` run with the query cache enabled
+    return [
+        ("query.deep", lambda: ql.query(deep)),
+        ("query.deep.cached", lambda: ql.query(deep)),
+        ("query.wide", lambda: ql.query(wide)),
+        ("query.wide.cached", lambda: ql.query(wide)),
+        ("query.fragments", lambda: ql.query(fragments)),
+        ("query.fragments.cached", lambda: ql.query(fragments)),
+        ("mutate.nested", lambda: ql.mutate(mutation)),
+        ("mutate.model", lambda: ql.mutate(model_mutation)),
+    ]
+
+
+def scalar_benchmarks(sizes: list[int]) -> list[Benchmark]:
+    benchmarks: list[Benchmark] = []
+
+    for size in sizes:
+        for name, response in (
+            ("fragments", models.zoo_response(size)),
+            ("wide", models.wide_response(max(size // models.WIDE_FIELDS_COUNT, 1))),
+            ("deep", models.deep_response(size)),
+        ):
+            benchmarks.append(
+                (
+                    f"scalar.{name}[{size}]",
+                    lambda response=response: ql.scalar_query_response(response),
+                )
+            )
+            benchmarks.append(
+                (
+                    f"scalar.{name}.trusted[{size}]",
+                    lambda response=response: ql.scalar_query_response(
+                        response, trusted=True
+                    ),
+                )
+            )
+            benchmarks.append(
+                (
+                    f"scalar.{name}.lazy[{size}]",
+                    lambda response=response: ql.scalar_query_response(
+                        response, lazy=True
+                    ),
+                )
+            )
+        response = models.wide_response(max(size // models.WIDE_FIELDS_COUNT, 1))
+        benchmarks.append(
+            (
+                f"columns.wide[{size}]",
+                lambda response=response: ql.scalar_query_response_columns(
+                    response, models.Wide
+                ),
+            )
+        )
+    return benchmarks
+
+
+def _percentile(sorted_samples: list[float], percent: float) -> float:
+    index = min(int(len(sorted_samples) * percent / 100), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+def run_benchmark(func: Callable[[], Any], min_time: float, min_rounds: int) -> dict:
+    func()  # warmup
+
+    samples = []
+    started = time.perf_counter()
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        while len(samples) < min_rounds or time.perf_counter() - started < min_time:
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    samples.sort()
+    return {
+        "ops_per_sec": len(samples) / sum(samples),
+        "p50": _percentile(samples, 50),
+        "p95": _percentile(samples, 95),
+        "p99": _percentile(samples, 99),
+        "peak_memory": peak_memory,
+        "rounds": len(samples),
+    }
+
+
+def _format_time(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f}{unit}"
+    return f"{seconds / 1e-9:.0f}ns"
+
+
+def _format_size(size: float) -> str:
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes",
+        default="10,1000,100000",
+        help="comma separated response sizes, in amount of objects",
+    )
+    parser.add_argument("--filter", default="", help="run benchmarks containing this")
+    parser.add_argument("--min-time", type=float, default=0.5)
+    parser.add_argument("--min-rounds", type=int, default=5)
+    parser.add_argument("--save-baseline", metavar="PATH")
+    parser.add_argument("--compare", metavar="PATH")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="allowed ops/sec regression ratio when comparing to baseline",
+    )
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+
+    print(
+        f"{'benchmark':<36}{'ops/sec':>12}{'p50':>11}{'p95':>11}{'p99':>11}{'peak mem':>12}"
+    )
+    for name, func in serializer_benchmarks() + scalar_benchmarks(sizes):
+        if args.filter not in name:
+            continue
+
+        ql.query_cache.set_maxsize(128 if name.endswith(".cached") else 0)
+        ql.query_cache.clear()
+
+        result = run_benchmark(func, args.min_time, args.min_rounds)
+        results[name] = result
+
+        line = (
+            f"{name:<36}{result['ops_per_sec']:>12.1f}"
+            f"{_format_time(result['p50']):>11}{_format_time(result['p95']):>11}"
+            f"{_format_time(result['p99']):>11}{_format_size(result['peak_memory']):>12}"
+        )
+
+        if name in baseline:
+            change = result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+            line += f"  {change:+.1%}"
+            if change < -args.threshold:
+                regressions.append(name)
+                line += " REGRESSION"
+        print(line, flush=True)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if regressions:
+        print(
+            f"\n{len(regressions)} benchmarks regressed more then {args.threshold:.0%}: "
+            + ", ".join(regressions)
+        )
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""synthetic model hierarchies and responses used by the benchmarks"""
+
+import ql
+from typing import Annotated, Optional
+from pydantic import BaseModel, create_model
+
+
+# wide model, many scalar fields with some renamed fields
+WIDE_FIELDS_COUNT = 200
+Wide = ql.model(
+    create_model(  # type: ignore
+        "Wide",
+        __base__=BaseModel,
+        **{
+            f"field_{i}": (
+                (Annotated[int, ql.metadata(query_name=f"fieldQuery{i}")], ...)
+                if i % 10 == 0
+                else (int, ...)
+            )
+            for i in range(WIDE_FIELDS_COUNT)
+        },
+    )
+)
+
+
+# deep model, every level holds the next level
+DEEP_DEPTH = 8
+
+
+@ql.model
+class Deep(BaseModel):
+    value: int
+    child: Optional["Deep"] = None
+
+
+Deep.model_rebuild()
+
+
+# implements union, queried with inline fragments
+@ql.model
+class Animal(BaseModel):
+    name: str
+    age: int
+
+
+@ql.model
+class Dog(Animal):
+    barks: bool
+
+
+@ql.model
+class Cat(Animal):
+    lives: int
+
+
+@ql.model
+class Bird(Animal):
+    wingspan: float
+
+
+@ql.model(query_name="zoo")
+class Zoo(BaseModel):
+    title: str
+    animals: list[Dog | Cat | Bird]
+
+
+def deep_query(depth: int = DEEP_DEPTH) -> tuple:
+    fields: tuple = (ql._(Deep).value,)
+    for _ in range(depth - 1):
+        fields = (ql._(Deep).value, (ql._(Deep).child, fields))
+    return (Deep, fields)
+
+
+def wide_query() -> tuple:
+    return (Wide, tuple(ql._(Wide)))
+
+
+def fragments_query() -> tuple:
+    return (
+        Zoo,
+        (
+            ql._(Zoo).title,
+            (
+                ql._(Zoo).animals,
+                (
+                    ql._(Animal).name,
+                    ql._(Animal).age,
+                    (ql.on(Dog), (ql._(Dog).barks,)),
+                    (ql.on(Cat), (ql._(Cat).lives,)),
+                    (ql.on(Bird), (ql._(Bird).wingspan,)),
+                ),
+            ),
+        ),
+    )
+
+
+def mutate_schema() -> tuple:
+    return (
+        "addZoo",
+        {
+            "title": "zoo",
+            "address": {"street": "main", "number": 5, "open": True},
+            "capacity": 1000,
+        },
+        ("title", "__typename"),
+    )
+
+
+class AddressInput(BaseModel):
+    street: str
+    number: int
+    open: bool
+
+
+class ZooInput(BaseModel):
+    title: str
+    address: AddressInput
+    capacity: Annotated[int, ql.metadata(query_name="maxCapacity")]
+    tags: list[str]
+
+
+def mutate_model_schema() -> tuple:
+    return (
+        "addZoo",
+        ZooInput(
+            title="zoo",
+            address=AddressInput(street="main", number=5, open=True),
+            capacity=1000,
+            tags=[f"tag{i}" for i in range(20)],
+        ),
+        ("title", "__typename"),
+    )
+
+
+def _animal(i: int) -> dict:
+    kind = i % 3
+    if kind == 0:
+        return {"name": f"dog{i}", "age": i, "barks": True, "__typename": "Dog"}
+    if kind == 1:
+        return {"name": f"cat{i}", "age": i, "lives": 9, "__typename": "Cat"}
+    return {"name": f"bird{i}", "age": i, "wingspan": 1.5, "__typename": "Bird"}
+
+
+def zoo_response(size: int) -> dict:
+    """response with a list of `size` zoo objects, each zoo holds 3 animals"""
+    zoos = []
+    for i in range(max(size // 4, 1)):
+        zoos.append(
+            {
+                "title": f"zoo{i}",
+                "animals": [_animal(i * 3 + j) for j in range(3)],
+                "__typename": "Zoo",
+            }
+        )
+    return {"data": {"zoo": zoos}}
+
+
+def wide_response(size: int) -> dict:
+    names = tuple(ql._(Wide))
+    return {
+        "data": {
+            "Wide": [
+                {**{name: i for name in names}, "__typename": "Wide"}
+                for i in range(size)
+            ]
+        }
+    }
+
+
+def deep_response(size: int, depth: int = DEEP_DEPTH) -> dict:
+    def deep(i: int, level: int) -> dict:
+        node: dict = {"value": i, "__typename": "Deep"}
+        if level > 1:
+            node["child"] = deep(i, level - 1)
+        return node
+
+    return {"data": {"Deep": [deep(i, depth) for i in range(max(size // depth, 1))]}}
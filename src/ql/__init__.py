@@ -1,38 +1,100 @@
 __all__ = [
     "model",
     "all_models",
+    "Registry",
+    "default_registry",
     "query_fields_nt",
     "implements",
     "typename",
+    "enable_deferred_processing",
+    "disable_deferred_processing",
+    "process_deferred_models",
+    "models_processing_report",
+    "ModelProcessingCost",
     "query",
     "query_response",
     "query_response_scalar",
     "scalar_query_response",
+    "LazyModel",
+    "scalar_query_response_columns",
+    "query_response_scalar_columns",
+    "materialize",
     "raw_query_response",
     "raw_query_response_scalar",
+    "query_response_async",
+    "query_response_scalar_async",
+    "raw_query_response_async",
+    "raw_query_response_scalar_async",
+    "stream_query_response",
+    "query_response_scalar_stream",
+    "raw_query_response_scalar_stream",
+    "paginate",
+    "fragment",
     "fragment_ref",
     "arguments",
+    "alias",
+    "variable",
     "on",
+    "select",
     "mutate",
     "mutate_response",
     "mutate_response_scalar",
     "raw_mutate_response_scalar",
     "raw_mutate_response",
+    "mutate_response_async",
+    "mutate_response_scalar_async",
+    "raw_mutate_response_async",
+    "raw_mutate_response_scalar_async",
+    "mutate_bulk",
     "http",
+    "Client",
+    "RetryPolicy",
+    "HedgePolicy",
+    "RetryStats",
+    "deadline",
+    "remaining_time",
+    "HTTPTransport",
+    "TransportStats",
+    "Codec",
+    "register_codec",
+    "available_codecs",
+    "Loader",
+    "query_cache",
+    "QueryCacheInfo",
+    "entity_cache",
+    "EntityCacheInfo",
+    "instrumentation",
+    "CallMetrics",
+    "Schema",
+    "set_schema",
+    "get_schema",
     "metadata",
     "QueryResponseDict",
     "QLErrorResponseException",
     "QLErrorDetails",
+    "QLHTTPException",
+    "QLSchemaValidationException",
+    "QLDeadlineExceeded",
     "_",
 ]
 
-from ._http import http
+from ._http import http, Client, entity_cache
+from ._policy import RetryPolicy, HedgePolicy, RetryStats, deadline, remaining_time
+from ._cache import query_cache, QueryCacheInfo, EntityCacheInfo
+from ._instrument import instrumentation, CallMetrics
 from ._model import (
     model,
     all_models,
+    Registry,
+    default_registry,
     implements,
     query_fields_nt,
     typename,
+    enable_deferred_processing,
+    disable_deferred_processing,
+    process_deferred_models,
+    models_processing_report,
+    ModelProcessingCost,
 )
 from ._query import (
     query,
@@ -41,8 +103,16 @@ from ._query import (
     scalar_query_response,
     raw_query_response,
     raw_query_response_scalar,
+    query_response_async,
+    query_response_scalar_async,
+    raw_query_response_async,
+    raw_query_response_scalar_async,
     arguments,
+    alias,
+    variable,
     on,
+    select,
+    fragment,
     fragment_ref,
 )
 from ._mutate import (
@@ -51,9 +121,32 @@ from ._mutate import (
     mutate_response_scalar,
     raw_mutate_response,
     raw_mutate_response_scalar,
+    mutate_response_async,
+    mutate_response_scalar_async,
+    raw_mutate_response_async,
+    raw_mutate_response_scalar_async,
+)
+from ._bulk import mutate_bulk
+from ._lazy import LazyModel, materialize
+from ._columns import scalar_query_response_columns, query_response_scalar_columns
+from ._loader import Loader
+from ._paginate import paginate
+from ._stream import (
+    stream_query_response,
+    query_response_scalar_stream,
+    raw_query_response_scalar_stream,
 )
 from ._typing import metadata, QueryResponseDict
-from ._exceptions import QLErrorResponseException, QLErrorDetails
+from ._transport import HTTPTransport, TransportStats
+from ._codec import Codec, register_codec, available_codecs
+from ._schema import Schema, set_schema, get_schema
+from ._exceptions import (
+    QLErrorResponseException,
+    QLErrorDetails,
+    QLHTTPException,
+    QLSchemaValidationException,
+    QLDeadlineExceeded,
+)
 
 from functools import wraps
 
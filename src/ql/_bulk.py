@@ -0,0 +1,167 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+from pydantic import BaseModel
+
+from ._http import current_client
+from ._query import (
+    _QueryResponseScalar,
+    _serialize_operation_definition,
+    _alias,
+    _split_errors,
+)
+from ._mutate import MutateRequestSchema, _MutateSerializer
+from ._instrument import instrumented
+from ._exceptions import QLErrorResponseException
+from ._typing import QueryResponseDict
+
+MutateResult = BaseModel | list[BaseModel] | None | Exception
+
+# serialized mutations of a single request, with the input index of every mutation
+_Chunk = tuple[list[int], str]
+
+
+@instrumented("mutation")
+def mutate_bulk(
+    mutates: Iterable[MutateRequestSchema],
+    *,
+    chunk_size: int = 100,
+    max_chunk_bytes: Optional[int] = None,
+    concurrency: int = 4,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> list[MutateResult]:
+    """
+    sends many mutations, each mutation is sent under a generated alias, the mutations
+    are split to chunks of at most `chunk_size` mutations and `max_chunk_bytes` document
+    bytes, and at most `concurrency` chunks are sent at the same time, returns the
+    scalared result of every mutation in the input order, or the exception if
+    the mutation failed
+
+    results = ql.mutate_bulk(
+        ("addUser", {"name": name}, ("name", "__typename")) for name in names
+    )
+    """
+    if chunk_size < 1:
+        raise ValueError(f"`chunk_size` must be a positive int, got `{chunk_size}`")
+    if max_chunk_bytes is not None and max_chunk_bytes < 1:
+        raise ValueError(
+            f"`max_chunk_bytes` must be a positive int, got `{max_chunk_bytes}`"
+        )
+    if concurrency < 1:
+        raise ValueError(f"`concurrency` must be a positive int, got `{concurrency}`")
+
+    chunks = list(_chunks(mutates, chunk_size, max_chunk_bytes))
+    results: list[MutateResult] = [None] * sum(len(indexes) for indexes, _ in chunks)
+
+    if len(chunks) == 1 or concurrency == 1:
+        for chunk in chunks:
+            _send_chunk(chunk, results, trusted, variables)
+        return results
+
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(chunks))) as executor:
+        futures = [
+            # every worker runs with a copy of the caller
+            # context, so context scoped settings apply
+            executor.submit(
+                contextvars.copy_context().run,
+                _send_chunk,
+                chunk,
+                results,
+                trusted,
+                variables,
+            )
+            for chunk in chunks
+        ]
+        for future in futures:
+            future.result()
+    return results
+
+
+def _chunks(
+    mutates: Iterable[MutateRequestSchema],
+    chunk_size: int,
+    max_chunk_bytes: Optional[int],
+) -> Iterator[_Chunk]:
+    indexes: list[int] = []
+    bodies: list[str] = []
+    chunk_variables: dict[str, str] = {}
+    chunk_bytes = 0
+
+    for index, mutate in enumerate(mutates):
+        serializer = _MutateSerializer(())
+        body = "".join(serializer._serialize_mutate(mutate, alias=_alias(index)))
+        body_bytes = len(body.encode())
+
+        if indexes and (
+            len(indexes) >= chunk_size
+            or (
+                max_chunk_bytes is not None
+                and chunk_bytes + body_bytes > max_chunk_bytes
+            )
+        ):
+            yield indexes, _chunk_document(bodies, chunk_variables)
+            indexes, bodies, chunk_variables, chunk_bytes = [], [], {}, 0
+
+        for variable_name, variable_type in serializer._variables.items():
+            defined_type = chunk_variables.setdefault(variable_name, variable_type)
+            if defined_type != variable_type:
+                raise ValueError(
+                    f"variable `${variable_name}` is defined with different types, `{defined_type}` and `{variable_type}`"
+                )
+
+        indexes.append(index)
+        bodies.append(body)
+        chunk_bytes += body_bytes
+
+    if indexes:
+        yield indexes, _chunk_document(bodies, chunk_variables)
+
+
+def _chunk_document(bodies: list[str], variables: dict[str, str]) -> str:
+    return (
+        "".join(_serialize_operation_definition("mutation", variables))
+        + "{"
+        + "".join(bodies)
+        + "}"
+    )
+
+
+def _send_chunk(
+    chunk: _Chunk,
+    results: list[MutateResult],
+    trusted: bool,
+    variables: Optional[dict[str, Any]],
+) -> None:
+    """sends the chunk and sets the result of every mutation in the chunk"""
+    indexes, document = chunk
+
+    try:
+        response = current_client().request(document, variables)
+    except Exception as e:
+        for index in indexes:
+            results[index] = e
+        return
+
+    errors_by_alias, global_errors = _split_errors(response)
+    if global_errors:
+        exception = QLErrorResponseException(global_errors)
+        for index in indexes:
+            results[index] = exception
+        return
+
+    data = response.get("data") or {}
+    scalar = _QueryResponseScalar(response, trusted=trusted)
+
+    for index in indexes:
+        alias = _alias(index)
+        if alias in errors_by_alias:
+            results[index] = QLErrorResponseException(errors_by_alias[alias])
+            continue
+
+        try:
+            scalared = scalar._scalar_from_models_dict({alias: data.get(alias)})
+            results[index] = scalared[alias]
+        except Exception as e:
+            results[index] = e
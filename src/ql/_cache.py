@@ -0,0 +1,355 @@
+import copy
+import time
+from threading import Lock, RLock
+from collections import OrderedDict, namedtuple
+from collections.abc import Iterable, Iterator
+from typing import Any, Hashable, Optional
+
+
+QueryCacheInfo = namedtuple(
+    "QueryCacheInfo", ("hits", "misses", "evictions", "maxsize", "currsize")
+)
+
+# the serialized query and its variables definitions (variable name to type)
+_QueryCacheEntry = tuple[str, dict[str, str]]
+
+
+class _QueryCache:
+    """
+    bounded LRU cache mapping a structural fingerprint of a python query schema
+    to its serialized graphql string and its variables definitions, the cache is disabled by default (maxsize is `0`)
+    and must be enabled with `ql.query_cache.set_maxsize`
+    """
+
+    __slots__ = ("_lock", "_entries", "_maxsize", "_hits", "_misses", "_evictions")
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._lock = Lock()
+        self._entries: OrderedDict[Hashable, _QueryCacheEntry] = OrderedDict()
+        self._maxsize = maxsize
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize > 0
+
+    def set_maxsize(self, maxsize: int) -> None:
+        """set the maximum amount of cached queries, `0` disables the cache"""
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError(
+                f"`ql.query_cache.set_maxsize` expects a non negative int, got `{maxsize}`"
+            )
+
+        with self._lock:
+            self._maxsize = maxsize
+            while len(self._entries) > maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """removes all cached queries and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+
+    def info(self) -> QueryCacheInfo:
+        with self._lock:
+            return QueryCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._maxsize,
+                len(self._entries),
+            )
+
+    def get(self, key: Hashable) -> Optional[_QueryCacheEntry]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: Hashable, value: _QueryCacheEntry) -> None:
+        with self._lock:
+            if self._maxsize == 0:
+                return
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+
+query_cache = _QueryCache()
+
+
+EntityCacheInfo = namedtuple(
+    "EntityCacheInfo",
+    ("hits", "misses", "evictions", "expirations", "maxsize", "currsize", "ttl"),
+)
+
+
+class _Selection:
+    """
+    fields requested from an object, mapping between the field query name to the
+    sub fields selection (`None` for scalar fields), and selections that apply only
+    to objects with one of the given typenames (inline fragments and fragments)
+    """
+
+    __slots__ = ("fields", "conditions")
+
+    def __init__(self) -> None:
+        self.fields: dict[str, Optional["_Selection"]] = {}
+        self.conditions: list[tuple[frozenset[str], "_Selection"]] = []
+
+    def fields_for(self, typename: str) -> Iterator[tuple[str, Optional["_Selection"]]]:
+        yield from self.fields.items()
+        for typenames, selection in self.conditions:
+            if typename in typenames:
+                yield from selection.fields_for(typename)
+
+
+class _EntityRef:
+    """reference to a normalized object stored in the entity cache"""
+
+    __slots__ = ("key",)
+
+    def __init__(self, key: tuple[str, Hashable]) -> None:
+        self.key = key
+
+
+class _Missing(Exception):
+    """raised when reading an object that doesn't have all the requested fields"""
+
+
+class _EntityCache:
+    """
+    normalized cache of the response objects, every object with `__typename` and an id
+    field is stored once by `(typename, id)`, and objects that reference it hold
+    a reference, every client has its own cache (`ql.entity_cache` is the cache of
+    `ql.http`), the cache is disabled by default (maxsize is `0`) and must be enabled
+    with `set_maxsize`
+    """
+
+    __slots__ = (
+        "_lock",
+        "_entries",
+        "_maxsize",
+        "_ttl",
+        "_id_field",
+        "_hits",
+        "_misses",
+        "_evictions",
+        "_expirations",
+    )
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._lock = RLock()
+        # mapping between the `(typename, str(id))` to its expiration time
+        # and the normalized object fields
+        self._entries: OrderedDict[
+            tuple[str, Hashable], tuple[Optional[float], dict[str, Any]]
+        ] = OrderedDict()
+        self._maxsize = maxsize
+        self._ttl: Optional[float] = None
+        self._id_field = "id"
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._maxsize > 0
+
+    @property
+    def id_field(self) -> str:
+        return self._id_field
+
+    def set_maxsize(self, maxsize: int) -> None:
+        """set the maximum amount of cached objects, `0` disables the cache"""
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError(
+                f"`ql.entity_cache.set_maxsize` expects a non negative int, got `{maxsize}`"
+            )
+
+        with self._lock:
+            self._maxsize = maxsize
+            self._evict()
+
+    def set_ttl(self, ttl: Optional[float]) -> None:
+        """set how many seconds an object is kept after it was written, `None` keeps forever"""
+        if ttl is not None and ttl <= 0:
+            raise ValueError(
+                f"`ql.entity_cache.set_ttl` expects a positive number or `None`, got `{ttl}`"
+            )
+        self._ttl = ttl
+
+    def set_id_field(self, id_field: str) -> None:
+        """set the field query name that identifies objects, objects without it are not normalized"""
+        with self._lock:
+            self._id_field = id_field
+            self._entries.clear()
+
+    def clear(self) -> None:
+        """removes all cached objects and resets the counters"""
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+            self._evictions = 0
+            self._expirations = 0
+
+    def invalidate(self, typename: str, id_: Hashable) -> None:
+        """removes the object from the cache, queries that require it are sent again"""
+        with self._lock:
+            self._entries.pop((typename, str(id_)), None)
+
+    def info(self) -> EntityCacheInfo:
+        with self._lock:
+            return EntityCacheInfo(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._expirations,
+                self._maxsize,
+                len(self._entries),
+                self._ttl,
+            )
+
+    def read(
+        self, typenames: Iterable[str], id_: Hashable, selection: _Selection
+    ) -> Optional[dict[str, Any]]:
+        """
+        returns the response object for the given selection, built from the cached
+        object with one of the given typenames, `None` if a requested field is missing
+        """
+        with self._lock:
+            for typename in typenames:
+                try:
+                    value = self._read_ref((typename, str(id_)), selection)
+                except _Missing:
+                    continue
+                self._hits += 1
+                return value
+            self._misses += 1
+            return None
+
+    def write(self, data: Optional[dict[str, Any]]) -> None:
+        """normalizes the response data, merging every identified object into the cache"""
+        with self._lock:
+            now = time.monotonic()
+            for value in (data or {}).values():
+                self._normalize(value, now)
+            self._evict()
+
+    def _read_ref(
+        self, key: tuple[str, Hashable], selection: _Selection
+    ) -> dict[str, Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            raise _Missing()
+
+        expires_at, record = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            self._expirations += 1
+            raise _Missing()
+
+        self._entries.move_to_end(key)
+        return self._read_object(record, selection)
+
+    def _read_object(
+        self, record: dict[str, Any], selection: _Selection
+    ) -> dict[str, Any]:
+        typename = record["__typename"]
+        result: dict[str, Any] = {"__typename": typename}
+
+        for name, sub_selection in selection.fields_for(typename):
+            if name == "__typename":
+                continue
+            if name not in record:
+                raise _Missing()
+
+            value = self._read_value(record[name], sub_selection)
+            # the same field can be selected more then once, for
+            # example by the query and by a fragment
+            if isinstance(value, dict) and isinstance(result.get(name), dict):
+                result[name].update(value)
+            else:
+                result[name] = value
+        return result
+
+    def _read_value(self, value: Any, selection: Optional[_Selection]) -> Any:
+        if isinstance(value, list):
+            return [self._read_value(sub_value, selection) for sub_value in value]
+
+        if selection is None:
+            # object stored for a field that is now queried
+            # without sub fields, can't be returned as is
+            if isinstance(value, _EntityRef) or (
+                isinstance(value, dict) and "__typename" in value
+            ):
+                raise _Missing()
+            # values are copied, so changes to the returned
+            # models don't change the cached values
+            if isinstance(value, dict):
+                return copy.deepcopy(value)
+            return value
+
+        if isinstance(value, _EntityRef):
+            return self._read_ref(value.key, selection)
+        if isinstance(value, dict) and "__typename" in value:
+            return self._read_object(value, selection)
+        if value is None:
+            return None
+        # scalar that was stored for a field name
+        # that is now queried with sub fields
+        raise _Missing()
+
+    def _normalize(self, value: Any, now: float) -> Any:
+        if isinstance(value, list):
+            return [self._normalize(sub_value, now) for sub_value in value]
+        if not isinstance(value, dict):
+            return value
+        if "__typename" not in value:
+            # dict that is not an object, like json scalar
+            return copy.deepcopy(value)
+
+        record = {
+            key: self._normalize(sub_value, now) for key, sub_value in value.items()
+        }
+        id_ = record.get(self._id_field)
+        if id_ is None or isinstance(id_, (dict, list)):
+            return record
+
+        # graphql ids are serialized as strings, but may
+        # be given as ints in the query arguments
+        key = (record["__typename"], str(id_))
+        expires_at = None if self._ttl is None else now + self._ttl
+        entry = self._entries.get(key)
+
+        # partial updates are merged into the existing object,
+        # fields that are not in the response are kept
+        if entry is not None and (entry[0] is None or entry[0] > now):
+            entry[1].update(record)
+            record = entry[1]
+
+        self._entries[key] = (expires_at, record)
+        self._entries.move_to_end(key)
+        return _EntityRef(key)
+
+    def _evict(self) -> None:
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+            self._evictions += 1
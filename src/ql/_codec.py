@@ -0,0 +1,152 @@
+import zlib
+from abc import ABC, abstractmethod
+from typing import Optional, Protocol
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None  # type: ignore
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None  # type: ignore
+
+from ._instrument import CallMetrics, current_call
+
+
+class Decompressor(Protocol):
+    def decompress(self, data: bytes) -> bytes:
+        ...
+
+    def flush(self) -> bytes:
+        ...
+
+
+class Codec(ABC):
+    """
+    http content coding (the `Content-Encoding` header value), custom codecs
+    are added with `ql.register_codec` and can then be used by `ql.HTTPTransport`
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        ...
+
+    @abstractmethod
+    def decompressor(self) -> Decompressor:
+        """returns object that decompresses the data chunk by chunk"""
+
+    def __repr__(self) -> str:
+        return f"Codec({self.name!r})"
+
+
+class _ZlibCodec(Codec):
+    __slots__ = ("_wbits", "_level")
+
+    def __init__(self, name: str, wbits: int, level: int = 6) -> None:
+        super().__init__(name)
+        self._wbits = wbits
+        self._level = level
+
+    def compress(self, data: bytes) -> bytes:
+        compressor = zlib.compressobj(self._level, zlib.DEFLATED, self._wbits)
+        return compressor.compress(data) + compressor.flush()
+
+    def decompressor(self) -> Decompressor:
+        return zlib.decompressobj(self._wbits)
+
+
+class _ZstdCodec(Codec):
+    __slots__ = ()
+
+    def compress(self, data: bytes) -> bytes:
+        return zstandard.ZstdCompressor().compress(data)
+
+    def decompressor(self) -> Decompressor:
+        return zstandard.ZstdDecompressor().decompressobj()
+
+
+class _BrotliDecompressor:
+    __slots__ = ("_decompressor",)
+
+    def __init__(self) -> None:
+        self._decompressor = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decompressor.process(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _BrotliCodec(Codec):
+    __slots__ = ()
+
+    def compress(self, data: bytes) -> bytes:
+        return brotli.compress(data)
+
+    def decompressor(self) -> Decompressor:
+        return _BrotliDecompressor()
+
+
+_CODECS: dict[str, Codec] = {}
+
+
+def register_codec(codec: Codec) -> None:
+    """adds codec that can be used by name, overwrites codec with the same name"""
+    if not isinstance(codec, Codec):
+        raise TypeError(
+            f"`ql.register_codec` expects `ql.Codec`, got `{type(codec).__name__}`"
+        )
+    _CODECS[codec.name] = codec
+
+
+def available_codecs() -> tuple[str, ...]:
+    """returns the names of the codecs that can be used, zstd and brotli only if installed"""
+    return tuple(_CODECS)
+
+
+def get_codec(name: str) -> Codec:
+    codec = _CODECS.get(name)
+    if codec is None:
+        raise ValueError(
+            f"unknown codec `{name}`, available codecs are {', '.join(f'`{n}`' for n in _CODECS)}"
+        )
+    return codec
+
+
+def record_compression(
+    direction: str, size: int, wire_size: int, call: Optional[CallMetrics] = None
+) -> None:
+    """
+    adds the body sizes to the given call metrics (the current call by default),
+    `direction` is `request` or `response`, the compression ratio is the body size
+    divided by the sent size
+    """
+    if call is None:
+        call = current_call()
+    if call is None:
+        return
+
+    totals = call.add_extra(
+        **{f"{direction}_bytes": size, f"{direction}_wire_bytes": wire_size}
+    )
+    size, wire_size = totals[f"{direction}_bytes"], totals[f"{direction}_wire_bytes"]
+    call.extra[f"{direction}_compression_ratio"] = (
+        size / wire_size if wire_size else 1.0
+    )
+
+
+register_codec(_ZlibCodec("gzip", 16 + zlib.MAX_WBITS))
+# http `deflate` is zlib wrapped deflate stream
+register_codec(_ZlibCodec("deflate", zlib.MAX_WBITS))
+if zstandard is not None:  # pragma: no cover
+    register_codec(_ZstdCodec("zstd"))
+if brotli is not None:  # pragma: no cover
+    register_codec(_BrotliCodec("br"))
@@ -0,0 +1,165 @@
+import time
+from array import array
+from inspect import isclass
+from typing import Any, Optional
+from pydantic import BaseModel
+
+from ._http import current_client
+from ._const import QL_QUERY_NAME_ATTR
+from ._model import query_fields_nt
+from ._query import (
+    QueryRequestSchema,
+    _QueryFragmentType,
+    _QueryOperation,
+    _QueryOperationType,
+    _QuerySerializer,
+)
+from ._instrument import instrumented, current_call
+from ._exceptions import QLErrorResponseException
+from ._typing import QueryResponseDict
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore
+
+# typed columns for numeric annotations, mapping between the
+# annotation to the `array` typecode and the numpy dtype
+_ARRAY_TYPECODES: dict[Any, str] = {int: "q", float: "d"}
+_NUMPY_DTYPES: dict[Any, str] = {int: "int64", float: "float64", bool: "bool"}
+
+
+class _QueryResponseColumns:
+    """
+    decodes list of objects of a single model into columns, mapping between the model
+    field name to the list of the field values, without creating model instances
+    """
+
+    __slots__ = ("_query_response", "_model", "_root", "_use_numpy")
+
+    def __init__(
+        self,
+        query_response: QueryResponseDict,
+        model: type[BaseModel],
+        root: Optional[str] = None,
+        use_numpy: bool = True,
+    ) -> None:
+        self._query_response = query_response
+        self._model = model
+        self._root = root or getattr(model, QL_QUERY_NAME_ATTR)
+        self._use_numpy = use_numpy and numpy is not None
+
+    def columns(self) -> dict[str, Any]:
+        call = current_call()
+        if call is None:
+            return self._columns()
+
+        started = time.perf_counter()
+        try:
+            return self._columns()
+        finally:
+            call.add_phase("decode", time.perf_counter() - started)
+
+    def _columns(self) -> dict[str, Any]:
+        errors = self._query_response.get("errors")
+        if errors is not None:
+            raise QLErrorResponseException(errors)
+
+        rows = (self._query_response["data"] or {}).get(self._root) or []
+        if not isinstance(rows, list):
+            raise ValueError(
+                f"expected list of objects for columns of `{self._root}`, got `{type(rows).__name__}`"
+            )
+
+        model_fields = self._model.model_fields
+        # only fields that were queried, by the first object keys
+        queried = rows[0].keys() if rows else ()
+        columns = {}
+
+        for field_name, query_name in query_fields_nt(self._model)._asdict().items():
+            if query_name not in queried:
+                continue
+
+            values = [row.get(query_name) for row in rows]
+            columns[field_name] = self._column(
+                values, model_fields[field_name].annotation
+            )
+        return columns
+
+    def _column(self, values: list[Any], annotation: Any) -> Any:
+        """
+        returns typed array for numeric fields, if the values don't fit the
+        typed array (like `None` values, or `1.5` in `int` field), the values
+        list is returned as is
+        """
+        if self._use_numpy:
+            dtype = _NUMPY_DTYPES.get(annotation)
+            if dtype is not None and None not in values:
+                try:
+                    column = numpy.array(values, dtype=dtype)
+                except (TypeError, ValueError, OverflowError):
+                    return values
+                # numpy casts silently (`1.5` to `1`, `"2"` to `2.0`),
+                # so only lossless columns are returned
+                if column.ndim != 1 or column.tolist() != values:
+                    return values
+                return column
+            return values
+
+        typecode = _ARRAY_TYPECODES.get(annotation)
+        if typecode is not None:
+            try:
+                return array(typecode, values)
+            except (TypeError, OverflowError):
+                return values
+        return values
+
+
+def scalar_query_response_columns(
+    query_response: QueryResponseDict,
+    model: type[BaseModel],
+    root: Optional[str] = None,
+    use_numpy: bool = True,
+) -> dict[str, Any]:
+    """
+    decodes the list of `model` objects under `root` (the model query name by default)
+    into columns, mapping between the model field names to the field values, `int` and
+    `float` fields are returned as numpy arrays if numpy is installed, or as `array.array`
+    """
+    return _QueryResponseColumns(query_response, model, root, use_numpy).columns()
+
+
+@instrumented("query")
+def query_response_scalar_columns(
+    query_model: QueryRequestSchema,
+    fragments: Optional[_QueryFragmentType] = None,
+    variables: Optional[dict[str, Any]] = None,
+    use_numpy: bool = True,
+) -> dict[str, Any]:
+    """
+    query single list root and decode the response into columns
+
+    columns = ql.query_response_scalar_columns(
+        (Metric, (ql._(Metric).name, ql._(Metric).value))
+    )
+    columns["value"]  # array('d', [...])
+    """
+    model_or_op, _ = query_model
+    if isclass(model_or_op) and issubclass(model_or_op, BaseModel):
+        model, root = model_or_op, None
+    elif (
+        isinstance(model_or_op, _QueryOperation)
+        and model_or_op.op is _QueryOperationType.ARGUMENTS
+        and model_or_op.name is None
+    ):
+        model, root = model_or_op.model, model_or_op.alias
+    else:
+        raise ValueError(
+            f"columns can be queried only for a model or `ql.arguments` of a model, got `{model_or_op}`"
+        )
+
+    query_str = _QuerySerializer(
+        (query_model,), fragments=fragments or {}, include_typename=True
+    ).serialize()
+    response = current_client().request(query_str, variables)
+    return scalar_query_response_columns(response, model, root, use_numpy)
@@ -12,3 +12,15 @@ QL_INSTANTIATE = "__ql_instantiate__"
 # returns namedtuple for accessing
 # model fields with dot
 QL_QUERYABLE_FIELDS_NT_ATTR = "__ql_query_fields_nt__"
+
+# precompiled decoder used when scalaring
+# query responses into model instances
+QL_DECODER_ATTR = "__ql_decoder__"
+
+# precompiled encoder used when serializing
+# model instances as mutation input values
+QL_ENCODER_ATTR = "__ql_encoder__"
+
+# cached selection sets built by `ql.select`,
+# mapping between the depth to the selection
+QL_SELECTIONS_ATTR = "__ql_selections__"
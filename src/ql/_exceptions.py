@@ -21,3 +21,32 @@ class QLErrorResponseException(Exception):
 
     def __str__(self) -> str:
         return "\n".join(map(str, self.error_details))
+
+
+class QLHTTPException(Exception):
+    """raised by the built-in transport when the server responds with http error"""
+
+    def __init__(self, status: int, reason: str, body: bytes) -> None:
+        self.status = status
+        self.reason = reason
+        self.body = body
+
+    def __str__(self) -> str:
+        return f"graphql server responded with http error {self.status} {self.reason}"
+
+
+class QLSchemaValidationException(Exception):
+    """raised when a document doesn't match the schema set with `ql.set_schema`"""
+
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+
+    def __str__(self) -> str:
+        return "\n".join(self.errors)
+
+
+class QLDeadlineExceeded(TimeoutError):
+    """raised when a request didn't end before the deadline set with `ql.deadline`"""
+
+    def __str__(self) -> str:
+        return "graphql request deadline exceeded"
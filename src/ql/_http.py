@@ -1,8 +1,34 @@
-from typing import Callable, TypeAlias, Optional
+import json
+import time
+import asyncio
+import hashlib
+import inspect
+import threading
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Iterator, TypeAlias, Optional
 from ._typing import QueryResponseDict
+from ._model import Registry
+from ._cache import _EntityCache
+from ._instrument import CallMetrics, current_call
+from ._schema import validate_document, operation_type
+from ._policy import RetryPolicy, HedgePolicy, RetryStats, remaining_time
+from ._exceptions import QLDeadlineExceeded
 
 
-GraphqlRequestFunc: TypeAlias = Callable[[dict[str, str]], QueryResponseDict]
+GraphqlRequestFunc: TypeAlias = Callable[[dict[str, Any]], QueryResponseDict]
+AsyncGraphqlRequestFunc: TypeAlias = Callable[
+    [dict[str, Any]], Awaitable[QueryResponseDict]
+]
+# returns the response body as file like object or iterable of chunks
+StreamGraphqlRequestFunc: TypeAlias = Callable[[dict[str, Any]], Any]
+# sends GET request with the given url query parameters
+GraphqlGetRequestFunc: TypeAlias = Callable[[dict[str, str]], QueryResponseDict]
+AsyncGraphqlGetRequestFunc: TypeAlias = Callable[
+    [dict[str, str]], Awaitable[QueryResponseDict]
+]
 
 
 class _QLHTTPClient:
@@ -13,10 +39,39 @@ class _QLHTTPClient:
     handling can vary
     """
 
-    __slots__ = ("_request_func",)
+    __slots__ = (
+        "_request_func",
+        "_async_request_func",
+        "_stream_request_func",
+        "_persisted_queries",
+        "_get_request_func",
+        "_async_get_request_func",
+        "_flights",
+        "_flights_lock",
+        "_suppressed_requests",
+        "_retry_policy",
+        "_hedge_policy",
+        "_counters",
+        "_counters_lock",
+    )
 
     def __init__(self) -> None:
         self._request_func: Optional[GraphqlRequestFunc] = None
+        self._async_request_func: Optional[AsyncGraphqlRequestFunc] = None
+        self._stream_request_func: Optional[StreamGraphqlRequestFunc] = None
+        self._persisted_queries = False
+        self._get_request_func: Optional[GraphqlGetRequestFunc] = None
+        self._async_get_request_func: Optional[AsyncGraphqlGetRequestFunc] = None
+        # mapping between in flight request key to the request
+        # result, `None` when single flight is disabled
+        self._flights: Optional[dict[tuple[str, Optional[str]], _Flight]] = None
+        self._flights_lock = threading.Lock()
+        self._suppressed_requests = 0
+        self._retry_policy: Optional[RetryPolicy] = None
+        self._hedge_policy: Optional[HedgePolicy] = None
+        # retries, retries won, hedges, hedges won and deadlines exceeded
+        self._counters = [0, 0, 0, 0, 0]
+        self._counters_lock = threading.Lock()
 
     def set_request_func(self, request_func: GraphqlRequestFunc) -> None:
         """set the library graphql request function, if already set, overwrite"""
@@ -26,12 +81,668 @@ class _QLHTTPClient:
             )
         self._request_func = request_func
 
-    def request(self, data: str) -> QueryResponseDict:
+    def set_async_request_func(self, request_func: AsyncGraphqlRequestFunc) -> None:
+        """
+        set the library async graphql request function, used by the `*_async`
+        functions, if already set, overwrite
+        """
+        if not callable(request_func):
+            raise ValueError(
+                "`ql.http.set_async_request_func` expectes to get a callable function"
+            )
+        self._async_request_func = request_func
+
+    def set_stream_request_func(self, request_func: StreamGraphqlRequestFunc) -> None:
+        """
+        set the library stream graphql request function, the function returns
+        the raw response body as file like object or iterable of bytes chunks,
+        used by the `*_stream` functions, if already set, overwrite
+        """
+        if not callable(request_func):
+            raise ValueError(
+                "`ql.http.set_stream_request_func` expectes to get a callable function"
+            )
+        self._stream_request_func = request_func
+
+    def enable_persisted_queries(
+        self,
+        get_request_func: Optional[GraphqlGetRequestFunc] = None,
+        async_get_request_func: Optional[AsyncGraphqlGetRequestFunc] = None,
+    ) -> None:
+        """
+        enable automatic persisted queries, requests are sent with the query sha256 hash
+        only, and the full query is sent only if the server doesn't know the hash, if
+        `get_request_func` is given, hash only requests are sent with it as GET request
+        """
+        for func in (get_request_func, async_get_request_func):
+            if func is not None and not callable(func):
+                raise ValueError(
+                    "`ql.http.enable_persisted_queries` expectes to get a callable function"
+                )
+        self._persisted_queries = True
+        self._get_request_func = get_request_func
+        self._async_get_request_func = async_get_request_func
+
+    def disable_persisted_queries(self) -> None:
+        self._persisted_queries = False
+        self._get_request_func = None
+        self._async_get_request_func = None
+
+    def enable_single_flight(self) -> None:
+        """
+        identical requests (same query and variables) made while the same request is
+        already in flight, wait for it and share its response instead of sending
+        another request, the shared response must not be mutated
+        """
+        with self._flights_lock:
+            if self._flights is None:
+                self._flights = {}
+
+    def disable_single_flight(self) -> None:
+        with self._flights_lock:
+            self._flights = None
+
+    @property
+    def suppressed_requests(self) -> int:
+        """amount of requests that shared the response of in flight request"""
+        return self._suppressed_requests
+
+    def set_retry_policy(self, policy: Optional[RetryPolicy]) -> None:
+        """retry failed requests with the given `ql.RetryPolicy`, `None` disables retries"""
+        self._retry_policy = policy
+
+    def set_hedge_policy(self, policy: Optional[HedgePolicy]) -> None:
+        """hedge slow queries with the given `ql.HedgePolicy`, `None` disables hedging"""
+        self._hedge_policy = policy
+
+    def retry_stats(self) -> RetryStats:
+        with self._counters_lock:
+            return RetryStats(*self._counters)
+
+    def _count(self, counter: int) -> None:
+        with self._counters_lock:
+            self._counters[counter] += 1
+
+    def request(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
+        validate_document(data)
+        call = current_call()
+        if call is None:
+            return self._request(data, variables)
+
+        started = time.perf_counter()
+        try:
+            response = self._request(data, variables)
+        finally:
+            _record_transport(call, data, started)
+        call.add_counts(error_count=len(response.get("errors") or ()))
+        return response
+
+    def _request(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
+        flights = self._flights
+        if flights is None:
+            return self._send_with_policies(data, variables)
+
+        key = _flight_key(data, variables)
+        if key is None:
+            return self._send_with_policies(data, variables)
+
+        with self._flights_lock:
+            flight = flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = flights[key] = _Flight()
+            else:
+                self._suppressed_requests += 1
+
+        if not leader:
+            return flight.wait()  # type: ignore
+
+        try:
+            response = self._send_with_policies(data, variables)
+        except BaseException as e:
+            self._land(flights, key)
+            flight.set_exception(e)  # type: ignore
+            raise
+
+        self._land(flights, key)
+        flight.set_response(response)  # type: ignore
+        return response
+
+    def _land(
+        self,
+        flights: dict[tuple[str, Optional[str]], "_Flight"],
+        key: tuple[str, Optional[str]],
+    ) -> None:
+        """removes the flight before its result is set, so later requests are sent again"""
+        with self._flights_lock:
+            flights.pop(key, None)
+
+    def _send_with_policies(
+        self, data: str, variables: Optional[dict[str, Any]]
+    ) -> QueryResponseDict:
+        retry, hedge = self._retry_policy, self._hedge_policy
+        if retry is None and hedge is None and remaining_time() is None:
+            return self._send(data, variables)
+
+        mutation = _is_mutation(data)
+        send = self._send if hedge is None or mutation else self._send_hedged
+        attempts = _attempts(retry, mutation)
+        retries = 0
+
+        while True:
+            try:
+                _check_deadline()
+                response = send(data, variables)
+            except Exception as e:
+                delay = self._retry_delay(retry, e, retries, attempts)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                retries += 1
+                self._count(_RETRIES)
+                continue
+
+            if retries:
+                self._count(_RETRIES_WON)
+            return response
+
+    def _retry_delay(
+        self,
+        retry: Optional[RetryPolicy],
+        exception: Exception,
+        retries: int,
+        attempts: int,
+    ) -> Optional[float]:
+        """
+        returns the delay before retrying the failed request, `None` if the
+        request should not be retried, raises if the deadline is exceeded
+        """
+        remaining = remaining_time()
+        if remaining is not None and remaining <= 0:
+            self._count(_DEADLINES)
+            if isinstance(exception, QLDeadlineExceeded):
+                raise exception
+            raise QLDeadlineExceeded() from exception
+
+        if (
+            retry is None
+            or retries + 1 >= attempts
+            or not retry.should_retry(exception)
+        ):
+            return None
+
+        delay = retry.delay(retries)
+        if remaining is not None and delay >= remaining:
+            self._count(_DEADLINES)
+            raise QLDeadlineExceeded() from exception
+        return delay
+
+    def _send_hedged(
+        self, data: str, variables: Optional[dict[str, Any]]
+    ) -> QueryResponseDict:
+        """
+        sends the request again every `delay` seconds the request is not answered, up
+        to `max_hedges` times, and returns the first response, the slower requests
+        keep running in the background and their responses are ignored
+        """
+        hedge: HedgePolicy = self._hedge_policy  # type: ignore
+        # the first request runs on its own thread, so it doesn't wait for
+        # a free pool worker, and the caller thread is free to wait for the
+        # first response of all the requests
+        futures = [_send_in_thread(self._send, data, variables)]
+        pending = set(futures)
+        hedges = 0
+        error: Optional[BaseException] = None
+
+        while pending:
+            timeout = hedge.delay if hedges < hedge.max_hedges else None
+            remaining = remaining_time()
+            if remaining is not None:
+                if remaining <= 0:
+                    raise QLDeadlineExceeded()
+                timeout = remaining if timeout is None else min(timeout, remaining)
+
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=futures.index):
+                exception = future.exception()
+                if exception is None:
+                    if future is not futures[0]:
+                        self._count(_HEDGES_WON)
+                    return future.result()
+                error = error or exception
+
+            if not done and hedges < hedge.max_hedges:
+                hedges += 1
+                future = hedge._submit(self._send, data, variables)
+                # when the hedge workers are busy, wait for the sent requests
+                if future is not None:
+                    futures.append(future)
+                    pending.add(future)
+                    self._count(_HEDGES)
+        raise error  # type: ignore
+
+    def _send(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
         if self._request_func is None:
             raise ValueError(
                 "ql cannot preform http request, set a request function `ql.http.set_request_func`"
             )
-        return self._request_func({"query": data})
+        if not self._persisted_queries:
+            return self._request_func(_request_payload(data, variables))
+
+        extensions = _persisted_query_extensions(data)
+        # mutations must not be sent with GET, servers reject
+        # them and proxies may cache the responses
+        if self._get_request_func is not None and not _is_mutation(data):
+            response = self._get_request_func(_get_params(extensions, variables))
+        else:
+            response = self._request_func(
+                _persisted_request_payload(None, variables, extensions)
+            )
+
+        if not _persisted_query_not_found(response):
+            return response
+        return self._request_func(
+            _persisted_request_payload(data, variables, extensions)
+        )
+
+    async def request_async(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
+        """
+        awaits the async request function, if only a sync request function
+        is set, it is called in a worker thread so the event loop is not blocked
+        """
+        validate_document(data)
+        call = current_call()
+        if call is None:
+            return await self._request_async(data, variables)
+
+        started = time.perf_counter()
+        try:
+            response = await self._request_async(data, variables)
+        finally:
+            _record_transport(call, data, started)
+        call.add_counts(error_count=len(response.get("errors") or ()))
+        return response
+
+    async def _request_async(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
+        if self._async_request_func is None:
+            if self._request_func is not None:
+                return await asyncio.to_thread(self._request, data, variables)
+            raise ValueError(
+                "ql cannot preform http request, set a request function `ql.http.set_async_request_func`"
+            )
+
+        retry, hedge = self._retry_policy, self._hedge_policy
+        if retry is None and hedge is None and remaining_time() is None:
+            return await self._send_async(data, variables)
+
+        mutation = _is_mutation(data)
+        send = (
+            self._send_async if hedge is None or mutation else self._send_hedged_async
+        )
+        attempts = _attempts(retry, mutation)
+        retries = 0
+
+        while True:
+            scope = None
+            try:
+                scope = asyncio.timeout(_check_deadline())
+                async with scope:
+                    response = await send(data, variables)
+            except Exception as e:
+                if scope is not None and scope.expired():
+                    self._count(_DEADLINES)
+                    raise QLDeadlineExceeded() from e
+                delay = self._retry_delay(retry, e, retries, attempts)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                retries += 1
+                self._count(_RETRIES)
+                continue
+
+            if retries:
+                self._count(_RETRIES_WON)
+            return response
+
+    async def _send_hedged_async(
+        self, data: str, variables: Optional[dict[str, Any]]
+    ) -> QueryResponseDict:
+        """async version of `_send_hedged`, the slower requests are cancelled"""
+        hedge: HedgePolicy = self._hedge_policy  # type: ignore
+        tasks = [asyncio.ensure_future(self._send_async(data, variables))]
+        pending = set(tasks)
+        error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                timeout = hedge.delay if len(tasks) <= hedge.max_hedges else None
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in sorted(done, key=tasks.index):
+                    exception = task.exception()
+                    if exception is None:
+                        if task is not tasks[0]:
+                            self._count(_HEDGES_WON)
+                        return task.result()
+                    error = error or exception
+
+                if not done and len(tasks) <= hedge.max_hedges:
+                    task = asyncio.ensure_future(self._send_async(data, variables))
+                    tasks.append(task)
+                    pending.add(task)
+                    self._count(_HEDGES)
+            raise error  # type: ignore
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _send_async(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> QueryResponseDict:
+        if self._async_request_func is None:
+            raise ValueError(
+                "ql cannot preform http request, set a request function `ql.http.set_async_request_func`"
+            )
+        if not self._persisted_queries:
+            return await self._async_request_func(_request_payload(data, variables))
+
+        extensions = _persisted_query_extensions(data)
+        if self._async_get_request_func is not None and not _is_mutation(data):
+            response = await self._async_get_request_func(
+                _get_params(extensions, variables)
+            )
+        else:
+            response = await self._async_request_func(
+                _persisted_request_payload(None, variables, extensions)
+            )
+
+        if not _persisted_query_not_found(response):
+            return response
+        return await self._async_request_func(
+            _persisted_request_payload(data, variables, extensions)
+        )
+
+    def request_stream(
+        self, data: str, variables: Optional[dict[str, Any]] = None
+    ) -> Any:
+        if self._stream_request_func is None:
+            raise ValueError(
+                "ql cannot preform http request, set a request function `ql.http.set_stream_request_func`"
+            )
+        validate_document(data)
+
+        call = current_call()
+        if call is None:
+            return self._stream_request_func(_request_payload(data, variables))
+
+        # only the time until the response body is
+        # returned, the body is read by the caller
+        started = time.perf_counter()
+        try:
+            return self._stream_request_func(_request_payload(data, variables))
+        finally:
+            _record_transport(call, data, started)
+
+
+# indexes of the client retry counters
+_RETRIES, _RETRIES_WON, _HEDGES, _HEDGES_WON, _DEADLINES = range(5)
+
+
+def _is_mutation(data: str) -> bool:
+    stripped = data.lstrip()
+    # documents serialized by ql start with the operation
+    if stripped.startswith(("query", "{")):
+        return False
+    if stripped.startswith("mutation"):
+        return True
+    return operation_type(data) == "mutation"
+
+
+def _send_in_thread(
+    send: Callable[[str, Optional[dict[str, Any]]], QueryResponseDict],
+    data: str,
+    variables: Optional[dict[str, Any]],
+) -> Future[QueryResponseDict]:
+    """
+    sends the request from a new thread with the caller context, returns
+    once the thread started sending the request
+    """
+    future: Future[QueryResponseDict] = Future()
+    context = contextvars.copy_context()
+    started = threading.Event()
+
+    def run() -> None:
+        future.set_running_or_notify_cancel()
+        started.set()
+        try:
+            future.set_result(context.run(send, data, variables))
+        except BaseException as exception:
+            future.set_exception(exception)
+
+    threading.Thread(target=run, name="ql-hedge-first", daemon=True).start()
+    started.wait()
+    return future
+
+
+def _attempts(retry: Optional[RetryPolicy], mutation: bool) -> int:
+    """returns the maximum amount of times the request is sent"""
+    if retry is None or (mutation and not retry.retry_mutations):
+        return 1
+    return retry.attempts
+
+
+def _check_deadline() -> Optional[float]:
+    """returns the remaining time, raises if the deadline already passed"""
+    remaining = remaining_time()
+    if remaining is not None and remaining <= 0:
+        raise QLDeadlineExceeded()
+    return remaining
+
+
+def _record_transport(call: CallMetrics, data: str, started: float) -> None:
+    call.add_phase("transport", time.perf_counter() - started)
+    call.add_counts(document_size=len(data.encode()))
+
+
+class _Flight:
+    """result of in flight request, shared with identical requests"""
+
+    __slots__ = ("_event", "_response", "_exception")
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._response: Optional[QueryResponseDict] = None
+        self._exception: Optional[BaseException] = None
+
+    def set_response(self, response: QueryResponseDict) -> None:
+        self._response = response
+        self._event.set()
+
+    def set_exception(self, exception: BaseException) -> None:
+        self._exception = exception
+        self._event.set()
+
+    def wait(self) -> QueryResponseDict:
+        self._event.wait()
+        if self._exception is not None:
+            raise self._exception
+        return self._response  # type: ignore
+
+
+def _flight_key(
+    data: str, variables: Optional[dict[str, Any]]
+) -> Optional[tuple[str, Optional[str]]]:
+    """
+    returns the request single flight key, `None` if the request must not be shared,
+    mutations are never shared, every mutation is sent
+    """
+    if _is_mutation(data):
+        return None
+    if not variables:
+        return (data, None)
+    try:
+        return (data, json.dumps(variables, sort_keys=True, separators=(",", ":")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _request_payload(data: str, variables: Optional[dict[str, Any]]) -> dict[str, Any]:
+    """returns the graphql request body, `variables` is set only if given"""
+    if variables:
+        return {"query": data, "variables": variables}
+    return {"query": data}
+
+
+@lru_cache(maxsize=4096)
+def _persisted_query_hash(data: str) -> str:
+    """returns the query sha256 hash, cached so every query is hashed once"""
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def _persisted_query_extensions(data: str) -> dict[str, Any]:
+    return {"persistedQuery": {"version": 1, "sha256Hash": _persisted_query_hash(data)}}
+
+
+def _persisted_request_payload(
+    data: Optional[str],
+    variables: Optional[dict[str, Any]],
+    extensions: dict[str, Any],
+) -> dict[str, Any]:
+    payload: dict[str, Any] = {"extensions": extensions}
+    if data is not None:
+        payload["query"] = data
+    if variables:
+        payload["variables"] = variables
+    return payload
+
+
+def _get_params(
+    extensions: dict[str, Any], variables: Optional[dict[str, Any]]
+) -> dict[str, str]:
+    """returns the url query parameters for persisted query GET request"""
+    params = {"extensions": json.dumps(extensions, separators=(",", ":"))}
+    if variables:
+        params["variables"] = json.dumps(variables, separators=(",", ":"))
+    return params
+
+
+def _persisted_query_not_found(response: QueryResponseDict) -> bool:
+    for error in response.get("errors") or ():
+        extensions = error.get("extensions") or {}  # type: ignore
+        if error.get("message") in (
+            "PersistedQueryNotFound",
+            "PersistedQueryNotSupported",
+        ) or extensions.get("code") in (
+            "PERSISTED_QUERY_NOT_FOUND",
+            "PERSISTED_QUERY_NOT_SUPPORTED",
+        ):
+            return True
+    return False
+
+
+class Client(_QLHTTPClient):
+    """
+    graphql client with its own request functions and settings (persisted queries,
+    single flight), the `ql.*` functions send requests with the client of the current
+    `scope`, or with `ql.http` when not in a scope, so different threads
+    and tasks can talk to different graphql servers at the same time
+
+    github = ql.Client(ql.HTTPTransport("https://api.github.com/graphql"))
+
+    with github.scope():
+        ql.query_response_scalar(...)
+
+    github.call(ql.query_response_scalar, ...)
+    """
+
+    __slots__ = ("name", "registry", "entity_cache")
+
+    def __init__(
+        self,
+        request_func: Optional[GraphqlRequestFunc] = None,
+        *,
+        async_request_func: Optional[AsyncGraphqlRequestFunc] = None,
+        stream_request_func: Optional[StreamGraphqlRequestFunc] = None,
+        registry: Optional[Registry] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        super().__init__()
+        if request_func is not None:
+            self.set_request_func(request_func)
+        if async_request_func is not None:
+            self.set_async_request_func(async_request_func)
+        if stream_request_func is not None:
+            self.set_stream_request_func(stream_request_func)
+        self.name = name
+        # models registry used for scalaring responses in the client scope
+        self.registry = registry
+        # objects are cached per client, so clients of different
+        # endpoints never answer from each other objects
+        self.entity_cache = _EntityCache()
+
+    @contextmanager
+    def scope(self) -> Iterator["Client"]:
+        """`ql.*` functions called in this context use this client (and its registry)"""
+        token = _current_client.set(self)
+        try:
+            with self.registry.scope() if self.registry is not None else nullcontext():
+                yield self
+        finally:
+            _current_client.reset(token)
+
+    def call(self, func: Callable[..., Any], /, *args, **kwargs) -> Any:
+        """
+        calls the given `ql.*` function with this client, async functions return an
+        awaitable and generator functions (like `ql.paginate`) return a generator that
+        use this client
+        """
+        if inspect.iscoroutinefunction(func):
+            return self._call_async(func, args, kwargs)
+
+        with self.scope():
+            result = func(*args, **kwargs)
+        if inspect.isgenerator(result):
+            return self._scoped_generator(result)
+        return result
+
+    async def _call_async(
+        self, func: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict
+    ) -> Any:
+        with self.scope():
+            return await func(*args, **kwargs)
+
+    def _scoped_generator(self, generator: Iterator[Any]) -> Iterator[Any]:
+        """the generator body runs only when iterated, so every step runs in the scope"""
+        while True:
+            with self.scope():
+                try:
+                    item = next(generator)
+                except StopIteration:
+                    return
+            yield item
+
+    def __repr__(self) -> str:
+        return f"Client({self.name!r})"
+
+
+http = Client(name="default")
+entity_cache = http.entity_cache
+_current_client: contextvars.ContextVar[Client] = contextvars.ContextVar(
+    "ql_current_client", default=http
+)
 
 
-http = _QLHTTPClient()
+def current_client() -> Client:
+    """returns the client of the current `Client.scope`, or `ql.http`"""
+    return _current_client.get()
@@ -0,0 +1,197 @@
+import time
+import inspect
+import logging
+import threading
+import contextvars
+from functools import wraps
+from typing import Any, Callable, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+CallObserver = Callable[["CallMetrics"], None]
+
+_logger = logging.getLogger("ql")
+
+
+class CallMetrics:
+    """
+    metrics of a single ql call, like `ql.query_response_scalar`, passed to the
+    observers when the call ends
+
+    `phases` maps between the phase name (`serialize`, `transport`, `decode`) to the
+    seconds spent in it, a phase may appear more then once in a call (retries
+    for example), then the durations are summed
+
+    a call may report from many threads (fan out, bulk and hedged requests),
+    so the metrics are updated with the `add_*` methods
+    """
+
+    __slots__ = (
+        "operation",
+        "function",
+        "started_at",
+        "duration",
+        "phases",
+        "document_size",
+        "typename_counts",
+        "error_count",
+        "exception",
+        "extra",
+        "_lock",
+    )
+
+    def __init__(self, operation: str, function: str) -> None:
+        self.operation = operation
+        self.function = function
+        # wall clock time, useful for creating tracing spans
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.phases: dict[str, float] = {}
+        # size of the serialized document in bytes
+        self.document_size = 0
+        # amount of scalared objects per typename
+        self.typename_counts: dict[str, int] = {}
+        # amount of graphql errors in the responses
+        self.error_count = 0
+        self.exception: Optional[BaseException] = None
+        # free form metrics added by other ql components
+        self.extra: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def add_phase(self, phase: str, duration: float) -> None:
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+    def add_counts(self, *, document_size: int = 0, error_count: int = 0) -> None:
+        with self._lock:
+            self.document_size += document_size
+            self.error_count += error_count
+
+    def add_typename_counts(self, counts: dict[str, int]) -> None:
+        with self._lock:
+            for typename, count in counts.items():
+                self.typename_counts[typename] = (
+                    self.typename_counts.get(typename, 0) + count
+                )
+
+    def add_extra(self, **values: float) -> dict[str, Any]:
+        """adds the values to the numeric extra metrics, returns the new totals"""
+        with self._lock:
+            for name, value in values.items():
+                self.extra[name] = self.extra.get(name, 0) + value
+            return {name: self.extra[name] for name in values}
+
+    def __repr__(self) -> str:
+        return (
+            f"CallMetrics(function={self.function!r}, duration={self.duration:.6f}, "
+            f"phases={self.phases!r}, document_size={self.document_size}, "
+            f"error_count={self.error_count})"
+        )
+
+
+_current_call: contextvars.ContextVar[Optional[CallMetrics]] = contextvars.ContextVar(
+    "ql_current_call", default=None
+)
+
+
+class _Instrumentation:
+    """
+    registry of the call observers, when no observer is registered
+    the instrumented functions don't collect any metric
+    """
+
+    __slots__ = ("_observers",)
+
+    def __init__(self) -> None:
+        self._observers: tuple[CallObserver, ...] = ()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._observers)
+
+    def add_observer(self, observer: CallObserver) -> None:
+        """add function that is called with the `CallMetrics` of every finished call"""
+        if not callable(observer):
+            raise ValueError(
+                "`ql.instrumentation.add_observer` expectes to get a callable function"
+            )
+        # tuple is replaced and never mutated, so
+        # it can be read without a lock
+        self._observers = self._observers + (observer,)
+
+    def remove_observer(self, observer: CallObserver) -> None:
+        self._observers = tuple(o for o in self._observers if o is not observer)
+
+    def _start(self, operation: str, function: str) -> Optional[CallMetrics]:
+        """starts a new call, if there is no call already running in the context"""
+        if not self._observers or _current_call.get() is not None:
+            return None
+        return CallMetrics(operation, function)
+
+    def _finish(self, call: CallMetrics, started: float) -> None:
+        call.duration = time.perf_counter() - started
+        for observer in self._observers:
+            # broken observer must not fail the call
+            try:
+                observer(call)
+            except Exception:
+                _logger.exception("ql call observer %r failed", observer)
+
+
+instrumentation = _Instrumentation()
+
+
+def current_call() -> Optional[CallMetrics]:
+    """returns the metrics of the running call, `None` if not instrumented"""
+    return _current_call.get()
+
+
+def instrumented(operation: str) -> Callable[[F], F]:
+    """
+    decorator that measures the call of the given function, the phases
+    inside the function report into the call with `current_call`
+    """
+
+    def decorator(func: F) -> F:
+        function = func.__name__
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                call = instrumentation._start(operation, function)
+                if call is None:
+                    return await func(*args, **kwargs)
+
+                token = _current_call.set(call)
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                except BaseException as e:
+                    call.exception = e
+                    raise
+                finally:
+                    _current_call.reset(token)
+                    instrumentation._finish(call, started)
+
+            return async_wrapper  # type: ignore
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            call = instrumentation._start(operation, function)
+            if call is None:
+                return func(*args, **kwargs)
+
+            token = _current_call.set(call)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException as e:
+                call.exception = e
+                raise
+            finally:
+                _current_call.reset(token)
+                instrumentation._finish(call, started)
+
+        return wrapper  # type: ignore
+
+    return decorator
@@ -0,0 +1,83 @@
+import copy
+from typing import Any, Callable
+from pydantic import BaseModel
+
+_object_getattribute = object.__getattribute__
+_object_setattr = object.__setattr__
+
+
+class LazyModel:
+    """
+    view over a raw response object, the object is scalared to its model (with all
+    of its children) only on first attribute access, `isinstance` checks work against
+    the model without scalaring the object
+
+    user = ql.scalar_query_response(response, lazy=True)["user"]
+    isinstance(user, User)  # True, not scalared yet
+    user.name  # scalared now
+    """
+
+    __slots__ = ("_ql_model", "_ql_data", "_ql_materialize", "_ql_instance")
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        data: dict[str, Any],
+        materialize: Callable[[dict[str, Any]], BaseModel],
+    ) -> None:
+        _object_setattr(self, "_ql_model", model)
+        _object_setattr(self, "_ql_data", data)
+        _object_setattr(self, "_ql_materialize", materialize)
+        _object_setattr(self, "_ql_instance", None)
+
+    @property  # type: ignore
+    def __class__(self) -> type[BaseModel]:
+        return _object_getattribute(self, "_ql_model")
+
+    def __getattr__(self, name: str) -> Any:
+        # called only for attributes that are not the view slots
+        return getattr(materialize(self), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(materialize(self), name, value)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, LazyModel):
+            other = materialize(other)
+        return materialize(self) == other
+
+    def __repr__(self) -> str:
+        return repr(materialize(self))
+
+    def __str__(self) -> str:
+        return str(materialize(self))
+
+    def __iter__(self):
+        return iter(materialize(self))
+
+    # copies and pickles are of the model instance, not of the view
+
+    def __copy__(self) -> BaseModel:
+        return copy.copy(materialize(self))
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> BaseModel:
+        return copy.deepcopy(materialize(self), memo)
+
+    def __reduce__(self) -> str | tuple[Any, ...]:
+        return materialize(self).__reduce_ex__(2)
+
+
+def materialize(value: Any) -> Any:
+    """returns the model instance of lazy view, other values are returned as is"""
+    if type(value) is not LazyModel:
+        return value
+
+    instance = _object_getattribute(value, "_ql_instance")
+    if instance is None:
+        instance = _object_getattribute(value, "_ql_materialize")(
+            _object_getattribute(value, "_ql_data")
+        )
+        _object_setattr(value, "_ql_instance", instance)
+        # the raw data is not needed anymore
+        _object_setattr(value, "_ql_data", None)
+    return instance
@@ -0,0 +1,196 @@
+import asyncio
+from collections.abc import Iterable, Hashable
+from typing import Any, Optional
+from pydantic import BaseModel
+
+from ._http import current_client
+from ._query import (
+    _QueryOperation,
+    _QueryOperationType,
+    _QuerySerializer,
+    _QueryResponseScalar,
+    _QueryFragmentType,
+    _alias,
+    _split_errors,
+)
+from ._exceptions import QLErrorResponseException
+from ._typing import QueryResponseDict
+
+
+class Loader:
+    """
+    coalesce lookups of the same model with different arguments into one
+    query, each lookup is sent under a generated alias and the scalared response
+    is split back to each caller
+
+    users = ql.Loader(User, (ql._(User).name, ql._(User).email))
+
+    # both lookups are sent in a single request
+    foo, bar = await asyncio.gather(
+        users.load(name="foo"),
+        users.load(name="bar"),
+    )
+    """
+
+    __slots__ = (
+        "_model",
+        "_fields",
+        "_fragments",
+        "_max_batch_size",
+        "_trusted",
+        "_pending",
+        "_tasks",
+    )
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        fields: Iterable[Any],
+        *,
+        fragments: Optional[_QueryFragmentType] = None,
+        max_batch_size: int = 100,
+        trusted: bool = False,
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError(
+                f"`max_batch_size` must be a positive int, got `{max_batch_size}`"
+            )
+        self._model = model
+        # fields are reused for every batch, so one shot
+        # iterables like generators must be collected
+        self._fields = fields if isinstance(fields, str) else tuple(fields)
+        self._fragments = fragments or {}
+        self._max_batch_size = max_batch_size
+        self._trusted = trusted
+        # lookups that are waiting for the next dispatch, mapping
+        # between the lookup key to the arguments and the waiting future
+        self._pending: dict[Hashable, tuple[dict, asyncio.Future]] = {}
+        # keep reference to the running fetch tasks so
+        # they are not garbage collected while running
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, **arguments) -> Optional[BaseModel]:
+        """
+        returns the model for the given arguments, lookups made in the same
+        event loop iteration are sent together in one request
+        """
+        key = _lookup_key(arguments)
+        pending = self._pending.get(key)
+
+        if pending is not None:
+            return await pending[1]
+
+        loop = asyncio.get_running_loop()
+        if not self._pending:
+            loop.call_soon(self._dispatch)
+
+        future = loop.create_future()
+        self._pending[key] = (arguments, future)
+        return await future
+
+    def load_many(
+        self, arguments_list: Iterable[dict[str, Any]]
+    ) -> list[Optional[BaseModel]]:
+        """sync lookup of many arguments, each batch is sent in one request"""
+        arguments_list = list(arguments_list)
+        results: list[Optional[BaseModel]] = []
+
+        for batch in self._batches(arguments_list):
+            response = current_client().request(self._serialize(batch))
+            for value in self._split_response(response, len(batch)):
+                if isinstance(value, Exception):
+                    raise value
+                results.append(value)
+        return results
+
+    def _batches(self, arguments_list: list[dict]) -> Iterable[list[dict]]:
+        for i in range(0, len(arguments_list), self._max_batch_size):
+            yield arguments_list[i : i + self._max_batch_size]
+
+    def _dispatch(self) -> None:
+        pending = list(self._pending.values())
+        self._pending = {}
+
+        for i in range(0, len(pending), self._max_batch_size):
+            task = asyncio.ensure_future(
+                self._fetch(pending[i : i + self._max_batch_size])
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, batch: list[tuple[dict, asyncio.Future]]) -> None:
+        try:
+            response = await current_client().request_async(
+                self._serialize([arguments for arguments, _ in batch])
+            )
+            values = self._split_response(response, len(batch))
+        except Exception as e:
+            values = [e] * len(batch)
+
+        for (_, future), value in zip(batch, values):
+            if future.done():
+                continue
+            if isinstance(value, Exception):
+                future.set_exception(value)
+            else:
+                future.set_result(value)
+
+    def _serialize(self, batch: list[dict]) -> str:
+        return _QuerySerializer(
+            tuple(
+                (
+                    _QueryOperation(
+                        _QueryOperationType.ARGUMENTS,
+                        self._model,
+                        arguments,
+                        alias=_alias(i),
+                    ),
+                    self._fields,
+                )
+                for i, arguments in enumerate(batch)
+            ),
+            fragments=self._fragments,
+            include_typename=True,
+        ).serialize()
+
+    def _split_response(
+        self, response: QueryResponseDict, size: int
+    ) -> list[Optional[BaseModel] | Exception]:
+        """
+        returns the scalared value for each alias, or exception if the
+        alias had errors
+        """
+        errors_by_alias, global_errors = _split_errors(response)
+        if global_errors:
+            return [QLErrorResponseException(global_errors)] * size
+
+        data = response.get("data") or {}
+        scalar = _QueryResponseScalar(response, trusted=self._trusted)
+        values: list[Optional[BaseModel] | Exception] = []
+
+        for i in range(size):
+            alias = _alias(i)
+            if alias in errors_by_alias:
+                values.append(QLErrorResponseException(errors_by_alias[alias]))
+                continue
+
+            value = data.get(alias)
+            try:
+                values.append(None if value is None else scalar._scalar_dict(value))
+            except Exception as e:
+                # invalid object fails only its own lookup
+                values.append(e)
+        return values
+
+
+def _lookup_key(arguments: dict[str, Any]) -> Hashable:
+    """
+    returns key used to deduplicate identical lookups, lookups with
+    unhashable arguments are never deduplicated
+    """
+    key = tuple((k, type(v), v) for k, v in arguments.items())
+    try:
+        hash(key)
+    except TypeError:
+        return object()
+    return key
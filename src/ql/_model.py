@@ -1,5 +1,20 @@
+import enum
+import time
+import types
+import threading
+import contextvars
+from contextlib import contextmanager
 from collections import namedtuple
-from typing import Optional, Any
+from typing import (
+    Iterator,
+    Mapping,
+    Optional,
+    Any,
+    ForwardRef,
+    Union,
+    get_args,
+    get_origin,
+)
 from pydantic import BaseModel
 
 from ._const import (
@@ -7,16 +22,101 @@ from ._const import (
     QL_IMPLEMENTS_ATTR,
     QL_QUERYABLE_FIELDS_NT_ATTR,
     QL_TYPENAME_ATTR,
+    QL_DECODER_ATTR,
+    QL_ENCODER_ATTR,
 )
 from ._typing import QLFieldMetadata
 
 
-_ALL_REGISTERD_MODELS: dict[str, type[BaseModel]] = {}
+class Registry:
+    """
+    mapping between typename to the model, used when scalaring responses, models
+    are registered to the default registry unless given other registry, so models
+    of different graphql servers can share the same typename
+
+    github = ql.Registry("github")
+
+    @ql.model(registry=github)
+    class User(BaseModel):
+        ...
+
+    with github.scope():
+        ql.query_response_scalar(...)
+    """
+
+    __slots__ = ("name", "_models", "_typename_map")
+
+    def __init__(self, name: Optional[str] = None) -> None:
+        self.name = name
+        self._models: dict[str, type[BaseModel]] = {}
+        self._typename_map = types.MappingProxyType(self._models)
+
+    def register(self, typename: str, cls: type[BaseModel]) -> None:
+        self._models[typename] = cls
+
+    def get(self, typename: str) -> Optional[type[BaseModel]]:
+        return self._models.get(typename)
+
+    def models(self) -> dict[str, type[BaseModel]]:
+        """returns a copy of the registered models"""
+        return self._models.copy()
+
+    @property
+    def typename_map(self) -> Mapping[str, type[BaseModel]]:
+        """read only view of the registered models, reflects later registrations without copying"""
+        return self._typename_map
+
+    @contextmanager
+    def scope(self) -> Iterator["Registry"]:
+        """responses scalared in this context use this registry"""
+        token = _current_registry.set(self)
+        try:
+            yield self
+        finally:
+            _current_registry.reset(token)
+
+    def __contains__(self, typename: str) -> bool:
+        return typename in self._models
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def __repr__(self) -> str:
+        return f"Registry({self.name!r}, models={len(self._models)})"
+
+
+default_registry = Registry("default")
+_current_registry: contextvars.ContextVar[Registry] = contextvars.ContextVar(
+    "ql_current_registry", default=default_registry
+)
+
+
+def current_registry() -> Registry:
+    """returns the registry of the current `Registry.scope`, or the default registry"""
+    return _current_registry.get()
+
+
+# models that were registered in deferred mode and
+# were not added yet to their parents implements map
+_PENDING_IMPLEMENTS: list[type[BaseModel]] = []
+_PENDING_IMPLEMENTS_LOCK = threading.Lock()
+_DEFERRED_PROCESSING = False
+# incremented every time a model is registered, so
+# anything derived from the registered models can be rebuilt
+_models_version = 0
+
+ModelProcessingCost = namedtuple(
+    "ModelProcessingCost",
+    ("model", "register", "query_fields", "implements", "decoder", "total"),
+)
+# seconds spent processing each model, the costs are
+# `register`, `query_fields`, `implements` and `decoder`
+_PROCESSING_COSTS: dict[type[BaseModel], list[float]] = {}
 
 
 def all_models() -> dict[str, type[BaseModel]]:
-    """returns a tuple of all registered models"""
-    return _ALL_REGISTERD_MODELS.copy()
+    """returns a dict of all models registered to the default registry"""
+    return default_registry.models()
 
 
 def typename(model: type[BaseModel]) -> Optional[str]:
@@ -26,8 +126,17 @@ def typename(model: type[BaseModel]) -> Optional[str]:
 
 def implements(cls: type[BaseModel]) -> tuple:
     """returns the model implemention list"""
-    implements = getattr(cls, QL_IMPLEMENTS_ATTR, {})
-    return tuple(implements.values())
+    return tuple(model_implements(cls).values())
+
+
+def model_implements(cls: type[BaseModel]) -> dict[str, type[BaseModel]]:
+    """
+    returns the model implements map, mapping between typename to the
+    model, models that were registered in deferred mode are added first
+    """
+    if _PENDING_IMPLEMENTS:
+        _link_pending_implements()
+    return getattr(cls, QL_IMPLEMENTS_ATTR, {})
 
 
 def query_fields_nt(cls: type[BaseModel]) -> Any:
@@ -35,25 +144,224 @@ def query_fields_nt(cls: type[BaseModel]) -> Any:
     returns the model queryable namedtuple fields, mapping between model field name to the
     query name value
     """
-    return getattr(cls, QL_QUERYABLE_FIELDS_NT_ATTR)
+    query_fields = cls.__dict__.get(QL_QUERYABLE_FIELDS_NT_ATTR)
+    if query_fields is not None:
+        return query_fields
 
+    if QL_TYPENAME_ATTR in cls.__dict__:
+        # model that was registered in deferred mode
+        return _build_query_fields(cls)
+    for mro in cls.__mro__[1:]:
+        if QL_TYPENAME_ATTR in mro.__dict__:
+            return query_fields_nt(mro)
+    raise AttributeError(
+        f"`{cls.__name__}` is not a ql model, define it with `ql.model`"
+    )
 
-def _process_model(
-    cls,
-    typename: Optional[str],
-    query_name: Optional[str],
-):
-    if not issubclass(cls, BaseModel):
-        raise TypeError(
-            f"given class `{cls.__name__}` does not inherits from `pydantic.BaseModel`"
+
+def models_version() -> int:
+    """changes every time a model is registered"""
+    return _models_version
+
+
+def enable_deferred_processing() -> None:
+    """
+    models defined with `ql.model` from now on are only registered, their query
+    fields namedtuple, implements map and decoder are built on first use
+    """
+    global _DEFERRED_PROCESSING
+    _DEFERRED_PROCESSING = True
+
+
+def disable_deferred_processing() -> None:
+    global _DEFERRED_PROCESSING
+    _DEFERRED_PROCESSING = False
+
+
+def process_deferred_models(registry: Optional[Registry] = None) -> None:
+    """builds everything that was deferred for the registry models"""
+    _link_pending_implements()
+    if registry is None:
+        registry = default_registry
+    for cls in registry.models().values():
+        query_fields_nt(cls)
+        model_decoder(cls)
+
+
+def models_processing_report() -> list[ModelProcessingCost]:
+    """
+    returns the seconds spent processing every registered model, from
+    the most expensive model, deferred costs are included once paid
+    """
+    report = [
+        ModelProcessingCost(getattr(cls, QL_TYPENAME_ATTR), *costs, sum(costs))
+        for cls, costs in list(_PROCESSING_COSTS.items())
+    ]
+    report.sort(key=lambda cost: cost.total, reverse=True)
+    return report
+
+
+def _add_processing_cost(cls: type[BaseModel], index: int, started: float) -> None:
+    if QL_TYPENAME_ATTR not in cls.__dict__:
+        return
+    costs = _PROCESSING_COSTS.setdefault(cls, [0.0, 0.0, 0.0, 0.0])
+    costs[index] += time.perf_counter() - started
+
+
+class _FieldKind(enum.Enum):
+    # value is passed as is to the model
+    PLAIN = enum.auto()
+    # value is a nested model dict
+    MODEL = enum.auto()
+    # value is a list of nested model dicts
+    MODEL_LIST = enum.auto()
+    # couldn't determine the field kind from the annotation,
+    # the value is inspected when scalaring
+    DYNAMIC = enum.auto()
+
+
+class _ModelDecoder:
+    """
+    precompiled information about how to convert query response dict
+    into the model instance, mapping between the field query name to the model
+    field name and the field kind
+    """
+
+    __slots__ = (
+        "model",
+        "fields",
+        "complete",
+    )
+
+    def __init__(
+        self,
+        model: type[BaseModel],
+        fields: dict[str, tuple[str, _FieldKind]],
+        complete: bool,
+    ) -> None:
+        self.model = model
+        self.fields = fields
+        # `False` if the model had unresolved annotations
+        # while compiling, so the decoder should be compiled again
+        self.complete = complete
+
+    def construct(self, kwargs: dict[str, Any]) -> BaseModel:
+        """creates the model instance without validation"""
+        return self.model.model_construct(**kwargs)
+
+
+def _annotation_kind(annotation: Any) -> _FieldKind:
+    """returns the field kind for the given field annotation"""
+    if annotation is Any or annotation is object:
+        return _FieldKind.DYNAMIC
+    if isinstance(annotation, (str, ForwardRef)):
+        return _FieldKind.DYNAMIC
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            return _FieldKind.MODEL
+        return _FieldKind.PLAIN
+
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is Union or origin is types.UnionType:
+        kinds = {_annotation_kind(arg) for arg in args if arg is not type(None)}
+        if len(kinds) == 1:
+            return kinds.pop()
+        return _FieldKind.DYNAMIC
+    if origin in (list, tuple, set, frozenset) and args:
+        item_kinds = {
+            _annotation_kind(arg)
+            for arg in args
+            if arg is not type(None) and arg is not Ellipsis
+        }
+        if item_kinds == {_FieldKind.PLAIN}:
+            return _FieldKind.PLAIN
+        if item_kinds == {_FieldKind.MODEL}:
+            return _FieldKind.MODEL_LIST
+        return _FieldKind.DYNAMIC
+    if origin is not None and any(
+        _annotation_kind(arg) is not _FieldKind.PLAIN
+        for arg in args
+        if arg is not Ellipsis
+    ):
+        return _FieldKind.DYNAMIC
+    if origin is not None:
+        return _FieldKind.PLAIN
+
+    # `Annotated`, `Literal` or any other typing special form
+    return _FieldKind.DYNAMIC
+
+
+def _compile_decoder(cls: type[BaseModel]) -> _ModelDecoder:
+    fields: dict[str, tuple[str, _FieldKind]] = {}
+    complete = bool(getattr(cls, "__pydantic_complete__", True))
+
+    for name, field_info in cls.model_fields.items():
+        kind = _annotation_kind(field_info.annotation)
+        fields[_field_query_name(name, field_info)] = (name, kind)
+
+    return _ModelDecoder(cls, fields, complete)
+
+
+def model_decoder(cls: type[BaseModel]) -> _ModelDecoder:
+    """
+    returns the model precompiled decoder, if the model was
+    not complete when compiled, compile the decoder again
+    """
+    decoder = cls.__dict__.get(QL_DECODER_ATTR)
+
+    if decoder is None or (
+        not decoder.complete and getattr(cls, "__pydantic_complete__", True)
+    ):
+        started = time.perf_counter()
+        decoder = _compile_decoder(cls)
+        setattr(cls, QL_DECODER_ATTR, decoder)
+        _add_processing_cost(cls, 3, started)
+    return decoder
+
+
+class _ModelEncoder:
+    """
+    precompiled information about how to serialize model instance as graphql
+    input object, the model field names and their query names
+    """
+
+    __slots__ = ("model", "fields")
+
+    def __init__(self, model: type[BaseModel], fields: tuple[tuple[str, str], ...]):
+        self.model = model
+        self.fields = fields
+
+
+def _field_query_name(name: str, field_info: Any) -> str:
+    for metadata in field_info.metadata:
+        if isinstance(metadata, QLFieldMetadata):
+            return metadata.query_name or name
+    return name
+
+
+def model_encoder(cls: type[BaseModel]) -> _ModelEncoder:
+    """
+    returns the model precompiled encoder, the encoder is compiled on first use,
+    so input models don't have to be defined with `ql.model`
+    """
+    encoder = cls.__dict__.get(QL_ENCODER_ATTR)
+
+    if encoder is None:
+        encoder = _ModelEncoder(
+            cls,
+            tuple(
+                (name, _field_query_name(name, field_info))
+                for name, field_info in cls.model_fields.items()
+            ),
         )
+        setattr(cls, QL_ENCODER_ATTR, encoder)
+    return encoder
 
-    typename = typename or cls.__name__
 
-    # set minimum required attributes
-    setattr(cls, QL_QUERY_NAME_ATTR, query_name or cls.__name__)
-    setattr(cls, QL_TYPENAME_ATTR, typename)
-    setattr(cls, QL_IMPLEMENTS_ATTR, {})
+def _link_implements(cls: type[BaseModel]) -> None:
+    typename = getattr(cls, QL_TYPENAME_ATTR)
 
     for mro in cls.__mro__[1:]:
         # if mro is not a `BaseModel` and it doesn't have `QL_IMPLEMENTS_ATTR`
@@ -66,6 +374,18 @@ def _process_model(
         __implements__ = getattr(mro, QL_IMPLEMENTS_ATTR)
         __implements__[typename] = cls
 
+
+def _link_pending_implements() -> None:
+    with _PENDING_IMPLEMENTS_LOCK:
+        for cls in _PENDING_IMPLEMENTS:
+            started = time.perf_counter()
+            _link_implements(cls)
+            _add_processing_cost(cls, 2, started)
+        _PENDING_IMPLEMENTS.clear()
+
+
+def _build_query_fields(cls: type[BaseModel]) -> Any:
+    started = time.perf_counter()
     queryable_fields: list[tuple[str, str]] = []
 
     for name, field_info in cls.model_fields.items():
@@ -88,14 +408,59 @@ def _process_model(
     # doesn't support namedtuples with dynamic fields
     QueryFields = namedtuple("QueryFields", (qf[0] for qf in queryable_fields))  # type: ignore
 
-    setattr(
-        cls,
-        QL_QUERYABLE_FIELDS_NT_ATTR,
-        QueryFields(*(qf[1] for qf in queryable_fields)),
-    )
+    query_fields = QueryFields(*(qf[1] for qf in queryable_fields))
+    setattr(cls, QL_QUERYABLE_FIELDS_NT_ATTR, query_fields)
+    _add_processing_cost(cls, 1, started)
+    return query_fields
+
+
+def _process_model(
+    cls,
+    typename: Optional[str],
+    query_name: Optional[str],
+    deferred: Optional[bool] = None,
+    registry: Optional[Registry] = None,
+):
+    if not issubclass(cls, BaseModel):
+        raise TypeError(
+            f"given class `{cls.__name__}` does not inherits from `pydantic.BaseModel`"
+        )
+
+    started = time.perf_counter()
+    typename = typename or cls.__name__
+    deferred = _DEFERRED_PROCESSING if deferred is None else deferred
+
+    # set minimum required attributes
+    setattr(cls, QL_QUERY_NAME_ATTR, query_name or cls.__name__)
+    setattr(cls, QL_TYPENAME_ATTR, typename)
+    setattr(cls, QL_IMPLEMENTS_ATTR, {})
+    # the model could be processed again
+    _PROCESSING_COSTS.pop(cls, None)
 
     # register the model to the list
-    _ALL_REGISTERD_MODELS[typename] = cls
+    if registry is None:
+        registry = default_registry
+    registry.register(typename, cls)
+
+    global _models_version
+    _models_version += 1
+    _add_processing_cost(cls, 0, started)
+
+    if deferred:
+        with _PENDING_IMPLEMENTS_LOCK:
+            _PENDING_IMPLEMENTS.append(cls)
+        return cls
+
+    # keep the implements order, as if all models were processed eagerly,
+    # the pending models record their own implements cost
+    if _PENDING_IMPLEMENTS:
+        _link_pending_implements()
+    started = time.perf_counter()
+    _link_implements(cls)
+    _add_processing_cost(cls, 2, started)
+
+    _build_query_fields(cls)
+    model_decoder(cls)
     return cls
 
 
@@ -105,6 +470,8 @@ def model(
     *,
     typename: Optional[str] = None,
     query_name: Optional[str] = None,
+    deferred: Optional[bool] = None,
+    registry: Optional[Registry] = None,
 ):
     """
         defines the given pydantic class as a ql model, setting `__ql_<...>__`
@@ -128,10 +495,12 @@ def model(
             ...
 
         ql.implements(Human)  # we will see `Female` and `Male`
+    `deferred` overrides `ql.enable_deferred_processing` for this model, and
+    `registry` registers the model to the given `ql.Registry` instead of the default one
     """
 
     def _process_model_wrapper(cls):
-        return _process_model(cls, typename, query_name)
+        return _process_model(cls, typename, query_name, deferred, registry)
 
     if cls is not None:
         return _process_model_wrapper(cls)
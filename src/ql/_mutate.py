@@ -1,103 +1,304 @@
-from typing import Generator, Any, Optional, TypeAlias
+import enum
+import math
+import time
+from json.encoder import encode_basestring  # type: ignore
+from typing import Callable, Generator, Any, Optional, TypeAlias
 from pydantic import BaseModel
 
 from ._typing import QueryResponseDict
-from ._query import scalar_query_response
-from ._http import http
+from ._query import (
+    scalar_query_response,
+    _QueryVariable,
+    _add_variable,
+    _serialize_operation_definition,
+)
+from ._http import current_client
+from ._model import model_encoder
+from ._lazy import materialize
+from ._instrument import instrumented, current_call
 
-# mutate request is a tuple of mutate name, mutate data, response query
-MutateRequestSchema: TypeAlias = tuple[str, dict, Optional[str | tuple[str, ...]]]
+# mutate request is a tuple of mutate name, mutate data (dict or model
+# instance that its fields are the arguments), response query
+MutateRequestSchema: TypeAlias = tuple[
+    str, dict | BaseModel, Optional[str | tuple[str, ...]]
+]
 
 
 class _MutateSerializer:
-    __slots__ = ("_mutates",)
+    __slots__ = ("_mutates", "_variables")
 
     def __init__(self, mutates: tuple[MutateRequestSchema, ...]) -> None:
         self._mutates = mutates
+        self._variables: dict[str, str] = {}
 
     def serialize(self) -> str:
-        return "".join(self._serialize_mutate_dict())
+        call = current_call()
+        if call is None:
+            mutate_str = self._serialize()
+        else:
+            started = time.perf_counter()
+            mutate_str = self._serialize()
+            call.add_phase("serialize", time.perf_counter() - started)
+        return mutate_str
+
+    def _serialize(self) -> str:
+        # the variables definitions are known only
+        # after the mutations were serialized
+        body = "".join(self._serialize_mutate_dict())
+        return (
+            "".join(_serialize_operation_definition("mutation", self._variables)) + body
+        )
 
     def _serialize_mutate_dict(self) -> Generator[str, None, None]:
-        yield "mutation{"
-        for mutate_name, mutate_data, return_query in self._mutates:
-            yield mutate_name
-            yield "("
-            yield from self._serialize_dict(mutate_data)
-            yield ")"
-
-            if return_query is None:
-                yield "{}"
-            elif isinstance(return_query, (tuple, list, set)):
-                yield "{"
-                yield ",".join(return_query)
-                yield "}"
-            else:
-                yield return_query
+        yield "{"
+        for mutate in self._mutates:
+            yield from self._serialize_mutate(mutate)
         yield "}"
 
-    def _serialize_dict(self, dict_: dict) -> Generator[str, None, None]:
-        first = True
-        for key, value in dict_.items():
-            if not first:
-                yield ","
-            first = False
+    def _serialize_mutate(
+        self, mutate: MutateRequestSchema, alias: Optional[str] = None
+    ) -> Generator[str, None, None]:
+        mutate_name, mutate_data, return_query = mutate
+        if alias is not None:
+            yield f"{alias}:"
+
+        yield mutate_name
+        yield "("
+        yield self._serialize_arguments(mutate_data)
+        yield ")"
 
-            yield from self._serialize_dict_key(key)
-            yield ":"
-            yield from self._serialize_dict_value(value)
+        if return_query is None:
+            yield "{}"
+        elif isinstance(return_query, (tuple, list, set)):
+            yield "{"
+            yield ",".join(return_query)
+            yield "}"
+        else:
+            yield return_query
 
-    def _serialize_dict_key(self, key: Any) -> Generator[str, None, None]:
-        if isinstance(key, str):
-            yield key
+    def _serialize_arguments(self, data: dict | BaseModel) -> str:
+        """mutation arguments, a model instance fields are used as the arguments"""
+        parts: list[str] = []
+        if isinstance(data, BaseModel):
+            self._encode_model_fields(data, parts)
         else:
-            raise ValueError(
-                f"mutate dict key cannot be of value `{type(key).__name__}`"
-            )
+            self._encode_dict_fields(data, parts)
+        return "".join(parts)
 
-    def _serialize_dict_value(self, value: Any) -> Generator[str, None, None]:
-        if isinstance(value, str):
-            yield f'"{value}"'
-        elif isinstance(value, int):
-            yield str(value)
-        elif isinstance(value, bool):
-            yield str(value).lower()
+    def _encode_value(self, value: Any, parts: list[str]) -> None:
+        encoder = _SCALAR_ENCODERS.get(type(value))
+        if encoder is not None:
+            parts.append(encoder(value))
+        elif isinstance(value, BaseModel):
+            parts.append("{")
+            self._encode_model_fields(value, parts)
+            parts.append("}")
         elif isinstance(value, dict):
-            yield "{"
-            yield from self._serialize_dict(value)
-            yield "}"
+            parts.append("{")
+            self._encode_dict_fields(value, parts)
+            parts.append("}")
+        elif isinstance(value, (list, tuple)):
+            parts.append("[")
+            for i, item in enumerate(value):
+                if i:
+                    parts.append(",")
+                self._encode_value(item, parts)
+            parts.append("]")
+        elif isinstance(value, _QueryVariable):
+            _add_variable(self._variables, value)
+            parts.append(f"${value.name}")
+        elif isinstance(value, enum.Enum):
+            # graphql enum values are written as names, without quotes
+            parts.append(value.name)
+        elif isinstance(value, str):
+            parts.append(_encode_str(value))
+        elif isinstance(value, int):
+            parts.append(_encode_int(value))
+        elif isinstance(value, float):
+            parts.append(_encode_float(value))
         else:
             raise ValueError(
                 f"couldn't serialize mutate dict value of type `{type(value).__name__}`"
             )
 
+    def _encode_dict_fields(self, dict_: dict, parts: list[str]) -> None:
+        first = True
+        for key, value in dict_.items():
+            if not isinstance(key, str):
+                raise ValueError(
+                    f"mutate dict key cannot be of value `{type(key).__name__}`"
+                )
+            if not first:
+                parts.append(",")
+            first = False
+
+            parts.append(key)
+            parts.append(":")
+            self._encode_value(value, parts)
+
+    def _encode_model_fields(self, instance: BaseModel, parts: list[str]) -> None:
+        """
+        model fields are serialized by their query name, `None` fields
+        that were not explicitly set are omitted
+        """
+        # lazy views are not instances of their model type
+        instance = materialize(instance)
+        values = instance.__dict__
+        fields_set = instance.model_fields_set
+        first = True
+
+        for field_name, query_name in model_encoder(type(instance)).fields:
+            value = values.get(field_name)
+            if value is None and field_name not in fields_set:
+                continue
+            if not first:
+                parts.append(",")
+            first = False
+
+            parts.append(query_name)
+            parts.append(":")
+            self._encode_value(value, parts)
+
+
+# json strings escaping is valid graphql strings escaping, the
+# c implementation doesn't create an encoder for every string
+_encode_str: Callable[[str], str] = encode_basestring
+
+
+def _encode_bool(value: bool) -> str:
+    return "true" if value else "false"
+
+
+def _encode_int(value: int) -> str:
+    return int.__repr__(value)
+
+
+def _encode_float(value: float) -> str:
+    if not math.isfinite(value):
+        raise ValueError(f"couldn't serialize mutate float value `{value}`")
+    return float.__repr__(value)
+
+
+def _encode_null(_: None) -> str:
+    return "null"
+
+
+# encoders of exact types, checked before the slower
+# `isinstance` checks of the other input values
+_SCALAR_ENCODERS: dict[type, Callable[[Any], str]] = {
+    str: _encode_str,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    type(None): _encode_null,
+}
+
+
+def _plain_return_queries(mutates: tuple[MutateRequestSchema, ...]) -> bool:
+    """
+    returns if the mutations return queries are plain field names, aliased fields
+    and fields with arguments can't be merged into the entity cache
+    """
+    for _, _, return_query in mutates:
+        if return_query is None:
+            continue
+        if not isinstance(return_query, (tuple, list, set)):
+            return False
+        for field in return_query:
+            if not isinstance(field, str) or ":" in field or "(" in field:
+                return False
+    return True
+
 
 def mutate(*mutates: MutateRequestSchema) -> str:
     """takes python mutate schema and returns graphql mutation query"""
     return _MutateSerializer(mutates).serialize()
 
 
-def mutate_response(*mutates: MutateRequestSchema) -> QueryResponseDict:
+@instrumented("mutation")
+def mutate_response(
+    *mutates: MutateRequestSchema, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
     """takes python mutate schema, send it via http, scalarize the query response"""
     mutate_str = _MutateSerializer(mutates).serialize()
-    return http.request(mutate_str)
+    return current_client().request(mutate_str, variables)
 
 
+@instrumented("mutation")
 def mutate_response_scalar(
     *mutates: MutateRequestSchema,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
 ) -> dict[str, BaseModel | list[BaseModel]]:
-    response = mutate_response(*mutates)
-    return scalar_query_response(response)
+    """
+    mutation response scalared to the models, when the entity cache of the client
+    is enabled the returned objects are merged into the cache
+    """
+    response = mutate_response(*mutates, variables=variables)
+    scalared = scalar_query_response(response, trusted=trusted)
+    entity_cache = current_client().entity_cache
+    if entity_cache.enabled and _plain_return_queries(mutates):
+        entity_cache.write(response["data"])
+    return scalared
 
 
-def raw_mutate_response(mutate_str: str) -> QueryResponseDict:
+@instrumented("mutation")
+def raw_mutate_response(
+    mutate_str: str, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
     """returns the http response for the given mutation query"""
-    return http.request(mutate_str)
+    return current_client().request(mutate_str, variables)
 
 
+@instrumented("mutation")
 def raw_mutate_response_scalar(
     mutate_str: str,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
 ) -> dict[str, BaseModel | list[BaseModel]]:
     """scalarize the http response for the given mutation query"""
-    response = http.request(mutate_str)
-    return scalar_query_response(response)
+    response = current_client().request(mutate_str, variables)
+    return scalar_query_response(response, trusted=trusted)
+
+
+@instrumented("mutation")
+async def mutate_response_async(
+    *mutates: MutateRequestSchema, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
+    """async version of `mutate_response`, awaits the async request function"""
+    mutate_str = _MutateSerializer(mutates).serialize()
+    return await current_client().request_async(mutate_str, variables)
+
+
+@instrumented("mutation")
+async def mutate_response_scalar_async(
+    *mutates: MutateRequestSchema,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> dict[str, BaseModel | list[BaseModel]]:
+    """async version of `mutate_response_scalar`"""
+    response = await mutate_response_async(*mutates, variables=variables)
+    scalared = scalar_query_response(response, trusted=trusted)
+    entity_cache = current_client().entity_cache
+    if entity_cache.enabled and _plain_return_queries(mutates):
+        entity_cache.write(response["data"])
+    return scalared
+
+
+@instrumented("mutation")
+async def raw_mutate_response_async(
+    mutate_str: str, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
+    """async version of `raw_mutate_response`"""
+    return await current_client().request_async(mutate_str, variables)
+
+
+@instrumented("mutation")
+async def raw_mutate_response_scalar_async(
+    mutate_str: str,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> dict[str, BaseModel | list[BaseModel]]:
+    """async version of `raw_mutate_response_scalar`"""
+    response = await current_client().request_async(mutate_str, variables)
+    return scalar_query_response(response, trusted=trusted)
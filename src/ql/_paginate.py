@@ -0,0 +1,167 @@
+import queue
+import threading
+import contextvars
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional
+from pydantic import BaseModel
+
+from ._http import current_client
+from ._const import QL_QUERY_NAME_ATTR
+from ._query import (
+    _QuerySerializer,
+    _QueryResponseScalar,
+    _QueryFragmentType,
+    arguments as _arguments,
+    variable,
+)
+from ._exceptions import QLErrorResponseException
+from ._typing import QueryResponseDict
+
+# marks that the worker fetched the last page
+_END = object()
+
+
+def paginate(
+    model: type[BaseModel],
+    fields: Iterable[Any],
+    *,
+    connection: Optional[str] = None,
+    arguments: Optional[dict[str, Any]] = None,
+    page_size: int = 100,
+    prefetch: int = 1,
+    fragments: Optional[_QueryFragmentType] = None,
+    trusted: bool = False,
+) -> Iterator[BaseModel]:
+    """
+    iterates over relay style connection (`edges`/`pageInfo`), yielding the scalared
+    nodes, while the nodes of one page are consumed, the next `prefetch` pages
+    are fetched in a background thread
+
+    for user in ql.paginate(User, (ql._(User).name,), connection="users"):
+        ...
+    """
+    if page_size < 1:
+        raise ValueError(f"`page_size` must be a positive int, got `{page_size}`")
+    if prefetch < 0:
+        raise ValueError(f"`prefetch` must be a non negative int, got `{prefetch}`")
+
+    connection = connection or getattr(model, QL_QUERY_NAME_ATTR)
+    query_str = _serialize_connection_query(
+        connection, arguments or {}, fields, fragments or {}
+    )
+    pages = _fetch_pages(connection, query_str, page_size, trusted)
+
+    if prefetch == 0:
+        for nodes in pages:
+            yield from nodes
+        return
+
+    yield from _prefetch_pages(pages, prefetch)
+
+
+def _serialize_connection_query(
+    connection: str,
+    arguments: dict[str, Any],
+    fields: Iterable[Any],
+    fragments: _QueryFragmentType,
+) -> str:
+    """
+    the page size and cursor are sent as variables, so the
+    query string is the same for every page
+    """
+    return _QuerySerializer(
+        (
+            (
+                _arguments(
+                    connection,
+                    **arguments,
+                    first=variable("first", "Int!"),
+                    after=variable("after", "String"),
+                ),
+                (
+                    ("edges", (("node", fields),)),
+                    ("pageInfo", ("hasNextPage", "endCursor")),
+                ),
+            ),
+        ),
+        fragments=fragments,
+        include_typename=True,
+    ).serialize()
+
+
+def _fetch_pages(
+    connection: str, query_str: str, page_size: int, trusted: bool
+) -> Iterator[list[BaseModel]]:
+    scalar = _QueryResponseScalar({}, trusted=trusted)  # type: ignore
+    after = None
+
+    while True:
+        response = current_client().request(
+            query_str, {"first": page_size, "after": after}
+        )
+        page = _connection_page(response, connection)
+
+        yield [
+            scalar._scalar_dict(edge["node"])
+            for edge in page["edges"] or ()
+            if edge is not None and edge.get("node") is not None
+        ]
+
+        page_info = page["pageInfo"]
+        if not page_info["hasNextPage"]:
+            return
+        after = page_info["endCursor"]
+
+
+def _connection_page(response: QueryResponseDict, connection: str) -> dict[str, Any]:
+    errors = response.get("errors")
+    if errors:
+        raise QLErrorResponseException(errors)
+
+    data = response["data"] or {}
+    return data[connection] or {"edges": (), "pageInfo": {"hasNextPage": False}}
+
+
+def _prefetch_pages(
+    pages: Iterator[list[BaseModel]], prefetch: int
+) -> Iterator[BaseModel]:
+    buffer: queue.Queue = queue.Queue()
+    # a slot is taken before fetching a page, and is freed when the consumer
+    # takes the page, so at most `prefetch` pages are fetched ahead
+    slots = threading.Semaphore(prefetch)
+    stop = threading.Event()
+
+    def acquire() -> bool:
+        # wake up every now and then, to check if the consumer stopped iterating
+        while not stop.is_set():
+            if slots.acquire(timeout=0.1):
+                return True
+        return False
+
+    def fetch() -> None:
+        try:
+            while acquire():
+                nodes = next(pages, _END)
+                buffer.put(nodes)
+                if nodes is _END:
+                    return
+        except BaseException as e:
+            buffer.put(e)
+
+    # the worker runs with the caller context, so context
+    # scoped settings apply to the prefetch requests
+    context = contextvars.copy_context()
+    worker = threading.Thread(target=context.run, args=(fetch,), daemon=True)
+    worker.start()
+
+    try:
+        while True:
+            item = buffer.get()
+            slots.release()
+            if item is _END:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield from item
+    finally:
+        stop.set()
@@ -0,0 +1,175 @@
+import time
+import random
+import threading
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import namedtuple
+from typing import Any, Callable, Iterator, Optional, TypeVar
+
+from ._exceptions import QLHTTPException, QLDeadlineExceeded
+
+T = TypeVar("T")
+
+RetryStats = namedtuple(
+    "RetryStats", ("retries", "retries_won", "hedges", "hedges_won", "deadlines")
+)
+
+# http statuses that mean the request may succeed if sent again
+_RETRYABLE_STATUSES = frozenset((408, 429, 500, 502, 503, 504))
+
+
+class RetryPolicy:
+    """
+    retries failed requests with jittered exponential backoff, the delay before retry
+    `n` (starting from `0`) is random between `0` and `min(max_backoff, backoff * 2 ** n)`,
+    mutations are not retried unless `retry_mutations` is set, because they may be
+    applied even if the response didn't arrive
+
+    ql.http.set_retry_policy(ql.RetryPolicy(attempts=3, backoff=0.1))
+    """
+
+    __slots__ = ("attempts", "backoff", "max_backoff", "retry_mutations", "_retry_on")
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.1,
+        max_backoff: float = 2.0,
+        *,
+        retry_mutations: bool = False,
+        retry_on: Optional[Callable[[BaseException], bool]] = None,
+    ) -> None:
+        if attempts < 1:
+            raise ValueError(f"`attempts` must be a positive int, got `{attempts}`")
+        if backoff < 0 or max_backoff < 0:
+            raise ValueError(
+                f"`backoff` and `max_backoff` must not be negative, got `{backoff}` and `{max_backoff}`"
+            )
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_mutations = retry_mutations
+        self._retry_on = retry_on
+
+    def should_retry(self, exception: BaseException) -> bool:
+        """
+        by default connection errors, timeouts and http statuses that
+        mean the server is temporarily unavailable are retried
+        """
+        if isinstance(exception, QLDeadlineExceeded):
+            return False
+        if self._retry_on is not None:
+            return self._retry_on(exception)
+        if isinstance(exception, QLHTTPException):
+            return exception.status in _RETRYABLE_STATUSES
+        return isinstance(exception, (ConnectionError, TimeoutError))
+
+    def delay(self, retry: int) -> float:
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**retry))
+
+    def __repr__(self) -> str:
+        return f"RetryPolicy(attempts={self.attempts}, backoff={self.backoff}, max_backoff={self.max_backoff})"
+
+
+class HedgePolicy:
+    """
+    when a query doesn't respond after `delay` seconds, the same query is sent again
+    (at most `max_hedges` more times) and the first response is used, mutations are
+    never hedged, the slower requests are not cancelled (async requests are)
+
+    the sync hedged requests are sent from a pool of at most `max_workers` threads,
+    when all of them are busy, requests are not hedged
+
+    ql.http.set_hedge_policy(ql.HedgePolicy(delay=0.2))
+    """
+
+    __slots__ = ("delay", "max_hedges", "max_workers", "_executor", "_lock", "_slots")
+
+    def __init__(self, delay: float, max_hedges: int = 1, max_workers: int = 8) -> None:
+        if delay < 0:
+            raise ValueError(f"`delay` must not be negative, got `{delay}`")
+        if max_hedges < 1:
+            raise ValueError(f"`max_hedges` must be a positive int, got `{max_hedges}`")
+        if max_workers < 1:
+            raise ValueError(
+                f"`max_workers` must be a positive int, got `{max_workers}`"
+            )
+        self.delay = delay
+        self.max_hedges = max_hedges
+        self.max_workers = max_workers
+        # created on first hedge
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def _submit(self, func: Callable[..., T], *args: Any) -> Optional[Future[T]]:
+        """
+        runs the hedged request in the pool with the caller context, returns `None`
+        without queueing when all the workers are busy
+        """
+        if not self._slots.acquire(blocking=False):
+            return None
+
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.max_workers, thread_name_prefix="ql-hedge"
+                    )
+        # the request runs with the caller context, so the deadline applies
+        future = self._executor.submit(contextvars.copy_context().run, func, *args)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def __repr__(self) -> str:
+        return f"HedgePolicy(delay={self.delay}, max_hedges={self.max_hedges}, max_workers={self.max_workers})"
+
+
+# monotonic time until the current call must end
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar(
+    "ql_deadline", default=None
+)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[None]:
+    """
+    requests sent in this context must end in `seconds`, or raise `ql.QLDeadlineExceeded`,
+    including retries and hedged requests, the built-in transport uses the remaining
+    time as the socket timeout, nested deadlines can only make the deadline shorter
+
+    with ql.deadline(0.5):
+        ql.query_response_scalar(...)
+    """
+    ends_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(ends_at if current is None else min(current, ends_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    returns the seconds left until the current deadline, `None` if there is no
+    deadline, custom request functions can use it as their request timeout
+    """
+    ends_at = _deadline.get()
+    if ends_at is None:
+        return None
+    return ends_at - time.monotonic()
+
+
+def request_timeout(timeout: Optional[float]) -> Optional[float]:
+    """
+    returns the smaller of the given timeout and the remaining time,
+    raises `ql.QLDeadlineExceeded` if the deadline already passed
+    """
+    remaining = remaining_time()
+    if remaining is None:
+        return timeout
+    if remaining <= 0:
+        raise QLDeadlineExceeded()
+    return remaining if timeout is None else min(timeout, remaining)
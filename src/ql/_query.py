@@ -1,15 +1,31 @@
 import enum
+import time
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from inspect import isclass
 from itertools import chain
 from collections.abc import Iterable
-from typing import Generator, Optional, TypeAlias, Any
+from typing import Generator, Optional, TypeAlias, Any, ForwardRef, get_args
 from pydantic import BaseModel
 
-from ._http import http
-from ._const import QL_QUERY_NAME_ATTR, QL_TYPENAME_ATTR
-from ._model import typename, all_models, query_fields_nt
+from ._http import current_client
+from ._cache import query_cache, _EntityCache, _Selection
+from ._instrument import instrumented, current_call
+from ._const import QL_QUERY_NAME_ATTR, QL_TYPENAME_ATTR, QL_SELECTIONS_ATTR
+from ._model import (
+    typename,
+    model_decoder,
+    current_registry,
+    Registry,
+    model_implements,
+    query_fields_nt,
+    models_version,
+    _FieldKind,
+)
+from ._lazy import LazyModel
 from ._exceptions import QLErrorResponseException
-from ._typing import QueryResponseDict
+from ._typing import QueryResponseDict, QueryErrorDict
 
 
 class _Placeholder(BaseModel):
@@ -41,13 +57,15 @@ _ALLOWED_MODEL_OPERATIONS = (
 
 
 class _QueryOperation:
-    __slots__ = ("op", "model", "extra")
+    __slots__ = ("op", "model", "extra", "alias", "name")
 
     def __init__(
         self,
         op: _QueryOperationType,
         model: type[BaseModel],
         extra: dict[Any, Any] = {},
+        alias: Optional[str] = None,
+        name: Optional[str] = None,
     ) -> None:
         if not issubclass(model, BaseModel):
             raise TypeError(
@@ -56,6 +74,10 @@ class _QueryOperation:
         self.op = op
         self.model = model
         self.extra = extra
+        self.alias = alias
+        # field name used instead of the model query name,
+        # for querying fields with arguments
+        self.name = name
 
 
 QueryRequestSchema: TypeAlias = tuple[
@@ -67,8 +89,31 @@ _QueryFragmentType: TypeAlias = dict[
 ]
 
 
+class _QueryVariable:
+    """placeholder for graphql variable, serialized as `$name`"""
+
+    __slots__ = ("name", "type")
+
+    def __init__(self, name: str, type_: str) -> None:
+        self.name = name
+        self.type = type_
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, _QueryVariable)
+            and self.name == other.name
+            and self.type == other.type
+        )
+
+    def __hash__(self) -> int:
+        return hash((self.name, self.type))
+
+    def __repr__(self) -> str:
+        return f"variable({self.name!r}, {self.type!r})"
+
+
 class _QuerySerializer:
-    __slots__ = ("_query", "_fragments", "_include_typename")
+    __slots__ = ("_query", "_fragments", "_include_typename", "_variables")
 
     def __init__(
         self,
@@ -79,15 +124,68 @@ class _QuerySerializer:
         self._query = query_models
         self._fragments = fragments
         self._include_typename = include_typename
+        # variables used in the query, mapping between
+        # the variable name to the variable type
+        self._variables: dict[str, str] = {}
 
     def serialize(self) -> str:
-        return "".join(self._serialize_query())
+        call = current_call()
+        if call is None:
+            query_str = self._cached_serialize()
+        else:
+            started = time.perf_counter()
+            query_str = self._cached_serialize()
+            call.add_phase("serialize", time.perf_counter() - started)
+        return query_str
+
+    def _cached_serialize(self) -> str:
+        if not query_cache.enabled:
+            return self._serialize()
+
+        try:
+            key = self._fingerprint()
+            cached = query_cache.get(key)
+        except _UncacheableQuery:
+            return self._serialize()
+
+        if cached is None:
+            query_str = self._serialize()
+            query_cache.set(key, (query_str, self._variables.copy()))
+            return query_str
+
+        # the variables are known only after serializing, so they
+        # are cached with the query string for the callers that read them
+        query_str, variables = cached
+        self._variables.update(variables)
+        return query_str
+
+    def _serialize(self) -> str:
+        # the variables definitions are known only
+        # after the query body was serialized
+        body = "".join(self._serialize_query())
+        return "".join(_serialize_operation_definition("query", self._variables)) + body
+
+    def _fingerprint(self) -> tuple:
+        """
+        returns hashable structural representation of the query, two queries
+        with the same fingerprint serialize to the same string
+        """
+        return (
+            self._include_typename,
+            tuple(_fingerprint_field(model_query) for model_query in self._query),
+            tuple(
+                (fragment_data, _fingerprint_fields(fragment_query))
+                for fragment_data, fragment_query in self._fragments.items()
+            ),
+        )
 
     def _serialize_query(self) -> Generator[str, None, None]:
         yield "{"
         for model_query in self._query:
             yield from self._serialize_model_query(model_query)
+        yield "}"
 
+        # fragments are defined next to the operation, not inside it
         for fragment_data, fragment_query in self._fragments.items():
             name, model = fragment_data
             if (typename_ := typename(model)) is None:
@@ -96,8 +194,9 @@ class _QuerySerializer:
                 )
 
             yield f"fragment {name} on {typename_}"
+            yield "{"
             yield from self._serialize_model_fields(fragment_query)
-        yield "}"
+            yield "}"
 
     def _serialize_model_query(
         self, model_query: QueryRequestSchema
@@ -180,21 +279,268 @@ class _QuerySerializer:
             __typename__ = getattr(operation.model, QL_TYPENAME_ATTR)
             yield f"...on {__typename__}"
         elif operation.op is _QueryOperationType.ARGUMENTS:
-            query_name = getattr(operation.model, QL_QUERY_NAME_ATTR)
-            arguments = ",".join(f'{k}:"{v}"' for k, v in operation.extra.items())
-            yield f"{query_name}({arguments})"
+            if operation.alias is not None:
+                yield f"{operation.alias}:"
+
+            query_name = operation.name or getattr(operation.model, QL_QUERY_NAME_ATTR)
+            if operation.extra:
+                arguments = ",".join(
+                    self._serialize_argument(k, v) for k, v in operation.extra.items()
+                )
+                yield f"{query_name}({arguments})"
+            else:
+                yield query_name
         elif operation.op is _QueryOperationType.REFERENCE_FRAGMENT:
             yield f"...{operation.extra['fragment_name']}"
 
+    def _serialize_argument(self, key: str, value: Any) -> str:
+        if isinstance(value, _QueryVariable):
+            _add_variable(self._variables, value)
+            return f"{key}:${value.name}"
+        return f'{key}:"{value}"'
+
+
+def _add_variable(variables: dict[str, str], variable: _QueryVariable) -> None:
+    defined_type = variables.setdefault(variable.name, variable.type)
+    if defined_type != variable.type:
+        raise ValueError(
+            f"variable `${variable.name}` is defined with different types, `{defined_type}` and `{variable.type}`"
+        )
+
+
+def _serialize_operation_definition(
+    operation: str, variables: dict[str, str]
+) -> Generator[str, None, None]:
+    yield operation
+    if variables:
+        yield "("
+        yield ",".join(f"${name}:{type_}" for name, type_ in variables.items())
+        yield ")"
+
+
+class _UncacheableQuery(Exception):
+    """raised when a query structure cannot be safely fingerprinted"""
+
+
+_STR_TYPE_SET = {str}
+
+
+def _fingerprint_fields(fields: Any) -> Any:
+    if isinstance(fields, str):
+        return fields
+    if isinstance(fields, _QueryOperation):
+        return (_fingerprint_field(fields),)
+    # generators and other one shot iterables are consumed by the
+    # serializer, so we can't walk them beforehand
+    if not isinstance(fields, (tuple, list, set, frozenset)):
+        raise _UncacheableQuery()
+    # tuple of plain field names is already its own fingerprint,
+    # `map` keeps the check out of the python loop
+    if type(fields) is tuple and set(map(type, fields)) == _STR_TYPE_SET:
+        return fields
+    return tuple(_fingerprint_field(field) for field in fields)
+
+
+def _fingerprint_field(field: Any) -> Any:
+    if isinstance(field, str) or isclass(field):
+        return field
+    elif isinstance(field, _QueryOperation):
+        try:
+            extra = tuple((k, type(v), v) for k, v in field.extra.items())
+            hash(extra)
+        except TypeError:
+            raise _UncacheableQuery()
+        return (
+            _QueryOperation,
+            field.op,
+            field.model,
+            extra,
+            field.alias,
+            field.name,
+        )
+    elif isinstance(field, (tuple, list)) and len(field) == 2:
+        model_or_op, fields = field
+        return (
+            type(field),
+            _fingerprint_field(model_or_op),
+            _fingerprint_fields(fields),
+        )
+    elif isinstance(field, (tuple, list, set, frozenset)):
+        return (type(field), _fingerprint_fields(field))
+    raise _UncacheableQuery()
+
+
+def _compile_selection(fields: Any, fragments: _QueryFragmentType) -> _Selection:
+    """
+    returns the fields selection used for reading the entity cache, fields
+    with arguments or aliases are stored under different response names, so
+    queries with them raise `_UncacheableQuery`
+    """
+    if isinstance(fields, (str, _QueryOperation)):
+        fields = (fields,)
+    elif not isinstance(fields, (tuple, list, set, frozenset)):
+        # one shot iterables are consumed by the serializer
+        raise _UncacheableQuery()
+
+    selection = _Selection()
+    for field in fields:
+        if isinstance(field, str):
+            selection.fields.setdefault(field, None)
+        elif isinstance(field, _QueryOperation):
+            if field.op is not _QueryOperationType.REFERENCE_FRAGMENT:
+                raise _UncacheableQuery()
+            selection.conditions.append(
+                _compile_fragment_selection(field.extra["fragment_name"], fragments)
+            )
+        elif isinstance(field, (tuple, list)) and len(field) == 2:
+            model_or_op, sub_fields = field
+            if (
+                isinstance(model_or_op, _QueryOperation)
+                and model_or_op.op is _QueryOperationType.INLINE_FRAGMENT
+            ):
+                selection.conditions.append(
+                    (
+                        _model_typenames(model_or_op.model),
+                        _compile_selection(sub_fields, fragments),
+                    )
+                )
+                continue
+
+            name = _selection_field_name(model_or_op)
+            if selection.fields.get(name) is not None:
+                raise _UncacheableQuery()
+            selection.fields[name] = _compile_selection(sub_fields, fragments)
+        else:
+            raise _UncacheableQuery()
+    return selection
+
+
+def _compile_fragment_selection(
+    name: str, fragments: _QueryFragmentType
+) -> tuple[frozenset[str], _Selection]:
+    for (fragment_name, model), fragment_fields in fragments.items():
+        if fragment_name == name:
+            return _model_typenames(model), _compile_selection(
+                fragment_fields, fragments
+            )
+    raise _UncacheableQuery()
+
+
+def _selection_field_name(model_or_op: Any) -> str:
+    if isinstance(model_or_op, str):
+        return model_or_op
+    if isclass(model_or_op):
+        return getattr(model_or_op, QL_QUERY_NAME_ATTR)
+    if (
+        isinstance(model_or_op, _QueryOperation)
+        and model_or_op.op is _QueryOperationType.ARGUMENTS
+        and not model_or_op.extra
+        and model_or_op.alias is None
+    ):
+        return model_or_op.name or getattr(model_or_op.model, QL_QUERY_NAME_ATTR)
+    raise _UncacheableQuery()
+
+
+def _model_typenames(model: type[BaseModel]) -> frozenset[str]:
+    """returns the typenames of the model and the models that implement it"""
+    return frozenset((getattr(model, QL_TYPENAME_ATTR), *model_implements(model)))
+
+
+def _entity_cache_selections(
+    query_models: tuple[QueryRequestSchema, ...], fragments: _QueryFragmentType
+) -> Optional[list[_Selection]]:
+    """returns the selection of every query root, `None` if the query can't be cached"""
+    try:
+        return [_compile_selection(fields, fragments) for _, fields in query_models]
+    except _UncacheableQuery:
+        return None
+
+
+def _read_entity_cache(
+    entity_cache: _EntityCache,
+    query_models: tuple[QueryRequestSchema, ...],
+    selections: list[_Selection],
+    variables: Optional[dict[str, Any]],
+) -> Optional[QueryResponseDict]:
+    """
+    returns the query response built from the entity cache, only queries that all
+    their roots are queried by id, like `ql.arguments(User, id=1)`, can be answered
+    """
+    data = {}
+
+    for (model_or_op, _), selection in zip(query_models, selections):
+        if (
+            not isinstance(model_or_op, _QueryOperation)
+            or model_or_op.op is not _QueryOperationType.ARGUMENTS
+            or model_or_op.name is not None
+            or model_or_op.extra.keys() != {entity_cache.id_field}
+        ):
+            return None
+
+        id_ = model_or_op.extra[entity_cache.id_field]
+        if isinstance(id_, _QueryVariable):
+            id_ = (variables or {}).get(id_.name)
+        if id_ is None:
+            return None
+
+        value = entity_cache.read(_model_typenames(model_or_op.model), id_, selection)
+        if value is None:
+            return None
+
+        root_key = model_or_op.alias or getattr(model_or_op.model, QL_QUERY_NAME_ATTR)
+        data[root_key] = value
+    return {"data": data}
+
 
 class _QueryResponseScalar:
-    __slots__ = ("_query_response", "_typename_to_models")
+    __slots__ = (
+        "_query_response",
+        "_typename_to_models",
+        "_trusted",
+        "_lazy",
+        "_typename_counts",
+    )
 
-    def __init__(self, query_response: QueryResponseDict) -> None:
+    def __init__(
+        self,
+        query_response: QueryResponseDict,
+        trusted: bool = False,
+        lazy: bool = False,
+        registry: Optional[Registry] = None,
+    ) -> None:
+        if registry is None:
+            registry = current_registry()
         self._query_response = query_response
-        self._typename_to_models = all_models()
+        # the registry models by reference, without copying them
+        self._typename_to_models = registry.typename_map
+        # when trusted, the response is known to match the models
+        # so instances are created without validation
+        self._trusted = trusted
+        # when lazy, the root objects are returned as views
+        # that are scalared on first attribute access
+        self._lazy = lazy
+        # amount of scalared objects per typename, counted
+        # only when the call is instrumented
+        self._typename_counts: Optional[dict[str, int]] = None
 
     def scalar(self) -> dict[str, BaseModel | list[BaseModel]]:
+        call = current_call()
+        if call is None:
+            return self._scalar()
+
+        # counted locally and merged, the call may
+        # be scalaring responses in other threads
+        self._typename_counts = {}
+        started = time.perf_counter()
+        try:
+            return self._scalar()
+        finally:
+            call.add_phase("decode", time.perf_counter() - started)
+            call.add_typename_counts(self._typename_counts)
+            # lazy views scalared after the call are not counted
+            self._typename_counts = None
+
+    def _scalar(self) -> dict[str, BaseModel | list[BaseModel]]:
         errors = self._query_response.get("errors")
 
         if errors is not None:
@@ -207,24 +553,41 @@ class _QueryResponseScalar:
         self, dict_: dict[Any, Any]
     ) -> dict[str, BaseModel | list[BaseModel]]:
         scalared = {}
+        if self._lazy:
+            scalar_dict = self._lazy_decoder()._lazy_dict
+        else:
+            scalar_dict = self._scalar_dict
 
         for model_key_name, values in dict_.items():
             if isinstance(values, dict):
-                scalared[model_key_name] = self._scalar_dict(values)
+                scalared[model_key_name] = scalar_dict(values)
             elif isinstance(values, list):
-                scalared[model_key_name] = []
-                for value in values:
-                    scalared[model_key_name].append(self._scalar_dict(value))
+                scalared[model_key_name] = [scalar_dict(value) for value in values]
             else:
                 scalared[model_key_name] = values
         return scalared
 
-    def _scalar_dict(self, dict_: dict[str, Any]) -> BaseModel:
+    def _lazy_dict(self, dict_: dict[str, Any]) -> LazyModel:
+        """returns a view that scalars the dict only when accessed"""
+        _, scalar_model = self._dict_model(dict_)
+        return LazyModel(scalar_model, dict_, self._scalar_dict)
+
+    def _lazy_decoder(self) -> "_QueryResponseScalar":
         """
-        takes a dictionary, and for every nested dict, it means it is a model,
-        scalar that model to the correct type
+        returns a scalar without the query response, so the lazy views
+        don't keep the whole response alive, only their own dicts
         """
-        typename = dict_.pop("__typename", None)
+        decoder = _QueryResponseScalar.__new__(_QueryResponseScalar)
+        decoder._query_response = None  # type: ignore
+        decoder._typename_to_models = self._typename_to_models
+        decoder._trusted = self._trusted
+        decoder._lazy = False
+        decoder._typename_counts = None
+        return decoder
+
+    def _dict_model(self, dict_: dict[str, Any]) -> tuple[str, type[BaseModel]]:
+        """returns the response object typename and its registered model"""
+        typename = dict_.get("__typename")
         if typename is None:
             raise ValueError(
                 "couldn't scalar response, expected for sub fields to include the `__typename` field, "
@@ -237,59 +600,317 @@ class _QueryResponseScalar:
             raise ValueError(
                 f"couldn't scalar query response, couldn't find required module, typename `{typename}` in requested query"
             )
+        return typename, scalar_model
 
-        scalared_fields = {}
-
-        for key, value in dict_.items():
-            if isinstance(value, dict):
-                scalared_fields[key] = self._scalar_dict(value)
-            elif isinstance(value, list):
-                # if it is an empty list or the values inside
-                # the list are not nested dicts, then it is some other type
-                # that should be not scalared by us
-                if len(value) == 0 or not isinstance(value[0], dict):
-                    scalared_fields[key] = value
-                    continue
-
-                scalared_fields[key] = []
-                for sub_dict in value:
-                    scalared_fields[key].append(self._scalar_dict(sub_dict))
-            else:
-                scalared_fields[key] = value
-        return self._instantiate_model(scalar_model, scalared_fields)
-
-    def _instantiate_model(
-        self, model: type[BaseModel], fields: dict[str, Any]
-    ) -> BaseModel:
+    def _scalar_dict(self, dict_: dict[str, Any]) -> BaseModel:
         """
-        create a new instance of the model with respect to the model's field metadata,
-        it is expected that field that expect models will already be initilized,
-        and not relay on `pydantic` for it
+        takes a dictionary, and for every nested dict, it means it is a model,
+        scalar that model to the correct type
         """
-        queryable_fields = query_fields_nt(model)._asdict()
-        query_field_name_to_model_field_name = {
-            v: k for k, v in queryable_fields.items()
-        }
+        typename, scalar_model = self._dict_model(dict_)
+
+        counts = self._typename_counts
+        if counts is not None:
+            counts[typename] = counts.get(typename, 0) + 1
+
+        decoder = model_decoder(scalar_model)
+        decoder_fields = decoder.fields
         model_init_kwargs = {}
 
-        for field_name, value in fields.items():
-            if field_name in query_field_name_to_model_field_name:
-                model_field_name = query_field_name_to_model_field_name[field_name]
-                model_init_kwargs[model_field_name] = value
-            else:
+        for key, value in dict_.items():
+            field = decoder_fields.get(key)
+
+            if field is None:
+                if key != "__typename":
+                    model_init_kwargs[key] = self._scalar_value(value)
+                continue
+
+            field_name, kind = field
+            if kind is _FieldKind.PLAIN or value is None:
                 model_init_kwargs[field_name] = value
-        return model(**model_init_kwargs)
+            elif kind is _FieldKind.MODEL:
+                model_init_kwargs[field_name] = self._scalar_dict(value)
+            elif kind is _FieldKind.MODEL_LIST:
+                model_init_kwargs[field_name] = [
+                    None if sub_dict is None else self._scalar_dict(sub_dict)
+                    for sub_dict in value
+                ]
+            else:
+                model_init_kwargs[field_name] = self._scalar_value(value)
+
+        if self._trusted:
+            return decoder.construct(model_init_kwargs)
+        return scalar_model(**model_init_kwargs)
+
+    def _scalar_value(self, value: Any) -> Any:
+        """scalar value that its type couldn't be determined from the model annotations"""
+        if isinstance(value, dict):
+            return self._scalar_dict(value)
+        elif isinstance(value, list):
+            # if it is an empty list or the values inside
+            # the list are not nested dicts, then it is some other type
+            # that should be not scalared by us
+            if len(value) == 0 or not isinstance(value[0], dict):
+                return value
+            return [self._scalar_dict(sub_dict) for sub_dict in value]
+        return value
+
+
+def _alias(index: int) -> str:
+    return f"_{index}"
+
+
+def _split_errors(
+    response: QueryResponseDict,
+) -> tuple[dict[Any, list[QueryErrorDict]], list[QueryErrorDict]]:
+    """
+    returns the response errors of every root alias (by the first path
+    element), and the errors without path that apply to all the aliases
+    """
+    errors_by_alias: dict[Any, list[QueryErrorDict]] = {}
+    global_errors: list[QueryErrorDict] = []
+
+    for error in response.get("errors") or ():
+        path = error.get("path")
+        if path:
+            errors_by_alias.setdefault(path[0], []).append(error)
+        else:
+            global_errors.append(error)
+    return errors_by_alias, global_errors
+
 
+# maximum amount of roots that are sent at the same time when fanning out
+_FAN_OUT_MAX_WORKERS = 16
 
-def arguments(model: type[BaseModel], /, **kwargs) -> _QueryOperation:
+
+def _fan_out_documents(
+    query_models: tuple[QueryRequestSchema, ...],
+    fragments: _QueryFragmentType,
+    include_typename: bool,
+    variables: Optional[dict[str, Any]],
+) -> list[tuple[str, Optional[dict[str, Any]]]]:
+    """
+    serializes every root to its own document, with only the
+    fragments and the variables that the root uses
+    """
+    # fields are walked before they are serialized, so
+    # one shot iterables like generators must be collected
+    fragments = {
+        fragment_data: _collect_fields(fragment_query)
+        for fragment_data, fragment_query in fragments.items()
+    }
+    fragments_by_name = {fragment_data[0]: fragment_data for fragment_data in fragments}
+    documents = []
+
+    for model_query in _collect_fields(query_models):
+        used: set[tuple[str, type[BaseModel]]] = set()
+        pending = list(_fragment_references(model_query))
+        while pending:
+            name = pending.pop()
+            fragment_data = fragments_by_name.get(name)
+            if fragment_data is None or fragment_data in used:
+                continue
+            used.add(fragment_data)
+            pending.extend(_fragment_references(fragments[fragment_data]))
+
+        # keep the fragments definition order
+        root_fragments = {
+            data: query for data, query in fragments.items() if data in used
+        }
+        serializer = _QuerySerializer(
+            (model_query,), fragments=root_fragments, include_typename=include_typename
+        )
+        query_string = serializer.serialize()
+
+        root_variables = None
+        if variables is not None:
+            root_variables = {
+                name: value
+                for name, value in variables.items()
+                if name in serializer._variables
+            }
+        documents.append((query_string, root_variables))
+    return documents
+
+
+def _collect_fields(fields: Any) -> Any:
+    """collects the fields iterables (like generators) to tuples"""
+    if (
+        isinstance(fields, (str, _QueryOperation))
+        or isclass(fields)
+        or not isinstance(fields, Iterable)
+    ):
+        return fields
+    return tuple(_collect_fields(field) for field in fields)
+
+
+def _fragment_references(fields: Any) -> Generator[str, None, None]:
+    """yields the names of the fragments that are referenced in the fields"""
+    if isinstance(fields, _QueryOperation):
+        if fields.op is _QueryOperationType.REFERENCE_FRAGMENT:
+            yield fields.extra["fragment_name"]
+        return
+    if isinstance(fields, str) or not isinstance(fields, Iterable):
+        return
+    for field in fields:
+        yield from _fragment_references(field)
+
+
+def _merge_responses(responses: list[QueryResponseDict]) -> QueryResponseDict:
+    """merges the responses of the fanned out roots to a single response"""
+    data: Optional[dict[str, Any]] = None
+    errors: list[Any] = []
+
+    for response in responses:
+        if response.get("data") is not None:
+            data = {**(data or {}), **response["data"]}
+        errors.extend(response.get("errors") or ())
+
+    merged: dict[str, Any] = {"data": data}
+    if errors:
+        merged["errors"] = errors
+    return merged  # type: ignore
+
+
+def arguments(model: type[BaseModel] | str, /, **kwargs) -> _QueryOperation:
+    """
+    query the model with the given arguments, if a field name is given
+    instead of a model, query that field with the arguments
+    """
+    if isinstance(model, str):
+        return _QueryOperation(
+            _QueryOperationType.ARGUMENTS, _Placeholder, kwargs, name=model
+        )
     return _QueryOperation(_QueryOperationType.ARGUMENTS, model, kwargs)
 
 
+def alias(
+    name: str, model_or_operation: type[BaseModel] | _QueryOperation
+) -> _QueryOperation:
+    """query the model, or the model with arguments, under the given alias name"""
+    if isinstance(model_or_operation, _QueryOperation):
+        if model_or_operation.op is not _QueryOperationType.ARGUMENTS:
+            raise ValueError(
+                f"operation `{model_or_operation.op}` cannot be aliased, only models and `ql.arguments`"
+            )
+        return _QueryOperation(
+            _QueryOperationType.ARGUMENTS,
+            model_or_operation.model,
+            model_or_operation.extra,
+            alias=name,
+            name=model_or_operation.name,
+        )
+    return _QueryOperation(
+        _QueryOperationType.ARGUMENTS, model_or_operation, alias=name
+    )
+
+
+def variable(name: str, type_: str) -> _QueryVariable:
+    """
+    graphql variable placeholder, can be passed as argument value to `ql.arguments`,
+    the variable value is sent with the `variables` argument of the query functions
+
+    ql.query_response(
+        (ql.arguments(User, name=ql.variable("name", "String!")), (ql._(User).email,)),
+        variables={"name": "foo"},
+    )
+    """
+    return _QueryVariable(name, type_)
+
+
 def on(model: type[BaseModel]) -> _QueryOperation:
     """when querying model serialize as inline fragment"""
     return _QueryOperation(_QueryOperationType.INLINE_FRAGMENT, model)
 
 
+def select(model: type[BaseModel], depth: int = 2) -> tuple:
+    """
+    returns the selection of all the model queryable fields, nested models are selected
+    up to `depth` levels deep (fields of models deeper than that are not queried), models
+    that other models implement, and unions of models, are selected with `ql.on`, the
+    selection is built once per model and depth, raises `ValueError` if a required field
+    of nested model is deeper than `depth`, because the response couldn't be scalared
+
+    ql.query_response_scalar((User, ql.select(User, depth=1)))
+    """
+    if depth < 0:
+        raise ValueError(f"`depth` must be a non negative int, got `{depth}`")
+
+    selections = model.__dict__.get(QL_SELECTIONS_ATTR)
+    if selections is None:
+        selections = {}
+        setattr(model, QL_SELECTIONS_ATTR, selections)
+
+    # models registered later may implement the selected models
+    version = models_version()
+    cached = selections.get(depth)
+    if cached is None or cached[0] != version:
+        cached = selections[depth] = (version, _build_selection(model, depth))
+    return cached[1]
+
+
+def _build_selection(model: type[BaseModel], depth: int) -> tuple:
+    selection = _select_fields(model, depth, None)
+
+    # fields of the implementing models that the model doesn't have
+    for implementation in model_implements(model).values():
+        fields = _select_fields(implementation, depth, model.model_fields.keys())
+        if fields:
+            selection += ((on(implementation), fields),)
+    return selection
+
+
+def _select_fields(
+    model: type[BaseModel], depth: int, exclude: Optional[Iterable[str]]
+) -> tuple:
+    selection: list[Any] = []
+    model_fields = model.model_fields
+
+    for name, query_name in query_fields_nt(model)._asdict().items():
+        if exclude is not None and name in exclude:
+            continue
+
+        annotation = model_fields[name].annotation
+        if isinstance(annotation, (str, ForwardRef)):
+            raise ValueError(
+                f"couldn't select field `{name}` of `{model.__name__}`, its annotation is not resolved, "
+                "call `model_rebuild` on the model"
+            )
+
+        models = _annotation_models(annotation)
+        if not models:
+            selection.append(query_name)
+        elif depth > 0:
+            if len(models) == 1:
+                selection.append((query_name, select(models[0], depth - 1)))
+            else:
+                selection.append(
+                    (
+                        query_name,
+                        tuple((on(sub), select(sub, depth - 1)) for sub in models),
+                    )
+                )
+        elif model_fields[name].is_required():
+            raise ValueError(
+                f"couldn't select field `{name}` of `{model.__name__}`, it is a required nested model "
+                "deeper than the selection `depth`, increase `depth` or give the field a default"
+            )
+    return tuple(selection)
+
+
+def _annotation_models(annotation: Any) -> list[type[BaseModel]]:
+    """returns the models in the annotation, like `list[Male | Female]`"""
+    if isclass(annotation):
+        return [annotation] if issubclass(annotation, BaseModel) else []
+
+    models = []
+    for arg in get_args(annotation):
+        for model in _annotation_models(arg):
+            if model not in models:
+                models.append(model)
+    return models
+
+
 def fragment_ref(name: str) -> _QueryOperation:
     """reference defined fragment"""
     return _QueryOperation(
@@ -305,24 +926,60 @@ def fragment(name: str, model: type[BaseModel]) -> tuple[str, type[BaseModel]]:
     return (name, model)
 
 
-def raw_query_response(query_str: str) -> QueryResponseDict:
+@instrumented("query")
+def raw_query_response(
+    query_str: str, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
     """return the http response for given query string"""
-    return http.request(query_str)
+    return current_client().request(query_str, variables)
 
 
-def raw_query_response_scalar(query_str) -> dict[str, BaseModel | list[BaseModel]]:
+@instrumented("query")
+def raw_query_response_scalar(
+    query_str,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> dict[str, BaseModel | list[BaseModel]]:
     """sends the given query string with http, but scalarizie the response"""
-    response = http.request(query_str)
-    return _QueryResponseScalar(response).scalar()
+    response = current_client().request(query_str, variables)
+    return _QueryResponseScalar(response, trusted=trusted).scalar()
+
+
+@instrumented("query")
+async def raw_query_response_async(
+    query_str: str, variables: Optional[dict[str, Any]] = None
+) -> QueryResponseDict:
+    """async version of `raw_query_response`"""
+    return await current_client().request_async(query_str, variables)
+
+
+@instrumented("query")
+async def raw_query_response_scalar_async(
+    query_str,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> dict[str, BaseModel | list[BaseModel]]:
+    """async version of `raw_query_response_scalar`"""
+    response = await current_client().request_async(query_str, variables)
+    return _QueryResponseScalar(response, trusted=trusted).scalar()
 
 
+@instrumented("query")
 def scalar_query_response(
     query_reponse: QueryResponseDict,
+    trusted: bool = False,
+    lazy: bool = False,
+    registry: Optional[Registry] = None,
 ) -> dict[str, BaseModel | list[BaseModel]]:
     """
-    scalar a graphql query response with models defined with `ql.model`
+    scalar a graphql query response with models defined with `ql.model`,
+    if `trusted` is set, the models are constructed without validation, if `lazy`
+    is set, the root objects are returned as `ql.LazyModel` views, scalared on first access,
+    the models are taken from `registry`, or from the current `ql.Registry.scope`
     """
-    return _QueryResponseScalar(query_reponse).scalar()
+    return _QueryResponseScalar(
+        query_reponse, trusted=trusted, lazy=lazy, registry=registry
+    ).scalar()
 
 
 def query(
@@ -338,14 +995,19 @@ def query(
     ).serialize()
 
 
+@instrumented("query")
 def query_response(
     *query_models: QueryRequestSchema,
     fragments: Optional[_QueryFragmentType] = {},
     include_typename: bool = True,
+    variables: Optional[dict[str, Any]] = None,
+    fan_out: bool = False,
 ) -> QueryResponseDict:
     """
     converts given query model to string and preform an http request,
-    returns the http response
+    returns the http response, if `fan_out` is set and more then one root
+    is queried, every root is sent in its own request, concurrently, and the
+    responses are merged
 
     response = ql.query_response(
         (Point, (
@@ -357,14 +1019,121 @@ def query_response(
     --response--
     {"data": "point": {"x": 50, "y": -50}}
     """
+    if fan_out and len(query_models) > 1:
+        documents = _fan_out_documents(
+            query_models, fragments or {}, include_typename, variables
+        )
+        client = current_client()
+        with ThreadPoolExecutor(
+            max_workers=min(len(documents), _FAN_OUT_MAX_WORKERS)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    contextvars.copy_context().run, client.request, *document
+                )
+                for document in documents
+            ]
+            return _merge_responses([future.result() for future in futures])
+
     query_string = _QuerySerializer(
         query_models, fragments=fragments or {}, include_typename=include_typename
     ).serialize()
-    return http.request(query_string)
+    return current_client().request(query_string, variables)
 
 
+@instrumented("query")
 def query_response_scalar(
-    *query_models: QueryRequestSchema, fragments: Optional[_QueryFragmentType] = None
+    *query_models: QueryRequestSchema,
+    fragments: Optional[_QueryFragmentType] = None,
+    trusted: bool = False,
+    lazy: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+    fan_out: bool = False,
+) -> dict[str, BaseModel | list[BaseModel]]:
+    """
+    query response scalared to the models, when the entity cache of the client is
+    enabled the response may be read from the cache without an http request,
+    `fan_out` is the same as in `ql.query_response`
+    """
+    entity_cache = current_client().entity_cache
+    selections = None
+    if entity_cache.enabled:
+        selections = _entity_cache_selections(query_models, fragments or {})
+        if selections is not None:
+            response = _read_entity_cache(
+                entity_cache, query_models, selections, variables
+            )
+            if response is not None:
+                return scalar_query_response(response, trusted=trusted, lazy=lazy)
+
+    response = query_response(
+        *query_models,
+        fragments=fragments,
+        include_typename=True,
+        variables=variables,
+        fan_out=fan_out,
+    )
+    scalared = scalar_query_response(response, trusted=trusted, lazy=lazy)
+    if selections is not None:
+        entity_cache.write(response["data"])
+    return scalared
+
+
+@instrumented("query")
+async def query_response_async(
+    *query_models: QueryRequestSchema,
+    fragments: Optional[_QueryFragmentType] = None,
+    include_typename: bool = True,
+    variables: Optional[dict[str, Any]] = None,
+    fan_out: bool = False,
+) -> QueryResponseDict:
+    """async version of `query_response`, awaits the async request function"""
+    if fan_out and len(query_models) > 1:
+        client = current_client()
+        documents = _fan_out_documents(
+            query_models, fragments or {}, include_typename, variables
+        )
+        return _merge_responses(
+            await asyncio.gather(
+                *(client.request_async(*document) for document in documents)
+            )
+        )
+
+    query_string = _QuerySerializer(
+        query_models, fragments=fragments or {}, include_typename=include_typename
+    ).serialize()
+    return await current_client().request_async(query_string, variables)
+
+
+@instrumented("query")
+async def query_response_scalar_async(
+    *query_models: QueryRequestSchema,
+    fragments: Optional[_QueryFragmentType] = None,
+    trusted: bool = False,
+    lazy: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+    fan_out: bool = False,
 ) -> dict[str, BaseModel | list[BaseModel]]:
-    response = query_response(*query_models, fragments=fragments, include_typename=True)
-    return scalar_query_response(response)
+    """async version of `query_response_scalar`"""
+    entity_cache = current_client().entity_cache
+    selections = None
+    if entity_cache.enabled:
+        selections = _entity_cache_selections(query_models, fragments or {})
+        if selections is not None:
+            response = _read_entity_cache(
+                entity_cache, query_models, selections, variables
+            )
+            if response is not None:
+                return scalar_query_response(response, trusted=trusted, lazy=lazy)
+
+    response = await query_response_async(
+        *query_models,
+        fragments=fragments,
+        include_typename=True,
+        variables=variables,
+        fan_out=fan_out,
+    )
+    scalared = scalar_query_response(response, trusted=trusted, lazy=lazy)
+    if selections is not None:
+        entity_cache.write(response["data"])
+    return scalared
@@ -0,0 +1,551 @@
+import re
+import pickle
+from typing import Any, Optional, Iterable
+from pydantic import BaseModel
+
+from . import _http
+from ._const import QL_TYPENAME_ATTR
+from ._model import all_models, query_fields_nt
+from ._exceptions import QLSchemaValidationException, QLErrorResponseException
+
+# bumped when the snapshot structure changes, so old snapshots are not loaded
+_SNAPSHOT_VERSION = 1
+# maximum amount of valid documents that are remembered
+_MAX_VALID_DOCUMENTS = 4096
+
+_LEAF_KINDS = ("SCALAR", "ENUM")
+_ABSTRACT_KINDS = ("INTERFACE", "UNION")
+
+_TYPE_REF = "kind name ofType{kind name ofType{kind name ofType{kind name ofType{kind name ofType{kind name ofType{kind name}}}}}}"
+INTROSPECTION_QUERY = (
+    "query{__schema{queryType{name}mutationType{name}"
+    "types{kind name possibleTypes{name}"
+    f"fields(includeDeprecated:true){{name args{{name}}type{{{_TYPE_REF}}}}}"
+    f"inputFields{{name type{{{_TYPE_REF}}}}}}}}}}}"
+)
+
+# type name to its kind, fields and possible types, fields map between
+# the field name to the field named type and the field arguments names
+_SchemaType = tuple[
+    str, Optional[dict[str, tuple[str, frozenset[str]]]], frozenset[str]
+]
+
+
+class Schema:
+    """
+    compact snapshot of graphql schema, created from introspection query response,
+    can be saved to disk and loaded at startup, when set with `ql.set_schema`, every
+    document is validated against the schema before it is sent
+
+    schema = ql.Schema.fetch()
+    schema.save("schema.pickle")
+
+    ql.set_schema(ql.Schema.load("schema.pickle"))
+    """
+
+    __slots__ = ("_types", "_query_type", "_mutation_type", "_valid_documents")
+
+    def __init__(
+        self,
+        types: dict[str, _SchemaType],
+        query_type: Optional[str],
+        mutation_type: Optional[str],
+    ) -> None:
+        self._types = types
+        self._query_type = query_type
+        self._mutation_type = mutation_type
+        # documents that already passed validation
+        self._valid_documents: set[str] = set()
+
+    @classmethod
+    def from_introspection(cls, response: dict[str, Any]) -> "Schema":
+        """creates the snapshot from the response of `INTROSPECTION_QUERY`"""
+        errors = response.get("errors")
+        if errors:
+            raise QLErrorResponseException(errors)
+
+        schema = response["data"]["__schema"]
+        types: dict[str, _SchemaType] = {}
+
+        for type_ in schema["types"]:
+            fields = None
+            if type_.get("fields") is not None:
+                fields = {
+                    field["name"]: (
+                        _named_type(field["type"]),
+                        frozenset(arg["name"] for arg in field["args"]),
+                    )
+                    for field in type_["fields"]
+                }
+            elif type_.get("inputFields") is not None:
+                fields = {
+                    field["name"]: (_named_type(field["type"]), frozenset())
+                    for field in type_["inputFields"]
+                }
+
+            types[type_["name"]] = (
+                type_["kind"],
+                fields,
+                frozenset(t["name"] for t in type_.get("possibleTypes") or ()),
+            )
+
+        return cls(
+            types,
+            (schema.get("queryType") or {}).get("name"),
+            (schema.get("mutationType") or {}).get("name"),
+        )
+
+    @classmethod
+    def fetch(cls) -> "Schema":
+        """sends the introspection query with the current client and creates the snapshot"""
+        return cls.from_introspection(_http.current_client().request(INTROSPECTION_QUERY))  # type: ignore
+
+    @classmethod
+    def load(cls, path: str) -> "Schema":
+        with open(path, "rb") as f:
+            version, types, query_type, mutation_type = pickle.load(f)
+        if version != _SNAPSHOT_VERSION:
+            raise ValueError(
+                f"schema snapshot `{path}` has version `{version}`, expected `{_SNAPSHOT_VERSION}`, fetch the schema again"
+            )
+        return cls(types, query_type, mutation_type)
+
+    def save(self, path: str) -> None:
+        with open(path, "wb") as f:
+            pickle.dump(
+                (_SNAPSHOT_VERSION, self._types, self._query_type, self._mutation_type),
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    def validate(self, document: str) -> None:
+        """raises `ql.QLSchemaValidationException` if the document doesn't match the schema"""
+        if document in self._valid_documents:
+            return
+
+        errors = _DocumentValidator(self, document).validate()
+        if errors:
+            raise QLSchemaValidationException(errors)
+
+        if len(self._valid_documents) >= _MAX_VALID_DOCUMENTS:
+            self._valid_documents.clear()
+        self._valid_documents.add(document)
+
+    def check_models(
+        self, models: Optional[Iterable[type[BaseModel]]] = None
+    ) -> list[str]:
+        """
+        returns the problems of the given models (all registered models by
+        default) with the schema, like fields that don't exist in the schema
+        """
+        problems = []
+
+        for model in models if models is not None else all_models().values():
+            typename = getattr(model, QL_TYPENAME_ATTR, None)
+            type_ = self._types.get(typename)  # type: ignore
+            if type_ is None:
+                problems.append(
+                    f"model `{model.__name__}` type `{typename}` doesn't exist in the schema"
+                )
+                continue
+
+            kind, fields, _ = type_
+            if fields is None:
+                continue
+
+            query_fields = query_fields_nt(model)
+            for field_name, query_name in query_fields._asdict().items():
+                if query_name not in fields:
+                    problems.append(
+                        f"model `{model.__name__}` field `{field_name}` is queried as `{query_name}`, "
+                        f"which doesn't exist on type `{typename}`"
+                    )
+        return problems
+
+    def __getstate__(self) -> tuple:
+        return (self._types, self._query_type, self._mutation_type)
+
+    def __setstate__(self, state: tuple) -> None:
+        self._types, self._query_type, self._mutation_type = state
+        self._valid_documents = set()
+
+
+def _named_type(type_ref: dict[str, Any]) -> str:
+    """returns the type name, without the `NON_NULL` and `LIST` wrappers"""
+    while type_ref.get("name") is None:
+        type_ref = type_ref["ofType"]
+    return type_ref["name"]
+
+
+_active_schema: Optional[Schema] = None
+
+
+def set_schema(schema: Optional[Schema]) -> None:
+    """
+    set the schema that every query and mutation is validated against
+    before it is sent, `None` disables validation
+    """
+    global _active_schema
+    if schema is not None and not isinstance(schema, Schema):
+        raise TypeError(
+            f"`ql.set_schema` expects `ql.Schema` or `None`, got `{type(schema).__name__}`"
+        )
+    _active_schema = schema
+
+
+def get_schema() -> Optional[Schema]:
+    return _active_schema
+
+
+def validate_document(document: str) -> None:
+    """validates the document against the active schema, if set"""
+    if _active_schema is not None:
+        _active_schema.validate(document)
+
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ignored>[\s,﻿]+|\#[^\n\r]*)
+    |(?P<punctuator>\.\.\.|[!$&()\:=@\[\]{}|])
+    |(?P<name>[_A-Za-z][_0-9A-Za-z]*)
+    |(?P<number>-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)
+    |(?P<block_string>\"\"\"(?:\\\"\"\"|[^"]|"(?!""))*\"\"\")
+    |(?P<string>"(?:\\.|[^"\\\n\r])*")
+    """,
+    re.VERBOSE,
+)
+
+
+_OPERATION_TYPES = frozenset(("query", "mutation", "subscription"))
+
+
+def operation_type(document: str) -> str:
+    """
+    returns the type of the first operation in the document (`query`, `mutation`
+    or `subscription`), comments and fragment definitions before it are skipped
+    """
+    depth = 0
+    # object values in arguments also use braces
+    arguments_depth = 0
+    fragment = False
+
+    for match in _TOKEN_RE.finditer(document):
+        kind, value = match.lastgroup, match.group()
+        if kind == "punctuator":
+            if value == "(":
+                arguments_depth += 1
+            elif value == ")":
+                arguments_depth -= 1
+            elif arguments_depth:
+                continue
+            elif value == "{":
+                # selection set at the top level that is not
+                # of a fragment definition is a query shorthand
+                if depth == 0 and not fragment:
+                    return "query"
+                depth += 1
+            elif value == "}":
+                depth -= 1
+                if depth == 0:
+                    fragment = False
+        elif kind == "name" and depth == 0:
+            if value == "fragment":
+                fragment = True
+            elif value in _OPERATION_TYPES and not fragment:
+                return value
+    return "query"
+
+
+def _tokenize(document: str) -> list[tuple[str, str]]:
+    tokens = []
+    position = 0
+
+    while position < len(document):
+        match = _TOKEN_RE.match(document, position)
+        if match is None:
+            raise QLSchemaValidationException(
+                [
+                    f"syntax error, unexpected character `{document[position]}` at {position}"
+                ]
+            )
+        position = match.end()
+        kind = match.lastgroup
+        if kind != "ignored":
+            tokens.append((kind, match.group()))  # type: ignore
+    return tokens
+
+
+class _Field:
+    __slots__ = ("name", "arguments", "selection")
+
+    def __init__(
+        self, name: str, arguments: list[str], selection: Optional[list]
+    ) -> None:
+        self.name = name
+        self.arguments = arguments
+        self.selection = selection
+
+
+class _InlineFragment:
+    __slots__ = ("type_condition", "selection")
+
+    def __init__(self, type_condition: Optional[str], selection: list) -> None:
+        self.type_condition = type_condition
+        self.selection = selection
+
+
+class _FragmentSpread:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+
+class _DocumentParser:
+    """
+    minimal graphql executable document parser, keeps only what is needed for
+    validating the document fields against the schema
+    """
+
+    __slots__ = ("_tokens", "_position")
+
+    def __init__(self, document: str) -> None:
+        self._tokens = _tokenize(document)
+        self._position = 0
+
+    def parse(
+        self,
+    ) -> tuple[list[tuple[str, list]], dict[str, tuple[str, list]]]:
+        """returns the operations (type and selection) and the fragments by name"""
+        operations = []
+        fragments = {}
+
+        while self._peek() is not None:
+            if self._peek() == ("punctuator", "{"):
+                operations.append(("query", self._selection_set()))
+                continue
+
+            kind, value = self._next()
+            if kind != "name":
+                self._unexpected(value)
+
+            if value == "fragment":
+                name = self._expect_name()
+                if self._expect_name() != "on":
+                    self._unexpected(name)
+                type_condition = self._expect_name()
+                self._directives()
+                fragments[name] = (type_condition, self._selection_set())
+            elif value in ("query", "mutation", "subscription"):
+                if self._peek_kind() == "name":
+                    self._next()
+                if self._peek() == ("punctuator", "("):
+                    self._skip_group("(", ")")
+                self._directives()
+                operations.append((value, self._selection_set()))
+            else:
+                self._unexpected(value)
+        return operations, fragments
+
+    def _selection_set(self) -> list:
+        self._expect("{")
+        selection: list = []
+
+        while not self._consume("}"):
+            if self._consume("..."):
+                if self._peek() == ("name", "on"):
+                    self._next()
+                    type_condition: Optional[str] = self._expect_name()
+                elif self._peek_kind() == "name":
+                    selection.append(_FragmentSpread(self._expect_name()))
+                    self._directives()
+                    continue
+                else:
+                    type_condition = None
+                self._directives()
+                selection.append(_InlineFragment(type_condition, self._selection_set()))
+                continue
+
+            name = self._expect_name()
+            if self._consume(":"):
+                # aliased field, the alias is not needed
+                name = self._expect_name()
+
+            arguments = []
+            if self._consume("("):
+                while not self._consume(")"):
+                    arguments.append(self._expect_name())
+                    self._expect(":")
+                    self._value()
+
+            self._directives()
+            field_selection = None
+            if self._peek() == ("punctuator", "{"):
+                field_selection = self._selection_set()
+            selection.append(_Field(name, arguments, field_selection))
+        return selection
+
+    def _value(self) -> None:
+        if self._consume("$"):
+            self._expect_name()
+        elif self._peek() == ("punctuator", "["):
+            self._skip_group("[", "]")
+        elif self._peek() == ("punctuator", "{"):
+            self._skip_group("{", "}")
+        else:
+            kind, value = self._next()
+            if kind == "punctuator":
+                self._unexpected(value)
+
+    def _directives(self) -> None:
+        while self._consume("@"):
+            self._expect_name()
+            if self._peek() == ("punctuator", "("):
+                self._skip_group("(", ")")
+
+    def _skip_group(self, open_: str, close: str) -> None:
+        self._expect(open_)
+        depth = 1
+        while depth:
+            _, value = self._next()
+            if value == open_:
+                depth += 1
+            elif value == close:
+                depth -= 1
+
+    def _peek(self) -> Optional[tuple[str, str]]:
+        if self._position < len(self._tokens):
+            return self._tokens[self._position]
+        return None
+
+    def _peek_kind(self) -> Optional[str]:
+        token = self._peek()
+        return None if token is None else token[0]
+
+    def _next(self) -> tuple[str, str]:
+        token = self._peek()
+        if token is None:
+            raise QLSchemaValidationException(
+                ["syntax error, unexpected end of document"]
+            )
+        self._position += 1
+        return token
+
+    def _consume(self, punctuator: str) -> bool:
+        if self._peek() == ("punctuator", punctuator):
+            self._position += 1
+            return True
+        return False
+
+    def _expect(self, punctuator: str) -> None:
+        _, value = self._next()
+        if value != punctuator:
+            self._unexpected(value, punctuator)
+
+    def _expect_name(self) -> str:
+        kind, value = self._next()
+        if kind != "name":
+            self._unexpected(value, "name")
+        return value
+
+    def _unexpected(self, value: str, expected: Optional[str] = None) -> None:
+        message = f"syntax error, unexpected `{value}`"
+        if expected is not None:
+            message += f", expected `{expected}`"
+        raise QLSchemaValidationException([message])
+
+
+class _DocumentValidator:
+    __slots__ = ("_schema", "_document", "_fragments", "_errors")
+
+    def __init__(self, schema: Schema, document: str) -> None:
+        self._schema = schema
+        self._document = document
+        self._fragments: dict[str, tuple[str, list]] = {}
+        self._errors: list[str] = []
+
+    def validate(self) -> list[str]:
+        operations, self._fragments = _DocumentParser(self._document).parse()
+
+        for operation, selection in operations:
+            root = (
+                self._schema._mutation_type
+                if operation == "mutation"
+                else self._schema._query_type
+            )
+            if root is None or root not in self._schema._types:
+                self._errors.append(f"schema doesn't support `{operation}` operations")
+                continue
+            self._validate_selection(root, selection, ())
+
+        for name, (type_condition, selection) in self._fragments.items():
+            if type_condition not in self._schema._types:
+                self._errors.append(
+                    f"fragment `{name}` is defined on unknown type `{type_condition}`"
+                )
+        return self._errors
+
+    def _validate_selection(
+        self, typename: str, selection: list, fragments_path: tuple[str, ...]
+    ) -> None:
+        kind, fields, _ = self._schema._types[typename]
+
+        for item in selection:
+            if isinstance(item, _FragmentSpread):
+                fragment = self._fragments.get(item.name)
+                if fragment is None:
+                    self._errors.append(f"fragment `{item.name}` is not defined")
+                elif item.name not in fragments_path:
+                    self._validate_condition(
+                        fragment[0], fragment[1], fragments_path + (item.name,)
+                    )
+                continue
+
+            if isinstance(item, _InlineFragment):
+                self._validate_condition(
+                    item.type_condition or typename, item.selection, fragments_path
+                )
+                continue
+
+            if item.name == "__typename":
+                continue
+            if (
+                item.name in ("__schema", "__type")
+                and typename == self._schema._query_type
+            ):
+                continue
+
+            field = (fields or {}).get(item.name)
+            if field is None:
+                self._errors.append(
+                    f"field `{item.name}` doesn't exist on type `{typename}`"
+                )
+                continue
+
+            field_type, arguments = field
+            for argument in item.arguments:
+                if argument not in arguments:
+                    self._errors.append(
+                        f"argument `{argument}` doesn't exist on field `{typename}.{item.name}`"
+                    )
+
+            field_kind = self._schema._types[field_type][0]
+            if field_kind in _LEAF_KINDS:
+                if item.selection is not None:
+                    self._errors.append(
+                        f"field `{typename}.{item.name}` of type `{field_type}` can't have sub fields"
+                    )
+            elif item.selection is None:
+                self._errors.append(
+                    f"field `{typename}.{item.name}` of type `{field_type}` must have sub fields"
+                )
+            else:
+                self._validate_selection(field_type, item.selection, fragments_path)
+
+    def _validate_condition(
+        self, type_condition: str, selection: list, fragments_path: tuple[str, ...]
+    ) -> None:
+        if type_condition not in self._schema._types:
+            self._errors.append(f"unknown type `{type_condition}` in fragment")
+            return
+        self._validate_selection(type_condition, selection, fragments_path)
@@ -0,0 +1,230 @@
+import json
+import codecs
+from collections.abc import Iterable, Iterator
+from typing import Any, Optional, Protocol
+from pydantic import BaseModel
+
+from ._http import current_client
+from ._query import (
+    _QuerySerializer,
+    _QueryResponseScalar,
+    _QueryFragmentType,
+    QueryRequestSchema,
+)
+from ._exceptions import QLErrorResponseException
+
+
+class _Readable(Protocol):
+    def read(self, size: int = -1, /) -> bytes | str:
+        ...
+
+
+ResponseStream = _Readable | Iterable[bytes | str]
+
+# amount of bytes read from file like streams every read
+_READ_SIZE = 64 * 1024
+# the buffer is compacted only after this amount of characters
+# were consumed, so we don't copy the buffer for every parsed value
+_COMPACT_SIZE = 256 * 1024
+
+
+class _JSONStreamReader:
+    """
+    minimal incremental json reader over a stream of chunks, it walks the
+    response containers (`{`, `[`) by itself, and parses every leaf value
+    with `json` only once the value was fully read from the stream
+    """
+
+    __slots__ = ("_chunks", "_decoder", "_json", "_buf", "_pos", "_eof")
+
+    def __init__(self, stream: ResponseStream) -> None:
+        self._chunks = _iter_chunks(stream)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_size: int = 1) -> bool:
+        """reads at least `min_size` more characters, returns `False` on stream end"""
+        read = 0
+
+        while read < min_size and not self._eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._eof = True
+                text = self._decoder.decode(b"", final=True)
+            elif isinstance(chunk, str):
+                text = chunk
+            else:
+                text = self._decoder.decode(chunk)
+
+            if self._pos > _COMPACT_SIZE:
+                self._buf = self._buf[self._pos :]
+                self._pos = 0
+            self._buf += text
+            read += len(text)
+        return read > 0
+
+    def peek(self) -> str:
+        """returns the next non whitespace character without consuming it"""
+        while True:
+            buf = self._buf
+            pos = self._pos
+            while pos < len(buf) and buf[pos] in " \t\n\r":
+                pos += 1
+            self._pos = pos
+
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                raise ValueError("unexpected end of graphql response stream")
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(
+                f"invalid graphql response stream, expected `{char}` but got `{self._buf[self._pos]}`"
+            )
+        self._pos += 1
+
+    def consume(self, char: str) -> bool:
+        """consume the next character if it is the given char"""
+        if self.peek() == char:
+            self._pos += 1
+            return True
+        return False
+
+    def value(self) -> Any:
+        """parse the next complete json value from the stream"""
+        self.peek()
+
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                # the value is probably partial, read at least the same amount
+                # again, so big values are parsed in amortized linear time
+                if not self._fill(max(len(self._buf) - self._pos, 1)):
+                    raise
+                continue
+
+            # numbers and literals can be cut at the end of the buffer
+            if end == len(self._buf) and not self._eof and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def members(self) -> Iterator[str]:
+        """iterates over the keys of a json object, the caller must consume the value"""
+        self.expect("{")
+        if self.consume("}"):
+            return
+
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+
+            if self.consume("}"):
+                return
+            self.expect(",")
+
+    def items(self) -> Iterator[None]:
+        """iterates over the items of a json list, the caller must consume the item"""
+        self.expect("[")
+        if self.consume("]"):
+            return
+
+        while True:
+            yield None
+
+            if self.consume("]"):
+                return
+            self.expect(",")
+
+
+def _iter_chunks(stream: ResponseStream) -> Iterator[bytes | str]:
+    read = getattr(stream, "read", None)
+
+    if read is None:
+        yield from stream  # type: ignore
+        return
+
+    while chunk := read(_READ_SIZE):
+        yield chunk
+
+
+def stream_query_response(
+    stream: ResponseStream, trusted: bool = False
+) -> Iterator[tuple[str, Any]]:
+    """
+    incrementally scalar a graphql response from a byte stream, yields tuple of the root
+    key and the scalared model, models of root lists are yielded one by one as soon as
+    they are read from the stream
+    """
+    reader = _JSONStreamReader(stream)
+    scalar = _QueryResponseScalar({}, trusted=trusted)  # type: ignore
+    errors = None
+
+    for key in reader.members():
+        if key == "errors":
+            errors = reader.value()
+
+            # errors may come before the data, so there is no
+            # reason to keep reading the response
+            if errors:
+                raise QLErrorResponseException(errors)
+        elif key == "data" and reader.peek() == "{":
+            for root_key in reader.members():
+                if reader.peek() != "[":
+                    yield root_key, _scalar_value(scalar, reader.value())
+                    continue
+
+                for _ in reader.items():
+                    yield root_key, _scalar_value(scalar, reader.value())
+        else:
+            reader.value()
+
+    if errors:
+        raise QLErrorResponseException(errors)
+
+
+def _scalar_value(scalar: _QueryResponseScalar, value: Any) -> Any:
+    if isinstance(value, dict):
+        return scalar._scalar_dict(value)
+    return value
+
+
+def raw_query_response_scalar_stream(
+    query_str: str,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> Iterator[tuple[str, BaseModel | Any]]:
+    """sends the given query string with http and incrementally scalar the response stream"""
+    return stream_query_response(
+        current_client().request_stream(query_str, variables), trusted=trusted
+    )
+
+
+def query_response_scalar_stream(
+    *query_models: QueryRequestSchema,
+    fragments: Optional[_QueryFragmentType] = None,
+    trusted: bool = False,
+    variables: Optional[dict[str, Any]] = None,
+) -> Iterator[tuple[str, BaseModel | Any]]:
+    """
+    streaming version of `query_response_scalar`, requires stream request function
+    set with `ql.http.set_stream_request_func`
+
+    for root_key, model in ql.query_response_scalar_stream(
+        (Point, (ql._(Point).x, ql._(Point).y))
+    ):
+        ...
+    """
+    query_string = _QuerySerializer(
+        query_models, fragments=fragments or {}, include_typename=True
+    ).serialize()
+    return stream_query_response(
+        current_client().request_stream(query_string, variables), trusted=trusted
+    )
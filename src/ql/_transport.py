@@ -0,0 +1,444 @@
+import ssl
+import json
+import http.client
+from threading import Lock, BoundedSemaphore
+from collections import namedtuple
+from urllib.parse import urlsplit, urlencode
+from typing import Any, Iterable, Optional
+
+from ._typing import QueryResponseDict
+from ._http import _is_mutation
+from ._policy import request_timeout
+from ._codec import Codec, Decompressor, get_codec, record_compression
+from ._instrument import current_call
+from ._exceptions import QLHTTPException
+
+
+TransportStats = namedtuple(
+    "TransportStats",
+    ("pool_size", "in_use", "idle", "created", "reused", "requests", "waits"),
+)
+
+# errors raised when sending on a keep-alive connection
+# that the server already closed
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+# size of compressed response chunks that are decompressed at once
+_READ_SIZE = 64 * 1024
+
+
+class HTTPTransport:
+    """
+    built-in graphql transport based on `http.client`, keeps a bounded
+    pool of keep-alive connections to the endpoint, the transport is a request function
+    and can be passed directly to `ql.http.set_request_func`
+
+    transport = ql.HTTPTransport(
+        "https://example.com/graphql",
+        pool_size=10,
+        timeout=5,
+        headers={"Authorization": "..."},
+        encodings=("gzip", "deflate"),
+        compress_requests="gzip",
+    )
+    ql.http.set_request_func(transport)
+    ql.http.set_stream_request_func(transport.stream)
+
+    `encodings` are sent in the `Accept-Encoding` header and the responses are
+    decompressed while they are read, when `compress_requests` is set request
+    bodies of at least `compress_min_size` bytes are compressed with that codec
+    """
+
+    __slots__ = (
+        "_scheme",
+        "_host",
+        "_port",
+        "_path",
+        "_timeout",
+        "_headers",
+        "_ssl_context",
+        "_pool_size",
+        "_lock",
+        "_slots",
+        "_idle",
+        "_in_use",
+        "_created",
+        "_reused",
+        "_requests",
+        "_waits",
+        "_request_codec",
+        "_compress_min_size",
+    )
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        pool_size: int = 10,
+        timeout: Optional[float] = None,
+        headers: Optional[dict[str, str]] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        encodings: Iterable[str] = (),
+        compress_requests: Optional[str] = None,
+        compress_min_size: int = 1024,
+    ) -> None:
+        parsed_url = urlsplit(url)
+        if parsed_url.scheme not in ("http", "https"):
+            raise ValueError(
+                f"`ql.HTTPTransport` supports only http and https urls, got `{url}`"
+            )
+        if pool_size < 1:
+            raise ValueError(f"`pool_size` must be a positive int, got `{pool_size}`")
+
+        self._scheme = parsed_url.scheme
+        self._host = parsed_url.hostname or ""
+        self._port = parsed_url.port
+        self._path = parsed_url.path or "/"
+        if parsed_url.query:
+            self._path += f"?{parsed_url.query}"
+
+        self._timeout = timeout
+        self._headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+            **(headers or {}),
+        }
+        # raises for unknown codecs, so typos are found early
+        accepted = tuple(get_codec(name).name for name in encodings)
+        if accepted:
+            self._headers.setdefault("Accept-Encoding", ", ".join(accepted))
+        self._request_codec: Optional[Codec] = (
+            None if compress_requests is None else get_codec(compress_requests)
+        )
+        self._compress_min_size = compress_min_size
+        self._ssl_context = ssl_context
+        self._pool_size = pool_size
+
+        self._lock = Lock()
+        # limits the amount of connections that are used at the same time
+        self._slots = BoundedSemaphore(pool_size)
+        self._idle: list[http.client.HTTPConnection] = []
+        self._in_use = 0
+        self._created = 0
+        self._reused = 0
+        self._requests = 0
+        self._waits = 0
+
+    def __call__(self, payload: dict[str, Any]) -> QueryResponseDict:
+        """sends the graphql request body as POST request"""
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        return self._request("POST", self._path, body, _resendable(payload))
+
+    def get(self, params: dict[str, str]) -> QueryResponseDict:
+        """
+        sends GET request with the given url query parameters, can be passed
+        to `ql.http.enable_persisted_queries`
+        """
+        separator = "&" if "?" in self._path else "?"
+        # persisted queries are sent with GET only if they are not mutations
+        return self._request(
+            "GET", f"{self._path}{separator}{urlencode(params)}", None, True
+        )
+
+    def stream(self, payload: dict[str, Any]) -> "_PooledResponse":
+        """
+        sends the graphql request body as POST request and returns the response
+        body as file like object without reading it, can be passed to
+        `ql.http.set_stream_request_func`
+        """
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        conn, response = self._send("POST", self._path, body, _resendable(payload))
+
+        try:
+            if response.status >= 400:
+                data = _read_body(response)
+            else:
+                codec = _response_codec(response)
+        except BaseException:
+            self._discard(conn)
+            raise
+
+        if response.status >= 400:
+            self._release(conn, response)
+            raise QLHTTPException(response.status, response.reason, data)
+        return _PooledResponse(
+            self, conn, response, None if codec is None else codec.decompressor()
+        )
+
+    def stats(self) -> TransportStats:
+        with self._lock:
+            return TransportStats(
+                self._pool_size,
+                self._in_use,
+                len(self._idle),
+                self._created,
+                self._reused,
+                self._requests,
+                self._waits,
+            )
+
+    def close(self) -> None:
+        """closes all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _request(
+        self, method: str, path: str, body: Optional[bytes], resendable: bool
+    ) -> QueryResponseDict:
+        conn, response = self._send(method, path, body, resendable)
+        try:
+            data = _read_body(response)
+        except BaseException:
+            self._discard(conn)
+            raise
+        self._release(conn, response)
+
+        if response.status >= 400:
+            # graphql servers may respond with graphql errors and error status
+            try:
+                parsed = json.loads(data)
+            except ValueError:
+                parsed = None
+            if not isinstance(parsed, dict) or (
+                "errors" not in parsed and "data" not in parsed
+            ):
+                raise QLHTTPException(response.status, response.reason, data)
+            return parsed  # type: ignore
+        return json.loads(data)
+
+    def _send(
+        self, method: str, path: str, body: Optional[bytes], resendable: bool
+    ) -> tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        """
+        sends the request, if the server closed the reused idle connection, the request
+        is sent again with a fresh connection, when the connection was closed after the
+        request was written, the server may have handled it, so it is sent again only
+        if it is `resendable`
+        """
+        # the remaining time of `ql.deadline` limits the request
+        timeout = request_timeout(self._timeout)
+        headers = self._headers
+
+        if body is not None:
+            size = len(body)
+            if self._request_codec is not None and size >= self._compress_min_size:
+                body = self._request_codec.compress(body)
+                headers = {**headers, "Content-Encoding": self._request_codec.name}
+            record_compression("request", size, len(body))
+
+        conn, reused = self._acquire(timeout)
+        _set_timeout(conn, timeout)
+
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+            except _STALE_CONNECTION_ERRORS:
+                if not reused:
+                    raise
+            else:
+                try:
+                    return conn, conn.getresponse()
+                except _STALE_CONNECTION_ERRORS:
+                    if not (reused and resendable):
+                        raise
+            # the server closed the idle connection, try
+            # again once with a fresh connection
+            conn.close()
+            conn = self._connect()
+            _set_timeout(conn, timeout)
+            conn.request(method, path, body=body, headers=headers)
+            return conn, conn.getresponse()
+        except BaseException:
+            self._discard(conn)
+            raise
+
+    def _acquire(
+        self, timeout: Optional[float]
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._waits += 1
+            if not self._slots.acquire(timeout=timeout):
+                raise TimeoutError(
+                    "timed out waiting for a free connection in `ql.HTTPTransport` pool"
+                )
+
+        with self._lock:
+            self._in_use += 1
+            self._requests += 1
+            if self._idle:
+                self._reused += 1
+                return self._idle.pop(), True
+
+        try:
+            return self._connect(), False
+        except BaseException:
+            self._discard(None)
+            raise
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self._created += 1
+
+        if self._scheme == "https":
+            return http.client.HTTPSConnection(
+                self._host,
+                self._port,
+                timeout=self._timeout,
+                context=self._ssl_context,
+            )
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def _release(
+        self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse
+    ) -> None:
+        """returns the connection to the pool, the response must be fully read"""
+        if response.will_close:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._in_use -= 1
+            self._idle.append(conn)
+        self._slots.release()
+
+    def _discard(self, conn: Optional[http.client.HTTPConnection]) -> None:
+        if conn is not None:
+            conn.close()
+
+        with self._lock:
+            self._in_use -= 1
+        self._slots.release()
+
+
+def _response_codec(response: http.client.HTTPResponse) -> Optional[Codec]:
+    encoding = response.getheader("Content-Encoding")
+    if encoding is None or encoding == "identity":
+        return None
+    return get_codec(encoding)
+
+
+def _read_body(response: http.client.HTTPResponse) -> bytes:
+    """reads the response body, compressed bodies are decompressed chunk by chunk"""
+    codec = _response_codec(response)
+    if codec is None:
+        data = response.read()
+        record_compression("response", len(data), len(data))
+        return data
+
+    decompressor = codec.decompressor()
+    parts = []
+    wire_size = 0
+    while chunk := response.read(_READ_SIZE):
+        wire_size += len(chunk)
+        parts.append(decompressor.decompress(chunk))
+    parts.append(decompressor.flush())
+
+    data = b"".join(parts)
+    record_compression("response", len(data), wire_size)
+    return data
+
+
+def _resendable(payload: dict[str, Any]) -> bool:
+    """
+    requests that are not mutations can be sent again, persisted
+    queries sent without the document are not known to be queries
+    """
+    query = payload.get("query")
+    return query is not None and not _is_mutation(query)
+
+
+def _set_timeout(conn: http.client.HTTPConnection, timeout: Optional[float]) -> None:
+    """pooled connections are reused with different deadlines"""
+    conn.timeout = timeout
+    if conn.sock is not None:
+        conn.sock.settimeout(timeout)
+
+
+class _PooledResponse:
+    """
+    response body file like object, the connection is returned to the pool
+    when the body is fully read, or discarded when closed before that
+    """
+
+    __slots__ = (
+        "_transport",
+        "_conn",
+        "_response",
+        "_decompressor",
+        "_call",
+        "_size",
+        "_wire_size",
+    )
+
+    def __init__(
+        self,
+        transport: HTTPTransport,
+        conn: http.client.HTTPConnection,
+        response: http.client.HTTPResponse,
+        decompressor: Optional[Decompressor] = None,
+    ) -> None:
+        self._transport = transport
+        self._conn: Optional[http.client.HTTPConnection] = conn
+        self._response = response
+        # compressed bodies are decompressed while read, so
+        # `size` limits the compressed bytes that are read
+        self._decompressor = decompressor
+        # the body may be read after the call ended, so the sizes
+        # are recorded to the call that sent the request
+        self._call = current_call()
+        self._size = 0
+        self._wire_size = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if self._conn is None:
+            return b""
+
+        try:
+            if self._decompressor is None:
+                data = self._response.read(None if size < 0 else size)
+                self._wire_size += len(data)
+            else:
+                data = self._read_decompressed(size)
+        except BaseException:
+            self.close()
+            raise
+
+        self._size += len(data)
+        if size < 0 or not data:
+            conn, self._conn = self._conn, None
+            self._transport._release(conn, self._response)
+            record_compression("response", self._size, self._wire_size, self._call)
+        return data
+
+    def _read_decompressed(self, size: int) -> bytes:
+        """empty bytes are returned only at the end of the body"""
+        decompressor: Decompressor = self._decompressor  # type: ignore
+        while True:
+            chunk = self._response.read(None if size < 0 else size)
+            self._wire_size += len(chunk)
+            if not chunk:
+                return decompressor.flush()
+
+            data = decompressor.decompress(chunk)
+            if size < 0:
+                return data + decompressor.flush()
+            if data:
+                return data
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._transport._discard(conn)
+
+    def __enter__(self) -> "_PooledResponse":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
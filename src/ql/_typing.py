@@ -1,4 +1,4 @@
-from typing import Optional, TypedDict, Any
+from typing import Optional, TypedDict, NotRequired, Any
 
 
 class QueryErrorLocationDict(TypedDict):
@@ -9,6 +9,8 @@ class QueryErrorLocationDict(TypedDict):
 class QueryErrorDict(TypedDict):
     message: str
     locations: list[QueryErrorLocationDict]
+    path: NotRequired[list[str | int]]
+    extensions: NotRequired[dict[str, Any]]
 
 
 class QueryResponseDict(TypedDict):
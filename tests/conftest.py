@@ -0,0 +1,24 @@
+import ql
+import pytest
+
+# the `ql.http` settings that tests change, restored after every test
+_HTTP_SETTINGS = tuple(
+    name
+    for cls in type(ql.http).__mro__
+    for name in getattr(cls, "__slots__", ())
+    if not name.endswith("_lock")
+)
+
+
+@pytest.fixture(autouse=True)
+def reset_ql():
+    """every test starts with unconfigured `ql.http` and disabled caches"""
+    settings = {name: getattr(ql.http, name) for name in _HTTP_SETTINGS}
+    yield
+    for name, value in settings.items():
+        setattr(ql.http, name, value)
+    ql.query_cache.set_maxsize(0)
+    ql.query_cache.clear()
+    ql.entity_cache.set_maxsize(0)
+    ql.entity_cache.set_ttl(None)
+    ql.entity_cache.clear()
@@ -1,4 +1,5 @@
 import ql
+from typing import Annotated, Optional
 from pydantic import BaseModel
 
 
@@ -34,3 +35,24 @@ class Child(Human):
 class Family(BaseModel):
     people: list[Male | Female | Child]
     count: int
+
+
+@ql.model
+class Article(BaseModel):
+    name: Annotated[str, ql.metadata(query_name="title")]
+    author: Optional[Human]
+    tags: list[str]
+
+
+@ql.model
+class Author(BaseModel):
+    id: str
+    name: str
+    email: Optional[str] = None
+
+
+@ql.model
+class Book(BaseModel):
+    id: str
+    title: str
+    author: Author
@@ -0,0 +1,159 @@
+import ql
+import time
+import pytest
+from tests.models import Point, Family, Human, Male, Author, Book
+
+
+@pytest.fixture
+def query_cache():
+    ql.query_cache.set_maxsize(2)
+    ql.query_cache.clear()
+    yield ql.query_cache
+
+
+def test_query_cache_hits(query_cache) -> None:
+    query_str = ql.query((Point, (ql._(Point).x, ql._(Point).y)))
+    assert ql.query((Point, (ql._(Point).x, ql._(Point).y))) == query_str
+    assert query_cache.info().hits == 1
+    assert query_cache.info().misses == 1
+
+    # different structure, must not be served from cache
+    assert ql.query((Point, (ql._(Point).x,))) != query_str
+    assert ql.query((Point, (ql._(Point).x,)), include_typename=False) != query_str
+    assert query_cache.info().misses == 3
+
+
+def test_query_cache_distinguish_arguments(query_cache) -> None:
+    assert ql.query((ql.arguments(Point, x=1), ("x",))) != ql.query(
+        (ql.arguments(Point, x=True), ("x",))
+    )
+    assert query_cache.info().hits == 0
+
+
+def test_query_cache_eviction(query_cache) -> None:
+    ql.query((Point, ("x",)))
+    ql.query((Point, ("y",)))
+    ql.query(
+        (
+            Family,
+            (
+                ql._(Family).count,
+                (ql._(Family).people, ((ql.on(Male), (ql._(Male).sick,)),)),
+            ),
+        )
+    )
+    assert query_cache.info().evictions == 1
+    assert query_cache.info().currsize == 2
+
+    query_cache.set_maxsize(1)
+    assert query_cache.info().evictions == 2
+
+
+def test_query_cache_skip_generators(query_cache) -> None:
+    query_str = ql.query((Human, (f for f in ("first_name", "last_name"))))
+    assert query_str.endswith("{Human{first_name,last_name,__typename}}")
+    assert query_cache.info().currsize == 0
+
+
+BOOK_RESPONSE = {
+    "data": {
+        "Book": {
+            "id": "1",
+            "title": "foo",
+            "author": {"id": "2", "name": "bar", "__typename": "Author"},
+            "__typename": "Book",
+        }
+    }
+}
+
+
+@pytest.fixture
+def entity_cache():
+    requests = []
+
+    def request(payload: dict) -> dict:
+        requests.append(payload)
+        return BOOK_RESPONSE
+
+    ql.http.set_request_func(request)
+    ql.entity_cache.set_maxsize(10)
+    ql.entity_cache.clear()
+    yield requests
+
+
+def _book_query(*author_fields: str) -> tuple:
+    return (
+        ql.arguments(Book, id=1),
+        (
+            ql._(Book).id,
+            ql._(Book).title,
+            (ql._(Book).author, ("id", *(author_fields or ("name",)))),
+        ),
+    )
+
+
+def test_entity_cache_answers_from_cache(entity_cache) -> None:
+    expected = {"Book": Book(id="1", title="foo", author=Author(id="2", name="bar"))}
+    assert ql.query_response_scalar(_book_query()) == expected
+    assert ql.entity_cache.info().currsize == 2
+
+    scalared = ql.query_response_scalar(_book_query())
+    assert len(entity_cache) == 1
+    assert ql.entity_cache.info().hits == 1
+    assert scalared == expected
+
+    # `email` was never fetched
+    ql.query_response_scalar(_book_query("name", "email"))
+    assert len(entity_cache) == 2
+    assert ql.entity_cache.info().misses == 2
+
+
+def test_entity_cache_merges_mutations(entity_cache) -> None:
+    ql.query_response_scalar(_book_query())
+    ql.http.set_request_func(
+        lambda _: {
+            "data": {
+                "updateAuthor": {
+                    "id": "2",
+                    "name": "baz",
+                    "email": "baz@example.com",
+                    "__typename": "Author",
+                }
+            }
+        }
+    )
+    ql.mutate_response_scalar(
+        ("updateAuthor", {"id": "2"}, ("id", "name", "email", "__typename"))
+    )
+
+    # the author is normalized, so the book reads the merged fields
+    scalared = ql.query_response_scalar(_book_query("name", "email"))
+    assert scalared["Book"].author == Author(
+        id="2", name="baz", email="baz@example.com"
+    )
+    assert ql.entity_cache.info().hits == 1
+
+
+def test_entity_cache_eviction_and_ttl(entity_cache, monkeypatch) -> None:
+    ql.query_response_scalar(_book_query())
+    ql.entity_cache.set_maxsize(1)
+    assert ql.entity_cache.info().evictions == 1
+
+    ql.entity_cache.set_maxsize(10)
+    ql.entity_cache.set_ttl(60)
+    ql.query_response_scalar(_book_query())
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 61)
+    ql.query_response_scalar(_book_query())
+    assert ql.entity_cache.info().expirations == 1
+    assert len(entity_cache) == 3
+
+
+def test_entity_cache_skips_aliased_fields(entity_cache) -> None:
+    query = (
+        ql.arguments(Book, id=1),
+        (ql._(Book).title, (ql.alias("writer", Author), ("id", "name"))),
+    )
+    ql.query_response_scalar(query)
+    assert ql.entity_cache.info().currsize == 0
@@ -0,0 +1,63 @@
+import ql
+import pytest
+from array import array
+from tests.models import Point, Article
+
+
+POINTS_RESPONSE = {
+    "data": {
+        "Point": [
+            {"x": 1, "y": 2, "__typename": "Point"},
+            {"x": 3, "y": 4, "__typename": "Point"},
+        ]
+    }
+}
+
+
+def test_columns_typed_arrays() -> None:
+    columns = ql.scalar_query_response_columns(POINTS_RESPONSE, Point, use_numpy=False)
+    assert columns == {"x": array("q", [1, 3]), "y": array("q", [2, 4])}
+
+
+def test_columns_renamed_and_untyped_fields() -> None:
+    response = {
+        "data": {
+            "articles": [
+                {"title": "foo", "tags": ["a"], "__typename": "Article"},
+                {"title": "bar", "tags": [], "__typename": "Article"},
+            ]
+        }
+    }
+    columns = ql.scalar_query_response_columns(response, Article, root="articles")
+    # fields that were not queried have no column
+    assert columns == {"name": ["foo", "bar"], "tags": [["a"], []]}
+
+
+def test_columns_fallback_to_list() -> None:
+    response = {"data": {"Point": [{"x": 1, "y": None}, {"x": 2**70, "y": 1}]}}
+    columns = ql.scalar_query_response_columns(response, Point, use_numpy=False)
+    assert columns == {"x": [1, 2**70], "y": [None, 1]}
+
+
+def test_query_response_scalar_columns() -> None:
+    queries = []
+    ql.http.set_request_func(lambda payload: queries.append(payload) or POINTS_RESPONSE)
+    columns = ql.query_response_scalar_columns(
+        (Point, (ql._(Point).x, ql._(Point).y)), use_numpy=False
+    )
+
+    assert list(columns["x"]) == [1, 3]
+    assert queries[0]["query"] == "query{Point{x,y,__typename}}"
+
+    with pytest.raises(ValueError):
+        ql.query_response_scalar_columns((ql.on(Point), ("x",)))
+
+
+@pytest.mark.parametrize("use_numpy", (False, True))
+def test_columns_lossy_values_fallback_to_list(use_numpy: bool) -> None:
+    if use_numpy:
+        pytest.importorskip("numpy")
+    response = {"data": {"Point": [{"x": 1.5, "y": 1}, {"x": 2, "y": 2}]}}
+    columns = ql.scalar_query_response_columns(response, Point, use_numpy=use_numpy)
+    assert columns["x"] == [1.5, 2]
+    assert list(columns["y"]) == [1, 2]
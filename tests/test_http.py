@@ -0,0 +1,397 @@
+import ql
+import json
+import asyncio
+import threading
+import time
+import hashlib
+import pytest
+from tests.models import Point, Author
+
+
+POINT_RESPONSE = {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+
+
+@pytest.fixture
+def http():
+    return ql.http
+
+
+def test_async_request_func(http) -> None:
+    requests = []
+
+    async def request(data: dict) -> dict:
+        requests.append(data)
+        await asyncio.sleep(0)
+        return POINT_RESPONSE
+
+    http.set_async_request_func(request)
+
+    async def main():
+        return await asyncio.gather(
+            ql.query_response_scalar_async((Point, (ql._(Point).x, ql._(Point).y))),
+            ql.raw_query_response_async("{Point{x,y,__typename}}"),
+        )
+
+    scalared, raw = asyncio.run(main())
+    assert scalared == {"Point": Point(x=1, y=2)}
+    assert raw is POINT_RESPONSE
+    assert len(requests) == 2
+
+
+def test_async_request_fallback_to_sync_func(http) -> None:
+    http.set_request_func(lambda data: POINT_RESPONSE)
+    assert asyncio.run(ql.raw_query_response_scalar_async("")) == {
+        "Point": Point(x=1, y=2)
+    }
+
+
+def test_async_request_without_func(http) -> None:
+    with pytest.raises(ValueError):
+        asyncio.run(ql.raw_query_response_async(""))
+
+
+def test_persisted_queries(http) -> None:
+    query_str = "query{Point{x,y,__typename}}"
+    extensions = {
+        "persistedQuery": {
+            "version": 1,
+            "sha256Hash": hashlib.sha256(query_str.encode()).hexdigest(),
+        }
+    }
+    persisted = set()
+    requests = []
+
+    def request(data: dict) -> dict:
+        requests.append(data)
+        if "query" in data:
+            persisted.add(data["extensions"]["persistedQuery"]["sha256Hash"])
+            return POINT_RESPONSE
+        if data["extensions"]["persistedQuery"]["sha256Hash"] not in persisted:
+            return {
+                "errors": [
+                    {
+                        "message": "PersistedQueryNotFound",
+                        "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+                    }
+                ],
+                "data": None,
+            }
+        return POINT_RESPONSE
+
+    http.set_request_func(request)
+    http.enable_persisted_queries()
+
+    assert http.request(query_str) is POINT_RESPONSE
+    assert http.request(query_str) is POINT_RESPONSE
+    assert requests == [
+        {"extensions": extensions},
+        {"extensions": extensions, "query": query_str},
+        {"extensions": extensions},
+    ]
+
+
+def test_persisted_queries_get(http) -> None:
+    get_requests = []
+
+    def get_request(params: dict) -> dict:
+        get_requests.append(params)
+        return POINT_RESPONSE
+
+    http.set_request_func(lambda data: pytest.fail("expected GET request"))
+    http.enable_persisted_queries(get_request_func=get_request)
+
+    assert http.request("query{Point{x}}", {"x": 1}) is POINT_RESPONSE
+    assert json.loads(get_requests[0]["variables"]) == {"x": 1}
+    assert "persistedQuery" in json.loads(get_requests[0]["extensions"])
+
+    # mutations are never sent with GET
+    post_requests = []
+    http.set_request_func(lambda data: post_requests.append(data) or POINT_RESPONSE)
+    assert http.request("mutation{addPoint{x}}") is POINT_RESPONSE
+    assert len(get_requests) == 1
+    assert "query" not in post_requests[0]
+    assert "persistedQuery" in post_requests[0]["extensions"]
+
+
+def test_single_flight(http) -> None:
+    requests = []
+    release = threading.Event()
+
+    def request(data: dict) -> dict:
+        requests.append(data)
+        release.wait(timeout=5)
+        return POINT_RESPONSE
+
+    http.set_request_func(request)
+    http.enable_single_flight()
+    suppressed = http.suppressed_requests
+
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(ql.raw_query_response("query{Point{x}}"))
+        )
+        for _ in range(5)
+    ]
+    threads[0].start()
+    while not requests:
+        time.sleep(0.001)
+    for thread in threads[1:]:
+        thread.start()
+    while http.suppressed_requests - suppressed < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(requests) == 1
+    assert all(result is POINT_RESPONSE for result in results)
+
+    # different variables, and mutations, are always sent
+    http.request("query{Point{x}}", {"x": 1})
+    http.request("mutation{addPoint(x:1){x}}")
+    http.request("mutation{addPoint(x:1){x}}")
+    assert len(requests) == 4
+
+
+def test_single_flight_shares_exceptions(http) -> None:
+    entered = threading.Event()
+    release = threading.Event()
+
+    def request(data: dict) -> dict:
+        entered.set()
+        release.wait(timeout=5)
+        raise ConnectionError("boom")
+
+    http.set_request_func(request)
+    http.enable_single_flight()
+    suppressed = http.suppressed_requests
+
+    errors = []
+
+    def send() -> None:
+        try:
+            http.request("query{Point{x}}")
+        except ConnectionError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=send)
+    leader.start()
+    entered.wait(timeout=5)
+    follower = threading.Thread(target=send)
+    follower.start()
+    while http.suppressed_requests == suppressed:
+        time.sleep(0.001)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert len(errors) == 2
+    assert errors[0] is errors[1]
+
+
+def test_clients_are_isolated(http) -> None:
+    def endpoint(x: int):
+        def request(payload: dict) -> dict:
+            time.sleep(0.01)
+            return {"data": {"Point": {"x": x, "y": 0, "__typename": "Point"}}}
+
+        return request
+
+    clients = [ql.Client(endpoint(x), name=str(x)) for x in range(4)]
+    results: dict[int, list[Point]] = {x: [] for x in range(4)}
+
+    def worker(x: int) -> None:
+        with clients[x].scope():
+            for _ in range(5):
+                scalared = ql.query_response_scalar((Point, (ql._(Point).x,)))
+                results[x].append(scalared["Point"])
+
+    threads = [threading.Thread(target=worker, args=(x,)) for x in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for x, points in results.items():
+        assert [point.x for point in points] == [x] * 5
+    # the default client is not used by the scoped calls
+    with pytest.raises(ValueError):
+        ql.raw_query_response("{Point{x}}")
+
+
+def test_clients_entity_caches_are_isolated(http) -> None:
+    requests = []
+
+    def endpoint(name: str):
+        def request(payload: dict) -> dict:
+            requests.append(name)
+            return {
+                "data": {"Author": {"id": "1", "name": name, "__typename": "Author"}}
+            }
+
+        return request
+
+    a, b = ql.Client(endpoint("from-a"), name="a"), ql.Client(
+        endpoint("from-b"), name="b"
+    )
+    for client in (a, b):
+        client.entity_cache.set_maxsize(10)
+    query = (ql.arguments(Author, id="1"), (ql._(Author).id, ql._(Author).name))
+
+    assert a.call(ql.query_response_scalar, query)["Author"].name == "from-a"
+    assert b.call(ql.query_response_scalar, query)["Author"].name == "from-b"
+    assert a.call(ql.query_response_scalar, query)["Author"].name == "from-a"
+    assert requests == ["from-a", "from-b"]
+    assert a.entity_cache.info().hits == 1
+    assert ql.entity_cache.info().currsize == 0
+
+
+def test_client_call(http) -> None:
+    async def request(payload: dict) -> dict:
+        return POINT_RESPONSE
+
+    client = ql.Client(
+        lambda payload: POINT_RESPONSE, async_request_func=request, name="points"
+    )
+    fields = (Point, (ql._(Point).x, ql._(Point).y))
+
+    assert client.call(ql.query_response_scalar, fields) == {"Point": Point(x=1, y=2)}
+    assert asyncio.run(client.call(ql.query_response_scalar_async, fields)) == {
+        "Point": Point(x=1, y=2)
+    }
+    # the default client is not changed by the client calls
+    with pytest.raises(ValueError):
+        ql.raw_query_response("{Point{x}}")
+
+
+def test_retry_policy() -> None:
+    calls = []
+
+    def request(payload: dict) -> dict:
+        calls.append(payload)
+        if len(calls) < 3:
+            raise ql.QLHTTPException(503, "Service Unavailable", b"")
+        return POINT_RESPONSE
+
+    client = ql.Client(request)
+    client.set_retry_policy(ql.RetryPolicy(attempts=3, backoff=0))
+
+    assert client.call(ql.raw_query_response, "{Point{x}}") == POINT_RESPONSE
+    assert len(calls) == 3
+    assert client.retry_stats().retries == 2
+    assert client.retry_stats().retries_won == 1
+
+    # mutations are not retried by default, even after comments or fragments
+    for mutation in (
+        "mutation{addPoint{x}}",
+        "# add point\nmutation{addPoint{x}}",
+        "fragment f on Point{x} mutation{addPoint{...f}}",
+    ):
+        calls.clear()
+        with pytest.raises(ql.QLHTTPException):
+            client.call(ql.raw_mutate_response, mutation)
+        assert len(calls) == 1
+
+    # errors that will not pass by retrying are raised
+    client.set_request_func(lambda payload: calls.append(payload) or 1 / 0)
+    calls.clear()
+    with pytest.raises(ZeroDivisionError):
+        client.call(ql.raw_query_response, "{Point{x}}")
+    assert len(calls) == 1
+
+
+def test_deadline() -> None:
+    def request(payload: dict) -> dict:
+        assert 0 < ql.remaining_time() <= 0.05
+        raise TimeoutError()
+
+    client = ql.Client(request)
+    client.set_retry_policy(ql.RetryPolicy(attempts=100, backoff=0.01))
+
+    with ql.deadline(0.05), pytest.raises(ql.QLDeadlineExceeded):
+        client.call(ql.raw_query_response, "{Point{x}}")
+    assert client.retry_stats().deadlines == 1
+    assert ql.remaining_time() is None
+
+    async def slow_request(payload: dict) -> dict:
+        await asyncio.sleep(1)
+        return POINT_RESPONSE
+
+    async def main():
+        with ql.deadline(0.01):
+            return await ql.raw_query_response_async("{Point{x}}")
+
+    client.set_async_request_func(slow_request)
+    with pytest.raises(ql.QLDeadlineExceeded):
+        asyncio.run(client.call(main))
+
+
+def test_hedge_policy() -> None:
+    calls = []
+
+    def request(payload: dict) -> dict:
+        calls.append(payload)
+        if len(calls) == 1:
+            time.sleep(0.2)
+            return {"data": {"Point": {"x": 0, "y": 0, "__typename": "Point"}}}
+        return POINT_RESPONSE
+
+    client = ql.Client(request)
+    client.set_hedge_policy(ql.HedgePolicy(delay=0.01))
+
+    assert client.call(ql.raw_query_response, "{Point{x}}") == POINT_RESPONSE
+    assert client.retry_stats().hedges == 1
+    assert client.retry_stats().hedges_won == 1
+
+    # mutations are never hedged
+    calls.clear()
+    assert client.call(ql.raw_mutate_response, "mutation{addPoint{x}}")
+    assert len(calls) == 1
+
+
+def test_hedge_policy_fast_responses() -> None:
+    def request(payload: dict) -> dict:
+        time.sleep(0.01)
+        return POINT_RESPONSE
+
+    client = ql.Client(request)
+    client.set_hedge_policy(ql.HedgePolicy(delay=0.5, max_workers=2))
+
+    # many concurrent callers must not delay each other into hedging
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                client.call(ql.raw_query_response, "{Point{x}}")
+            )
+        )
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [POINT_RESPONSE] * 20
+    assert client.retry_stats().hedges == 0
+
+
+def test_hedge_policy_busy_workers() -> None:
+    with pytest.raises(ValueError):
+        ql.HedgePolicy(delay=0.1, max_workers=0)
+
+    calls = []
+
+    def request(payload: dict) -> dict:
+        calls.append(payload)
+        time.sleep(0.05)
+        return POINT_RESPONSE
+
+    policy = ql.HedgePolicy(delay=0.01, max_hedges=3, max_workers=1)
+    client = ql.Client(request)
+    client.set_hedge_policy(policy)
+
+    # only a single hedge fits in the pool
+    assert client.call(ql.raw_query_response, "{Point{x}}") == POINT_RESPONSE
+    assert client.retry_stats().hedges == 1
@@ -0,0 +1,127 @@
+import ql
+import asyncio
+import pytest
+from tests.models import Point
+
+
+@pytest.fixture
+def calls():
+    calls: list[ql.CallMetrics] = []
+    ql.instrumentation.add_observer(calls.append)
+    yield calls
+    ql.instrumentation.remove_observer(calls.append)
+
+
+def test_no_observers_does_not_measure() -> None:
+    assert not ql.instrumentation.enabled
+    ql.http.set_request_func(
+        lambda _: {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+    )
+    assert ql.query_response_scalar((Point, (ql._(Point).x,))) == {
+        "Point": Point(x=1, y=2)
+    }
+
+
+def test_query_response_scalar_phases(calls) -> None:
+    ql.http.set_request_func(
+        lambda _: {
+            "data": {
+                "Point": [
+                    {"x": 1, "y": 2, "__typename": "Point"},
+                    {"x": 3, "y": 4, "__typename": "Point"},
+                ]
+            }
+        }
+    )
+    ql.query_response_scalar((Point, (ql._(Point).x, ql._(Point).y)))
+
+    # nested ql calls are reported as the outer call
+    assert len(calls) == 1
+    call = calls[0]
+    assert call.operation == "query"
+    assert call.function == "query_response_scalar"
+    assert set(call.phases) == {"serialize", "transport", "decode"}
+    assert call.duration >= sum(call.phases.values())
+    assert call.document_size == len(ql.query((Point, (ql._(Point).x, ql._(Point).y))))
+    assert call.typename_counts == {"Point": 2}
+    assert call.error_count == 0
+    assert call.exception is None
+
+
+def test_error_response(calls) -> None:
+    ql.http.set_request_func(
+        lambda _: {
+            "data": None,
+            "errors": [
+                {"message": "a", "locations": [{"line": 1, "column": 1}]},
+                {"message": "b", "locations": [{"line": 1, "column": 2}]},
+            ],
+        }
+    )
+
+    with pytest.raises(ql.QLErrorResponseException):
+        ql.raw_query_response_scalar("query{Point{x}}")
+
+    call = calls[0]
+    assert call.function == "raw_query_response_scalar"
+    assert call.error_count == 2
+    assert isinstance(call.exception, ql.QLErrorResponseException)
+
+
+def test_async_mutation(calls) -> None:
+    async def request(_: dict) -> dict:
+        return {
+            "data": {
+                "addHuman": {
+                    "first_name": "foo",
+                    "last_name": "bar",
+                    "alive": True,
+                    "__typename": "Human",
+                }
+            }
+        }
+
+    ql.http.set_async_request_func(request)
+    asyncio.run(
+        ql.mutate_response_scalar_async(
+            ("addHuman", {"name": "foo"}, ("first_name", "__typename"))
+        )
+    )
+
+    call = calls[0]
+    assert call.operation == "mutation"
+    assert call.function == "mutate_response_scalar_async"
+    assert set(call.phases) == {"serialize", "transport", "decode"}
+    assert call.typename_counts == {"Human": 1}
+
+
+def test_failing_observer(calls, caplog) -> None:
+    def observer(call: ql.CallMetrics) -> None:
+        raise RuntimeError("broken observer")
+
+    ql.http.set_request_func(
+        lambda _: {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+    )
+    ql.instrumentation.add_observer(observer)
+    try:
+        assert ql.query_response_scalar((Point, (ql._(Point).x,))) == {
+            "Point": Point(x=1, y=2)
+        }
+    finally:
+        ql.instrumentation.remove_observer(observer)
+
+    # the other observers are still called
+    assert len(calls) == 1
+    assert "broken observer" in caplog.text
+
+
+def test_fan_out_counts(calls) -> None:
+    ql.http.set_request_func(
+        lambda _: {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+    )
+    ql.query_response_scalar(
+        *((Point, (ql._(Point).x,)) for _ in range(8)), fan_out=True
+    )
+
+    call = calls[0]
+    assert call.document_size == 8 * len(ql.query((Point, (ql._(Point).x,))))
@@ -0,0 +1,93 @@
+import ql
+import asyncio
+import pytest
+from tests.models import Point
+
+
+@pytest.fixture
+def requests():
+    requests = []
+
+    def response(data: dict) -> dict:
+        requests.append(data["query"])
+        return {
+            "data": {
+                "_0": {"x": 1, "y": 1, "__typename": "Point"},
+                "_1": None,
+            },
+            "errors": [
+                {"message": "bad point", "locations": [], "path": ["_2", "x"]},
+            ],
+        }
+
+    async def async_response(data: dict) -> dict:
+        return response(data)
+
+    ql.http.set_request_func(response)
+    ql.http.set_async_request_func(async_response)
+    yield requests
+
+
+def test_alias_query() -> None:
+    assert ql.query(
+        (ql.alias("a", ql.arguments(Point, x=1)), (ql._(Point).y,)),
+        (ql.alias("b", Point), (ql._(Point).y,)),
+        include_typename=False,
+    ).endswith('{a:Point(x:"1"){y}b:Point{y}}')
+
+
+def test_loader_coalesce_lookups(requests) -> None:
+    loader = ql.Loader(Point, (ql._(Point).x, ql._(Point).y))
+
+    async def main():
+        return await asyncio.gather(
+            loader.load(x=1),
+            loader.load(x=2),
+            loader.load(x=3),
+            loader.load(x=1),
+            return_exceptions=True,
+        )
+
+    first, second, third, fourth = asyncio.run(main())
+
+    assert len(requests) == 1
+    assert requests[0].endswith(
+        '{_0:Point(x:"1"){x,y,__typename}_1:Point(x:"2"){x,y,__typename}'
+        '_2:Point(x:"3"){x,y,__typename}}'
+    )
+    assert first == fourth == Point(x=1, y=1)
+    assert second is None
+    assert isinstance(third, ql.QLErrorResponseException)
+
+
+def test_loader_load_many_batches(requests) -> None:
+    loader = ql.Loader(Point, (ql._(Point).x, ql._(Point).y), max_batch_size=2)
+    assert loader.load_many([{"x": 1}, {"x": 2}, {"x": 1}]) == [
+        Point(x=1, y=1),
+        None,
+        Point(x=1, y=1),
+    ]
+    assert len(requests) == 2
+
+
+def test_loader_invalid_object() -> None:
+    async def response(data: dict) -> dict:
+        return {
+            "data": {
+                "_0": {"x": 1, "y": 1, "__typename": "Point"},
+                "_1": {"x": "foo", "y": 1, "__typename": "Point"},
+            }
+        }
+
+    ql.http.set_async_request_func(response)
+    loader = ql.Loader(Point, (ql._(Point).x, ql._(Point).y))
+
+    async def main():
+        return await asyncio.gather(
+            loader.load(x=1), loader.load(x=2), return_exceptions=True
+        )
+
+    # the invalid object fails only its own lookup
+    first, second = asyncio.run(main())
+    assert first == Point(x=1, y=1)
+    assert isinstance(second, ValueError)
@@ -1,5 +1,9 @@
 import ql
-from tests.models import Human, Male, Female, Child
+import pytest
+from typing import Annotated
+from pydantic import BaseModel
+from ql._model import model_decoder, _FieldKind
+from tests.models import Human, Male, Female, Child, Article, Family
 
 
 def test_implments() -> None:
@@ -9,3 +13,77 @@ def test_implments() -> None:
         assert (
             implemented_model in ql.implements(Human)
         ), f"model `Human` implements `{implemented_model.__name__}` but couldn't find it in the implements list of `Human`"
+
+
+def test_model_decoder() -> None:
+    decoder = model_decoder(Article)
+
+    assert decoder.model is Article
+    assert decoder.fields == {
+        "title": ("name", _FieldKind.PLAIN),
+        "author": ("author", _FieldKind.MODEL),
+        "tags": ("tags", _FieldKind.PLAIN),
+    }
+    assert model_decoder(Family).fields["people"] == ("people", _FieldKind.MODEL_LIST)
+
+
+def test_deferred_model_processing() -> None:
+    @ql.model(deferred=True)
+    class Animal(BaseModel):
+        name: Annotated[str, ql.metadata(query_name="title")]
+
+    @ql.model(deferred=True)
+    class Dog(Animal):
+        barks: bool
+
+    assert "__ql_query_fields_nt__" not in Animal.__dict__
+    assert "__ql_decoder__" not in Animal.__dict__
+    assert ql.all_models()["Dog"] is Dog
+
+    assert ql.implements(Animal) == (Dog,)
+    assert ql.query_fields_nt(Animal).name == "title"
+    assert ql.scalar_query_response(
+        {"data": {"animal": {"__typename": "Dog", "title": "rex", "barks": True}}}
+    )["animal"] == Dog(name="rex", barks=True)
+
+    report = {cost.model: cost for cost in ql.models_processing_report()}
+    assert report["Animal"].query_fields > 0
+    assert report["Dog"].decoder > 0
+    assert report["Dog"].total == sum(report["Dog"][1:5])
+
+
+def test_registry_isolation() -> None:
+    first = ql.Registry("first")
+    second = ql.Registry("second")
+
+    @ql.model(typename="User", registry=first)
+    class FirstUser(BaseModel):
+        name: str
+
+    @ql.model(typename="User", registry=second)
+    class SecondUser(BaseModel):
+        login: str
+
+    assert first.get("User") is FirstUser
+    assert second.get("User") is SecondUser
+    assert second.typename_map == {"User": SecondUser}
+    assert "User" not in ql.all_models()
+
+    response = {"data": {"user": {"__typename": "User", "login": "ql"}}}
+    assert ql.scalar_query_response(response, registry=second)["user"] == SecondUser(
+        login="ql"
+    )
+    with second.scope():
+        assert ql.scalar_query_response(response)["user"] == SecondUser(login="ql")
+    with pytest.raises(ValueError):
+        ql.scalar_query_response(response)
+
+
+def test_eager_model_processing_costs() -> None:
+    @ql.model(registry=ql.Registry("costs"))
+    class Cat(BaseModel):
+        name: str
+
+    report = {cost.model: cost for cost in ql.models_processing_report()}
+    assert report["Cat"].register > 0
+    assert report["Cat"].implements > 0
@@ -0,0 +1,135 @@
+import ql
+import enum
+import pytest
+from typing import Annotated, Optional
+from pydantic import BaseModel
+from tests.models import Point
+
+
+def test_mutate_variables() -> None:
+    assert (
+        ql.mutate(
+            (
+                "addUser",
+                {"name": ql.variable("name", "String!"), "age": 5},
+                ("name", "__typename"),
+            ),
+        )
+        == "mutation($name:String!){addUser(name:$name,age:5){name,__typename}}"
+    )
+
+
+def test_mutate_bulk() -> None:
+    documents = []
+
+    def request(payload: dict) -> dict:
+        documents.append(payload["query"])
+        data = {}
+        errors = []
+        for alias in ("_0", "_1", "_2", "_3", "_4"):
+            if f"{alias}:" not in payload["query"]:
+                continue
+            if alias == "_3":
+                errors.append(
+                    {
+                        "message": "name taken",
+                        "locations": [{"line": 1, "column": 1}],
+                        "path": [alias],
+                    }
+                )
+                data[alias] = None
+            else:
+                data[alias] = {"x": int(alias[1:]), "y": 0, "__typename": "Point"}
+        return {"data": data, "errors": errors} if errors else {"data": data}
+
+    ql.http.set_request_func(request)
+    results = ql.mutate_bulk(
+        (("addPoint", {"x": i, "y": 0}, ("x", "y", "__typename")) for i in range(5)),
+        chunk_size=2,
+        concurrency=3,
+    )
+
+    assert len(documents) == 3
+    assert (
+        "mutation{_0:addPoint(x:0,y:0){x,y,__typename}_1:addPoint(x:1,y:0){x,y,__typename}}"
+        in documents
+    )
+    assert results[:3] == [Point(x=0, y=0), Point(x=1, y=0), Point(x=2, y=0)]
+    assert isinstance(results[3], ql.QLErrorResponseException)
+    assert results[4] == Point(x=4, y=0)
+
+
+def test_mutate_bulk_max_chunk_bytes() -> None:
+    documents = []
+    ql.http.set_request_func(
+        lambda payload: documents.append(payload["query"]) or {"data": {}}
+    )
+    mutation = ("removePoint", {"x": 1}, None)
+    size = len("_0:removePoint(x:1){}")
+    results = ql.mutate_bulk([mutation] * 5, max_chunk_bytes=size * 2)
+
+    assert results == [None] * 5
+    assert len(documents) == 3
+
+
+def test_mutate_value_grammar() -> None:
+    class Color(enum.Enum):
+        RED = "red"
+
+    assert ql.mutate(
+        (
+            "addUser",
+            {
+                "name": 'foo "bar"\n',
+                "admin": True,
+                "age": 5,
+                "score": 1.5,
+                "nickname": None,
+                "tags": ["a", 1, [False]],
+                "color": Color.RED,
+                "address": {"city": "x"},
+            },
+            None,
+        )
+    ) == (
+        'mutation{addUser(name:"foo \\"bar\\"\\n",admin:true,age:5,score:1.5,nickname:null,'
+        'tags:["a",1,[false]],color:RED,address:{city:"x"}){}}'
+    )
+
+    with pytest.raises(ValueError):
+        ql.mutate(("addUser", {"score": float("nan")}, None))
+    with pytest.raises(ValueError):
+        ql.mutate(("addUser", {"data": object()}, None))
+
+
+def test_mutate_model_instances() -> None:
+    class AddressInput(BaseModel):
+        city: str
+        zip_code: Annotated[str, ql.metadata(query_name="zipCode")]
+
+    class UserInput(BaseModel):
+        name: str
+        nickname: Optional[str] = None
+        address: AddressInput
+        previous: list[AddressInput] = []
+
+    address = AddressInput(city="x", zip_code="123")
+    assert (
+        ql.mutate(
+            ("addUser", {"input": UserInput(name="foo", address=address)}, ("name",)),
+            ("addUsers", UserInput(name="bar", nickname=None, address=address), None),
+        )
+        == 'mutation{addUser(input:{name:"foo",address:{city:"x",zipCode:"123"},previous:[]}){name}'
+        'addUsers(name:"bar",nickname:null,address:{city:"x",zipCode:"123"},previous:[]){}}'
+    )
+
+
+def test_mutate_lazy_model() -> None:
+    point = ql.scalar_query_response(
+        {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}, lazy=True
+    )["Point"]
+    assert isinstance(point, ql.LazyModel)
+    assert (
+        ql.mutate(("addPoint", point, None), ("movePoint", {"to": point}, None))
+        == "mutation{addPoint(x:1,y:2){}movePoint(to:{x:1,y:2}){}}"
+    )
@@ -0,0 +1,78 @@
+import ql
+import time
+import pytest
+from tests.models import Point
+
+
+@pytest.fixture
+def requests():
+    requests = []
+
+    def request(data: dict) -> dict:
+        requests.append(data)
+        first = data["variables"]["first"]
+        start = int(data["variables"]["after"] or 0)
+        end = min(start + first, 10)
+        return {
+            "data": {
+                "points": {
+                    "edges": [
+                        {"node": {"x": i, "y": -i, "__typename": "Point"}}
+                        for i in range(start, end)
+                    ],
+                    "pageInfo": {"hasNextPage": end < 10, "endCursor": str(end)},
+                }
+            }
+        }
+
+    ql.http.set_request_func(request)
+    return requests
+
+
+@pytest.mark.parametrize("prefetch", (0, 1, 3))
+def test_paginate(requests, prefetch: int) -> None:
+    points = list(
+        ql.paginate(
+            Point,
+            (ql._(Point).x, ql._(Point).y),
+            connection="points",
+            arguments={"owner": "foo"},
+            page_size=4,
+            prefetch=prefetch,
+        )
+    )
+
+    assert points == [Point(x=i, y=-i) for i in range(10)]
+    assert [r["variables"] for r in requests] == [
+        {"first": 4, "after": None},
+        {"first": 4, "after": "4"},
+        {"first": 4, "after": "8"},
+    ]
+    assert requests[0]["query"] == (
+        'query($first:Int!,$after:String){points(owner:"foo",first:$first,after:$after)'
+        "{edges{node{x,y,__typename},__typename},pageInfo{hasNextPage,endCursor,__typename},__typename}}"
+    )
+
+
+def test_paginate_prefetch_next_page(requests) -> None:
+    pages = ql.paginate(Point, ("x", "y"), connection="points", page_size=2)
+
+    assert next(pages) == Point(x=0, y=0)
+    # the next page is fetched while the first one is consumed
+    for _ in range(50):
+        if len(requests) == 2:
+            break
+        time.sleep(0.01)
+    assert len(requests) == 2
+    # and no more then `prefetch` pages are fetched ahead
+    time.sleep(0.2)
+    assert len(requests) == 2
+    pages.close()
+
+
+def test_paginate_errors() -> None:
+    ql.http.set_request_func(
+        lambda data: {"errors": [{"message": "oops", "locations": []}], "data": None}
+    )
+    with pytest.raises(ql.QLErrorResponseException):
+        list(ql.paginate(Point, ("x",), connection="points"))
@@ -1,6 +1,10 @@
 import ql
+import copy
+import pickle
 import pytest
-from tests.models import Point, Family, Human, Male, Female
+from typing import Optional
+from pydantic import BaseModel
+from tests.models import Point, Family, Human, Male, Female, Article
 
 
 def test_stringify_query() -> None:
@@ -97,3 +101,306 @@ def test_scalar_query_response() -> None:
             )
         ]
     }
+
+
+def test_scalar_query_response_renamed_fields() -> None:
+    response = {
+        "data": {
+            "article": {
+                "title": "foo",
+                "author": {
+                    "first_name": "foo",
+                    "last_name": "oof",
+                    "alive": True,
+                    "pregnant": False,
+                    "__typename": "Female",
+                },
+                "tags": ["a", "b"],
+                "__typename": "Article",
+            }
+        }
+    }
+    expected = Article(
+        name="foo",
+        author=Female(first_name="foo", last_name="oof", alive=True, pregnant=False),
+        tags=["a", "b"],
+    )
+
+    assert ql.scalar_query_response(response) == {"article": expected}
+    assert ql.scalar_query_response(response, trusted=True) == {"article": expected}
+    # scalaring does not modify the response
+    assert response["data"]["article"]["__typename"] == "Article"
+
+
+def test_scalar_query_response_trusted_post_init() -> None:
+    registry = ql.Registry("post_init")
+
+    @ql.model(registry=registry)
+    class Label(BaseModel):
+        text: str
+        upper: str = ""
+
+        def model_post_init(self, context) -> None:
+            self.upper = self.text.upper()
+
+    response = {"data": {"Label": {"text": "foo", "__typename": "Label"}}}
+    for trusted in (False, True):
+        label = ql.scalar_query_response(response, trusted=trusted, registry=registry)
+        assert label["Label"].upper == "FOO"
+
+
+def test_query_variables() -> None:
+    x = ql.variable("x", "Int!")
+    assert (
+        ql.query(
+            (ql.arguments(Point, x=x, y=ql.variable("y", "Int")), (ql._(Point).x,)),
+            (ql.alias("other", ql.arguments(Point, x=x)), (ql._(Point).y,)),
+            include_typename=False,
+        )
+        == "query($x:Int!,$y:Int){Point(x:$x,y:$y){x}other:Point(x:$x){y}}"
+    )
+
+    with pytest.raises(ValueError):
+        ql.query(
+            (ql.arguments(Point, x=x, y=ql.variable("x", "String")), ("x",)),
+        )
+
+
+def test_query_variables_payload() -> None:
+    requests = []
+    ql.http.set_request_func(lambda data: requests.append(data) or {"data": {}})
+    ql.query_response(
+        (ql.arguments(Point, x=ql.variable("x", "Int!")), (ql._(Point).y,)),
+        variables={"x": 5},
+    )
+    ql.raw_query_response("query{Point{x}}")
+
+    assert requests == [
+        {
+            "query": "query($x:Int!){Point(x:$x){y,__typename}}",
+            "variables": {"x": 5},
+        },
+        {"query": "query{Point{x}}"},
+    ]
+
+
+def test_query_fragments() -> None:
+    assert (
+        ql.query(
+            (Human, (ql.fragment_ref("humanFields"),)),
+            fragments={
+                ql.fragment("humanFields", Human): (
+                    ql._(Human).first_name,
+                    ql._(Human).last_name,
+                )
+            },
+            include_typename=False,
+        )
+        == "query{Human{...humanFields}}fragment humanFields on Human{first_name,last_name}"
+    )
+
+
+def test_scalar_query_response_lazy() -> None:
+    response = {
+        "data": {
+            "Point": [
+                {"x": 1, "y": 2, "__typename": "Point"},
+                # invalid, but never accessed
+                {"x": "foo", "y": 2, "__typename": "Point"},
+            ],
+            "Human": {
+                "first_name": "foo",
+                "last_name": "bar",
+                "alive": True,
+                "__typename": "Male",
+                "sick": False,
+            },
+        }
+    }
+    scalared = ql.scalar_query_response(response, lazy=True)
+    first, invalid = scalared["Point"]
+    human = scalared["Human"]
+
+    assert isinstance(first, ql.LazyModel)
+    assert isinstance(first, Point)
+    assert isinstance(human, Male) and isinstance(human, Human)
+
+    assert first.x == 1
+    assert first == Point(x=1, y=2)
+    assert ql.materialize(first) is ql.materialize(first)
+    assert human.sick is False
+
+    with pytest.raises(ValueError):
+        invalid.x
+
+    with pytest.raises(ValueError):
+        ql.scalar_query_response({"data": {"Point": {"x": 1}}}, lazy=True)
+
+
+def test_scalar_query_response_lazy_copy() -> None:
+    response = {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+
+    for copied in (
+        copy.copy(ql.scalar_query_response(response, lazy=True)["Point"]),
+        copy.deepcopy(ql.scalar_query_response(response, lazy=True)["Point"]),
+        pickle.loads(
+            pickle.dumps(ql.scalar_query_response(response, lazy=True)["Point"])
+        ),
+    ):
+        assert type(copied) is Point
+        assert copied == Point(x=1, y=2)
+
+    point = ql.scalar_query_response(response, lazy=True)["Point"]
+    assert str(point) == str(Point(x=1, y=2))
+
+    # the view doesn't keep the rest of the response alive
+    view = ql.scalar_query_response(response, lazy=True)["Point"]
+    decoder = object.__getattribute__(view, "_ql_materialize").__self__
+    assert decoder._query_response is None
+
+
+def test_select() -> None:
+    assert ql.select(Point) == ("x", "y")
+    assert ql.select(Point) is ql.select(Point)
+
+    # `author` is required, so the response couldn't be scalared without it
+    with pytest.raises(ValueError):
+        ql.select(Article, depth=0)
+    assert ql.query((Article, ql.select(Article, depth=1))) == (
+        "query{Article{title,author{first_name,last_name,alive,"
+        "...on Male{sick,__typename},...on Female{pregnant,__typename},"
+        "...on Child{playing,__typename},__typename},tags,__typename}}"
+    )
+    assert ql.query((Family, ql.select(Family, depth=1))) == (
+        "query{family{people{"
+        "...on Male{first_name,last_name,alive,sick,__typename},"
+        "...on Female{first_name,last_name,alive,pregnant,__typename},"
+        "...on Child{first_name,last_name,alive,playing,__typename},"
+        "__typename},count,__typename}}"
+    )
+
+
+def test_select_query_response_scalar() -> None:
+    registry = ql.Registry("select")
+
+    @ql.model(registry=registry)
+    class Author(BaseModel):
+        name: str
+
+    @ql.model(registry=registry)
+    class Book(BaseModel):
+        title: str
+        author: Author
+
+    @ql.model(registry=registry)
+    class Shelf(BaseModel):
+        size: int
+        book: Optional[Book] = None
+
+    responses = {
+        "query{Shelf{size,__typename}}": {
+            "data": {"Shelf": {"size": 1, "__typename": "Shelf"}}
+        },
+        "query{Shelf{size,book{title,author{name,__typename},__typename},__typename}}": {
+            "data": {
+                "Shelf": {
+                    "size": 1,
+                    "book": {
+                        "title": "foo",
+                        "author": {"name": "bar", "__typename": "Author"},
+                        "__typename": "Book",
+                    },
+                    "__typename": "Shelf",
+                }
+            }
+        },
+        "query{Book{title,author{name,__typename},__typename}}": {
+            "data": {
+                "Book": {
+                    "title": "foo",
+                    "author": {"name": "bar", "__typename": "Author"},
+                    "__typename": "Book",
+                }
+            }
+        },
+    }
+    client = ql.Client(lambda payload: responses[payload["query"]], registry=registry)
+
+    shelf = client.call(ql.query_response_scalar, (Shelf, ql.select(Shelf, depth=0)))
+    assert shelf["Shelf"] == Shelf(size=1)
+    shelf = client.call(ql.query_response_scalar, (Shelf, ql.select(Shelf, depth=2)))
+    assert shelf["Shelf"].book.author == Author(name="bar")
+
+    # the book author is required, but is not selected in depth `1`
+    with pytest.raises(ValueError):
+        ql.select(Shelf, depth=1)
+    book = client.call(ql.query_response_scalar, (Book, ql.select(Book, depth=1)))
+    assert book["Book"] == Book(title="foo", author=Author(name="bar"))
+
+
+def test_query_response_fan_out() -> None:
+    requests = []
+
+    def request(payload: dict) -> dict:
+        requests.append(payload)
+        if payload["query"].startswith("query{Point"):
+            return {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+        return {
+            "data": {
+                "Human": {
+                    "first_name": "foo",
+                    "last_name": "bar",
+                    "alive": True,
+                    "__typename": "Human",
+                }
+            }
+        }
+
+    ql.http.set_request_func(request)
+    scalared = ql.query_response_scalar(
+        (Point, (ql._(Point).x, ql._(Point).y)),
+        (Human, (ql.fragment_ref("names"), ql._(Human).alive)),
+        fragments={
+            ql.fragment("names", Human): (
+                ql._(Human).first_name,
+                ql._(Human).last_name,
+            ),
+            ql.fragment("unused", Point): (ql._(Point).x,),
+        },
+        fan_out=True,
+    )
+
+    assert scalared == {
+        "Point": Point(x=1, y=2),
+        "Human": Human(first_name="foo", last_name="bar", alive=True),
+    }
+    assert sorted(request["query"] for request in requests) == [
+        "query{Human{...names,alive,__typename}}fragment names on Human{first_name,last_name}",
+        "query{Point{x,y,__typename}}",
+    ]
+
+
+def test_query_response_fan_out_cached_variables() -> None:
+    requests = []
+
+    def request(payload: dict) -> dict:
+        requests.append(payload)
+        return {"data": {"Point": {"x": 1, "__typename": "Point"}}}
+
+    ql.query_cache.set_maxsize(100)
+    ql.http.set_request_func(request)
+    for _ in range(2):
+        ql.query_response(
+            (ql.arguments(Point, x=ql.variable("x", "Int!")), (ql._(Point).x,)),
+            (ql.arguments(Point, y=ql.variable("y", "Int!")), (ql._(Point).x,)),
+            variables={"x": 1, "y": 2},
+            fan_out=True,
+        )
+
+    assert ql.query_cache.info().hits == 2
+    assert sorted(tuple(request["variables"].items()) for request in requests) == [
+        (("x", 1),),
+        (("x", 1),),
+        (("y", 2),),
+        (("y", 2),),
+    ]
@@ -0,0 +1,151 @@
+import ql
+import pytest
+from tests.models import Point, Human, Article
+
+
+def _named(name: str, kind: str = "OBJECT") -> dict:
+    return {"kind": kind, "name": name, "ofType": None}
+
+
+def _non_null(type_: dict) -> dict:
+    return {"kind": "NON_NULL", "name": None, "ofType": type_}
+
+
+def _list(type_: dict) -> dict:
+    return {"kind": "LIST", "name": None, "ofType": type_}
+
+
+def _field(name: str, type_: dict, args: tuple[str, ...] = ()) -> dict:
+    return {"name": name, "args": [{"name": arg} for arg in args], "type": type_}
+
+
+def _object(name: str, *fields: dict) -> dict:
+    return {
+        "kind": "OBJECT",
+        "name": name,
+        "possibleTypes": None,
+        "fields": list(fields),
+        "inputFields": None,
+    }
+
+
+def _scalar(name: str) -> dict:
+    return {
+        "kind": "SCALAR",
+        "name": name,
+        "possibleTypes": None,
+        "fields": None,
+        "inputFields": None,
+    }
+
+
+INT = _non_null(_named("Int", "SCALAR"))
+STRING = _named("String", "SCALAR")
+
+INTROSPECTION_RESPONSE = {
+    "data": {
+        "__schema": {
+            "queryType": {"name": "Query"},
+            "mutationType": {"name": "Mutation"},
+            "types": [
+                _scalar("Int"),
+                _scalar("String"),
+                _scalar("Boolean"),
+                _object(
+                    "Query",
+                    _field("Point", _named("Point"), ("x",)),
+                    _field("Human", _named("Human")),
+                    _field("article", _non_null(_list(_named("Article")))),
+                ),
+                _object(
+                    "Mutation",
+                    _field("movePoint", _named("Point"), ("x", "y")),
+                ),
+                _object("Point", _field("x", INT), _field("y", INT)),
+                _object(
+                    "Human",
+                    _field("first_name", STRING),
+                    _field("last_name", STRING),
+                    _field("alive", _named("Boolean", "SCALAR")),
+                ),
+                _object(
+                    "Article",
+                    _field("title", STRING),
+                    _field("author", _named("Human")),
+                    _field("tags", _list(STRING)),
+                ),
+            ],
+        }
+    }
+}
+
+
+@pytest.fixture
+def schema():
+    schema = ql.Schema.from_introspection(INTROSPECTION_RESPONSE)
+    ql.set_schema(schema)
+    yield schema
+    ql.set_schema(None)
+
+
+def test_schema_valid_documents(schema) -> None:
+    schema.validate(ql.query((Point, (ql._(Point).x, ql._(Point).y))))
+    schema.validate(ql.query((ql.arguments(Point, x=1), ("x", "__typename"))))
+    schema.validate(
+        "query q($x:Int){Point(x:$x) @include(if:true){...F ... on Point{y}}} "
+        "fragment F on Point{x}"
+    )
+    schema.validate(ql.mutate(("movePoint", {"x": 1, "y": 2}, ("x",))))
+
+
+def test_schema_invalid_documents(schema) -> None:
+    with pytest.raises(ql.QLSchemaValidationException) as e:
+        schema.validate("query{Point(z:1){x w} Human}")
+    assert e.value.errors == [
+        "argument `z` doesn't exist on field `Query.Point`",
+        "field `w` doesn't exist on type `Point`",
+        "field `Query.Human` of type `Human` must have sub fields",
+    ]
+
+    with pytest.raises(ql.QLSchemaValidationException):
+        schema.validate("query{Point{x{y}}}")
+    with pytest.raises(ql.QLSchemaValidationException):
+        schema.validate("query{Point{...Missing}}")
+    with pytest.raises(ql.QLSchemaValidationException):
+        schema.validate("query{Point{x}")
+
+
+def test_schema_validates_before_sending(schema) -> None:
+    sent = []
+    ql.http.set_request_func(lambda payload: sent.append(payload))
+
+    with pytest.raises(ql.QLSchemaValidationException):
+        ql.raw_query_response("query{Point{z}}")
+    with pytest.raises(ql.QLSchemaValidationException):
+        ql.mutate_response(("deletePoint", {"x": 1}, ("x",)))
+    assert sent == []
+
+    # documents are validated only when sent
+    assert ql.query((Point, ("z",))) == "query{Point{z,__typename}}"
+
+
+def test_schema_save_load(schema, tmp_path) -> None:
+    path = str(tmp_path / "schema.pickle")
+    schema.save(path)
+
+    loaded = ql.Schema.load(path)
+    loaded.validate("query{article{title author{first_name}}}")
+    with pytest.raises(ql.QLSchemaValidationException):
+        loaded.validate("query{article{name}}")
+
+
+def test_schema_check_models(schema) -> None:
+    assert schema.check_models([Point, Human, Article]) == []
+
+    @ql.model
+    class Unknown(Point):
+        pass
+
+    assert schema.check_models([Unknown]) == [
+        "model `Unknown` type `Unknown` doesn't exist in the schema"
+    ]
@@ -0,0 +1,75 @@
+import ql
+import io
+import json
+import pytest
+from tests.models import Point, Family, Male
+
+
+RESPONSE = {
+    "data": {
+        "Point": [{"x": i, "y": -i, "__typename": "Point"} for i in range(50)],
+        "family": {
+            "count": 1,
+            "people": [
+                {
+                    "first_name": "foo",
+                    "last_name": "oof",
+                    "alive": True,
+                    "sick": False,
+                    "__typename": "Male",
+                }
+            ],
+            "__typename": "Family",
+        },
+        "count": 12345,
+    }
+}
+
+
+def _chunks(data: bytes, size: int):
+    for i in range(0, len(data), size):
+        yield data[i : i + size]
+
+
+@pytest.mark.parametrize("chunk_size", (1, 7, 4096))
+def test_stream_query_response(chunk_size: int) -> None:
+    body = json.dumps(RESPONSE, indent=2).encode()
+    items = list(ql.stream_query_response(_chunks(body, chunk_size)))
+
+    assert items[:50] == [("Point", Point(x=i, y=-i)) for i in range(50)]
+    assert items[50] == (
+        "family",
+        Family(
+            count=1,
+            people=[Male(first_name="foo", last_name="oof", alive=True, sick=False)],
+        ),
+    )
+    assert items[51] == ("count", 12345)
+
+
+def test_stream_query_response_file() -> None:
+    body = io.BytesIO(json.dumps(RESPONSE).encode())
+    assert len(list(ql.stream_query_response(body))) == 52
+
+
+def test_stream_query_response_errors() -> None:
+    body = json.dumps(
+        {"errors": [{"message": "oops", "locations": []}], "data": None}
+    ).encode()
+
+    with pytest.raises(ql.QLErrorResponseException):
+        list(ql.stream_query_response([body]))
+
+
+def test_query_response_scalar_stream() -> None:
+    ql.http.set_stream_request_func(
+        lambda data: io.BytesIO(json.dumps(RESPONSE).encode())
+    )
+    models = [
+        model
+        for key, model in ql.query_response_scalar_stream(
+            (Point, (ql._(Point).x, ql._(Point).y))
+        )
+        if key == "Point"
+    ]
+    assert len(models) == 50
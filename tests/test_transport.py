@@ -0,0 +1,205 @@
+import ql
+import gzip
+import json
+import time
+import pytest
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from tests.models import Point
+
+
+class _GraphqlHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # send the headers and the body together
+    wbufsize = 64 * 1024
+    # documents of the requests that were closed without response
+    closed: list[str] = []
+
+    def do_POST(self) -> None:
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers["Content-Encoding"] == "gzip":
+            body = gzip.decompress(body)
+        payload = json.loads(body)
+
+        if payload["query"] == "error":
+            self._respond(500, b"internal error")
+            return
+        if payload["query"] == "slow":
+            time.sleep(0.5)
+        if payload["query"].endswith("{close}"):
+            self.closed.append(payload["query"])
+            self.close_connection = True
+            return
+        self._respond(
+            200,
+            json.dumps(
+                {"data": {"Point": {"x": 1, "y": 2, "__typename": "Point"}}}
+            ).encode(),
+        )
+
+    def do_GET(self) -> None:
+        self._respond(200, json.dumps({"data": {"path": self.path}}).encode())
+
+    def _respond(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GraphqlHandler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/graphql"
+    server.shutdown()
+
+
+def test_transport_reuse_connections(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, pool_size=2, timeout=5)
+    ql.http.set_request_func(transport)
+    try:
+        for _ in range(5):
+            assert ql.raw_query_response_scalar("query{Point{x,y,__typename}}") == {
+                "Point": Point(x=1, y=2)
+            }
+    finally:
+        transport.close()
+
+    stats = transport.stats()
+    assert stats.created == 1
+    assert stats.reused == 4
+    assert stats.requests == 5
+    assert stats.in_use == 0
+
+
+def test_transport_resend_stale_connection(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, pool_size=1, timeout=5)
+    closed = _GraphqlHandler.closed
+    closed.clear()
+    try:
+        # the server may have handled the mutation, so it is not sent again
+        transport({"query": "query{Point{x}}"})
+        with pytest.raises(ConnectionError):
+            transport({"query": "mutation{close}"})
+        assert closed == ["mutation{close}"]
+
+        closed.clear()
+        transport({"query": "query{Point{x}}"})
+        with pytest.raises(ConnectionError):
+            transport({"query": "query{close}"})
+        assert closed == ["query{close}", "query{close}"]
+    finally:
+        transport.close()
+
+
+def test_transport_concurrent_requests(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, pool_size=3, timeout=5)
+    results = []
+
+    def request() -> None:
+        for _ in range(10):
+            results.append(transport({"query": "query{Point{x}}"}))
+
+    threads = [threading.Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    transport.close()
+
+    assert len(results) == 60
+    assert transport.stats().created <= 3
+
+
+def test_transport_get_and_stream(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, pool_size=1, timeout=5)
+
+    assert transport.get({"extensions": "{}"}) == {
+        "data": {"path": "/graphql?extensions=%7B%7D"}
+    }
+    with transport.stream({"query": "query{Point{x,y,__typename}}"}) as body:
+        assert list(ql.stream_query_response(body)) == [("Point", Point(x=1, y=2))]
+
+    assert transport.stats().created == 1
+    assert transport.stats().in_use == 0
+    transport.close()
+
+
+def test_transport_http_error(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, pool_size=1, timeout=5)
+
+    with pytest.raises(ql.QLHTTPException) as exc_info:
+        transport({"query": "error"})
+    assert exc_info.value.status == 500
+    assert transport.stats().in_use == 0
+    transport.close()
+
+
+def test_transport_deadline(server_url) -> None:
+    transport = ql.HTTPTransport(server_url, timeout=5)
+    client = ql.Client(transport)
+
+    started = time.monotonic()
+    with ql.deadline(0.05), pytest.raises(ql.QLDeadlineExceeded):
+        client.call(ql.raw_query_response, "slow")
+    assert time.monotonic() - started < 0.4
+    transport.close()
+
+
+def test_transport_compression(server_url) -> None:
+    calls: list[ql.CallMetrics] = []
+    transport = ql.HTTPTransport(
+        server_url, timeout=5, encodings=("gzip", "deflate"), compress_requests="gzip"
+    )
+    client = ql.Client(transport)
+    query = "query{Point{x,y,__typename}}" + " " * 2048
+
+    ql.instrumentation.add_observer(calls.append)
+    try:
+        assert client.call(ql.raw_query_response_scalar, query) == {
+            "Point": Point(x=1, y=2)
+        }
+    finally:
+        ql.instrumentation.remove_observer(calls.append)
+
+    extra = calls[0].extra
+    assert extra["request_wire_bytes"] < extra["request_bytes"]
+    assert extra["request_compression_ratio"] > 10
+    assert extra["response_wire_bytes"] != extra["response_bytes"]
+
+    with transport.stream({"query": "query{Point{x,y,__typename}}"}) as body:
+        assert list(ql.stream_query_response(body)) == [("Point", Point(x=1, y=2))]
+    assert transport.stats().in_use == 0
+
+    # streamed bodies are recorded when fully read
+    calls.clear()
+    client.set_request_func(lambda payload: json.load(transport.stream(payload)))
+    ql.instrumentation.add_observer(calls.append)
+    try:
+        client.call(ql.raw_query_response_scalar, query)
+    finally:
+        ql.instrumentation.remove_observer(calls.append)
+    assert calls[0].extra["response_bytes"] == extra["response_bytes"]
+    assert calls[0].extra["response_wire_bytes"] == extra["response_wire_bytes"]
+    transport.close()
+
+    class IdentityCodec(ql.Codec):
+        def compress(self, data: bytes) -> bytes:
+            return data
+
+    with pytest.raises(TypeError):
+        IdentityCodec("identity")
+
+    with pytest.raises(ValueError):
+        ql.HTTPTransport(server_url, encodings=("unknown",))